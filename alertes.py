@@ -0,0 +1,99 @@
+import sqlite3
+import threading
+from datetime import date, timedelta
+
+import crud
+from cache_catalogue import SuiviJournal, TOUT
+import instrumentation
+from instrumentation import instrumente
+
+
+# Alertes de péremption et de stock bas.
+#
+# Deux recherches par intervalle sur index :
+#   - date_expiration <= aujourd'hui + N jours   (idx_medicaments_expiration)
+#   - marge_stock <= 0, soit quantite <= seuil_alerte propre au produit
+#     (colonne calculée indexée, idx_medicaments_marge)
+# Elles ne sont faites qu'au premier passage et au changement de jour. Ensuite,
+# chaque passage ne relit que les médicaments inscrits à journal_modifications
+# depuis le passage précédent.
+#
+#   scan = ScanAlertes()
+#   nouvelles, resolues = scan.scanner()   # à appeler périodiquement
+#   scan.liste()
+
+JOURS_EXPIRATION = 30
+
+EXPIREE = "expiré"
+EXPIRATION = "expiration proche"
+STOCK_BAS = "stock bas"
+
+_SELECT = "SELECT id, nom, quantite, seuil_alerte, date_expiration FROM medicaments"
+
+
+class ScanAlertes:
+    def __init__(self, path=None, jours=JOURS_EXPIRATION):
+        self.path = path or crud.DB
+        self.jours = jours
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        instrumentation.suivre_connexion(self._conn)
+        self._lock = threading.Lock()
+        self._suivi = SuiviJournal(self._conn)
+        self._jour = None
+        self.alertes = {}   # (id, type) -> (nom, détail)
+        self.balayages_complets = 0
+        self.lignes_relues = 0
+
+    def _evaluer(self, ligne, aujourdhui, limite):
+        id_, nom, quantite, seuil, expiration = ligne
+        if expiration and expiration <= limite:
+            type_ = EXPIREE if expiration < aujourdhui else EXPIRATION
+            self.alertes[(id_, type_)] = (nom, f"expire le {expiration}")
+        if quantite <= seuil:
+            self.alertes[(id_, STOCK_BAS)] = (nom, f"stock {quantite} (seuil {seuil})")
+
+    def _lire(self, sql, params):
+        rows = self._conn.execute(sql, params).fetchall()
+        self.lignes_relues += len(rows)
+        return rows
+
+    @instrumente
+    def scanner(self):
+        # renvoie (nouvelles, resolues) : [(id, type, nom, détail)] et [(id, type)]
+        with self._lock:
+            avant = dict(self.alertes)
+            changes = self._suivi.changements()
+            jour = date.today()
+            aujourdhui = jour.isoformat()
+            limite = (jour + timedelta(days=self.jours)).isoformat()
+            if changes is TOUT or self._jour != aujourdhui:
+                self._jour = aujourdhui
+                self.balayages_complets += 1
+                self.alertes = {}
+                # date_expiration > '' écarte NULL et les dates vides
+                for r in self._lire(_SELECT + " WHERE date_expiration > '' AND date_expiration <= ?", (limite,)):
+                    self._evaluer(r, aujourdhui, limite)
+                for r in self._lire(_SELECT + " WHERE marge_stock <= 0", ()):
+                    self._evaluer(r, aujourdhui, limite)
+            elif changes:
+                for cle in [c for c in self.alertes if c[0] in changes]:
+                    del self.alertes[cle]
+                ids = list(changes)
+                for i in range(0, len(ids), 900):
+                    part = ids[i:i + 900]
+                    for r in self._lire(_SELECT + f" WHERE id IN ({','.join('?' * len(part))})", part):
+                        self._evaluer(r, aujourdhui, limite)
+            nouvelles = [(c[0], c[1]) + v for c, v in self.alertes.items() if avant.get(c) != v]
+            resolues = [c for c in avant if c not in self.alertes]
+            return nouvelles, resolues
+
+    def liste(self):
+        # [(id, nom, type, détail)] : périmés, puis péremptions proches, puis stocks bas
+        ordre = {EXPIREE: 0, EXPIRATION: 1, STOCK_BAS: 2}
+        with self._lock:
+            return sorted(((c[0], v[0], c[1], v[1]) for c, v in self.alertes.items()),
+                          key=lambda a: (ordre[a[2]], a[0]))
+
+    def fermer(self):
+        with self._lock:
+            self._conn.close()
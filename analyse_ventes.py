@@ -0,0 +1,185 @@
+import json
+import os
+
+try:
+    import numpy as np
+except ImportError:  # dépendance optionnelle : seule cette analyse en a besoin
+    np = None
+
+import crud
+
+
+# Analyse vectorisée de l'historique des ventes (NumPy, optionnel).
+#
+# Les colonnes utiles de vente sont chargées par lots dans des tableaux NumPy
+# (jour = nombre de jours depuis le 1970-01-01, calculé par SQLite) :
+#
+#   cols = charger_colonnes("2023-01-01", "2023-12-31")
+#   jours, qte = demande_journaliere(cols, id_medicament=12)
+#   moyenne_mobile(qte, 7)
+#   classification_abc(cols)
+#
+# Pour des analyses répétées, un instantané sur disque (un fichier .npy par
+# colonne, ouvert en mémoire projetée) évite de relire la base ;
+# mettre_a_jour_instantane() n'y ajoute que les ventes postérieures.
+
+TAILLE_LOT = 100_000
+COLONNES = ("id_medicament", "quantite", "prix_total", "jour")
+_TYPES = [("id_medicament", "i8"), ("quantite", "i8"), ("prix_total", "f8"), ("jour", "i4")]
+_SELECT = """
+    SELECT v.id_medicament, v.quantite, v.prix_total, CAST(julianday(v.date_vente) - 2440587.5 AS INTEGER)
+    FROM vente v
+"""
+SEUILS_ABC = (0.80, 0.95)
+
+
+def _numpy():
+    if np is None:
+        raise ImportError("L'analyse des ventes nécessite NumPy (pip install numpy).")
+    return np
+
+
+def _vides():
+    return {c: _numpy().empty(0, dtype=t) for c, t in _TYPES}
+
+
+# --- chargement ---
+
+def charger_colonnes(date_debut=None, date_fin=None, apres_id=0, jusqu_id=None, taille_lot=TAILLE_LOT):
+    # {colonne: tableau} ; lecture en flux, un lot à la fois
+    _numpy()
+    where, params = crud._filtres_ventes(date_debut=date_debut, date_fin=date_fin)
+    where.append("v.id > ?")
+    params.append(int(apres_id))
+    if jusqu_id is not None:
+        where.append("v.id <= ?")
+        params.append(int(jusqu_id))
+    lots = []
+    conn = crud.connect_db()
+    try:
+        cur = conn.execute(_SELECT + " WHERE " + " AND ".join(where) + " ORDER BY v.id", params)
+        while True:
+            lot = cur.fetchmany(taille_lot)
+            if not lot:
+                break
+            lots.append(np.array(lot, dtype=_TYPES))
+    finally:
+        conn.close()
+    if not lots:
+        return _vides()
+    tout = np.concatenate(lots)
+    return {c: np.ascontiguousarray(tout[c]) for c in COLONNES}
+
+
+def _dernier_id():
+    conn = crud.connect_db()
+    try:
+        return conn.execute("SELECT IFNULL(MAX(id), 0) FROM vente").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def creer_instantane(dossier):
+    os.makedirs(dossier, exist_ok=True)
+    # borne haute fixée avant la lecture : une vente arrivée pendant le
+    # chargement sera prise par la mise à jour suivante, pas deux fois
+    dernier = _dernier_id()
+    cols = charger_colonnes(jusqu_id=dernier)
+    _ecrire_instantane(dossier, cols, dernier)
+    return len(cols["quantite"])
+
+
+def _ecrire_instantane(dossier, cols, dernier):
+    for c in COLONNES:
+        tmp = os.path.join(dossier, c + ".tmp.npy")
+        np.save(tmp, cols[c])
+        os.replace(tmp, os.path.join(dossier, c + ".npy"))
+    with open(os.path.join(dossier, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump({"dernier_id": dernier, "lignes": len(cols["quantite"])}, f)
+
+
+def ouvrir_instantane(dossier):
+    # colonnes en mémoire projetée (lecture seule, chargées à la demande par l'OS)
+    _numpy()
+    return {c: np.load(os.path.join(dossier, c + ".npy"), mmap_mode="r") for c in COLONNES}
+
+
+def mettre_a_jour_instantane(dossier):
+    # ajoute les ventes enregistrées depuis le dernier instantané ; renvoie leur nombre
+    _numpy()
+    with open(os.path.join(dossier, "meta.json"), encoding="utf-8") as f:
+        meta = json.load(f)
+    dernier = _dernier_id()
+    nouvelles = charger_colonnes(apres_id=meta["dernier_id"], jusqu_id=dernier)
+    if len(nouvelles["quantite"]):
+        anciennes = ouvrir_instantane(dossier)
+        cols = {c: np.concatenate([anciennes[c], nouvelles[c]]) for c in COLONNES}
+        del anciennes
+        _ecrire_instantane(dossier, cols, dernier)
+    return len(nouvelles["quantite"])
+
+
+# --- indicateurs ---
+
+def _produits(id_medicament):
+    # (ids présents, rang de chaque vente dans ids) ; les id étant de petits
+    # entiers, un comptage (O(n)) remplace le tri de np.unique
+    presents = np.flatnonzero(np.bincount(id_medicament))
+    rang = np.zeros(len(presents) and int(presents[-1]) + 1, dtype="i8")
+    rang[presents] = np.arange(len(presents))
+    return presents, rang[id_medicament]
+
+def demande_journaliere(cols, id_medicament=None):
+    # (jours, quantités) : série continue du premier au dernier jour, 0 les jours sans vente
+    _numpy()
+    jour, qte = cols["jour"], cols["quantite"]
+    if id_medicament is not None:
+        masque = cols["id_medicament"] == int(id_medicament)
+        jour, qte = jour[masque], qte[masque]
+    if not len(jour):
+        return np.empty(0, dtype="i4"), np.empty(0)
+    j0 = int(jour.min())
+    serie = np.bincount(jour - j0, weights=qte)
+    return np.arange(j0, j0 + len(serie), dtype="i4"), serie
+
+
+def moyenne_mobile(serie, fenetre):
+    # moyenne glissante sur `fenetre` points (sommes cumulées) ; len(serie) - fenetre + 1 valeurs
+    _numpy()
+    fenetre = int(fenetre)
+    if fenetre <= 0:
+        raise ValueError("La fenêtre doit être > 0.")
+    serie = np.asarray(serie, dtype="f8")
+    if len(serie) < fenetre:
+        return np.empty(0)
+    cumul = np.concatenate(([0.0], np.cumsum(serie)))
+    return (cumul[fenetre:] - cumul[:-fenetre]) / fenetre
+
+
+def courbes_demande(cols, pas=7):
+    # (ids, début, matrice) : quantité vendue par produit (lignes) et par période de `pas` jours
+    _numpy()
+    if not len(cols["jour"]):
+        return np.empty(0, dtype="i8"), 0, np.zeros((0, 0))
+    ids, ligne = _produits(cols["id_medicament"])
+    j0 = int(cols["jour"].min())
+    periode = (cols["jour"] - j0) // int(pas)
+    nb_periodes = int(periode.max()) + 1
+    matrice = np.bincount(ligne * nb_periodes + periode, weights=cols["quantite"],
+                          minlength=len(ids) * nb_periodes)
+    return ids, j0, matrice.reshape(len(ids), nb_periodes)
+
+
+def classification_abc(cols, seuils=SEUILS_ABC):
+    # {id_medicament: "A" | "B" | "C"} selon la part cumulée du chiffre d'affaires
+    _numpy()
+    if not len(cols["prix_total"]):
+        return {}
+    ids, ligne = _produits(cols["id_medicament"])
+    ca = np.bincount(ligne, weights=cols["prix_total"])
+    ordre = np.argsort(-ca, kind="stable")
+    part = np.cumsum(ca[ordre]) / ca.sum()
+    # la classe dépend de la part cumulée *avant* le produit
+    avant = np.concatenate(([0.0], part[:-1]))
+    classes = np.where(avant < seuils[0], "A", np.where(avant < seuils[1], "B", "C"))
+    return dict(zip(ids[ordre].tolist(), classes.tolist()))
@@ -0,0 +1,115 @@
+import tkinter as tk
+
+
+# Champ de saisie avec liste de suggestions (autocomplétion).
+#
+# La recherche `rechercher(texte, nb_max)` est lancée par l'exécuteur de
+# requêtes (db_worker.ExecuteurDB) `delai_ms` après la dernière frappe ; un
+# résultat arrivé après une frappe plus récente est écarté. Le choix d'une
+# suggestion (clic, Entrée) appelle `choisir(ligne)`.
+#
+#   champ = ChampAutocompletion(frm, executeur, crud.rechercher_clients,
+#                               lambda r: f"{r[1]} {r[2]}", lambda r: ...)
+
+DELAI_MS = 200
+NB_MAX = 10
+
+
+class ChampAutocompletion(tk.Entry):
+    def __init__(self, parent, executeur, rechercher, formater, choisir,
+                 delai_ms=DELAI_MS, nb_max=NB_MAX, **kw):
+        super().__init__(parent, **kw)
+        self.executeur = executeur
+        self.rechercher = rechercher
+        self.formater = formater
+        self.choisir = choisir
+        self.delai_ms = delai_ms
+        self.nb_max = nb_max
+        self._cle = f"autocompletion-{id(self)}"
+        self._apres = None
+        self._lignes = []
+        self._popup = None
+        self._liste = None
+
+        self.bind("<KeyRelease>", self._on_frappe)
+        self.bind("<Down>", self._vers_liste)
+        self.bind("<Return>", lambda e: self._valider(0))
+        self.bind("<Escape>", lambda e: self._masquer())
+        self.bind("<FocusOut>", lambda e: self.after(150, self._masquer_si_hors_focus))
+
+    # --- recherche ---
+
+    def _on_frappe(self, event):
+        if event.keysym in ("Up", "Down", "Return", "Escape", "Tab"):
+            return
+        if self._apres is not None:
+            self.after_cancel(self._apres)
+        self._apres = self.after(self.delai_ms, self._lancer)
+
+    def _lancer(self):
+        self._apres = None
+        texte = self.get().strip()
+        if not texte:
+            self.executeur.annuler(self._cle)
+            self._masquer()
+            return
+        self.executeur.soumettre(self.rechercher, texte, self.nb_max, succes=self._afficher,
+                                 erreur=lambda e: self._masquer(), cle=self._cle)
+
+    # --- liste des suggestions ---
+
+    def _afficher(self, lignes):
+        self._lignes = list(lignes)
+        if not self._lignes:
+            self._masquer()
+            return
+        if self._popup is None:
+            self._popup = tk.Toplevel(self)
+            self._popup.wm_overrideredirect(True)
+            self._liste = tk.Listbox(self._popup, exportselection=False)
+            self._liste.pack(fill="both", expand=True)
+            self._liste.bind("<ButtonRelease-1>", lambda e: self._valider(self._liste.nearest(e.y)))
+            self._liste.bind("<Return>", lambda e: self._valider(self._index_liste()))
+            self._liste.bind("<Escape>", lambda e: (self._masquer(), self.focus_set()))
+            self._liste.bind("<FocusOut>", lambda e: self.after(150, self._masquer_si_hors_focus))
+        self._liste.delete(0, tk.END)
+        for ligne in self._lignes:
+            self._liste.insert(tk.END, self.formater(ligne))
+        self._liste.configure(height=min(len(self._lignes), self.nb_max))
+        self._popup.wm_geometry(f"{max(self.winfo_width(), 300)}x{self._liste.winfo_reqheight()}"
+                                f"+{self.winfo_rootx()}+{self.winfo_rooty() + self.winfo_height()}")
+        self._popup.deiconify()
+        self._popup.lift()
+
+    def _index_liste(self):
+        sel = self._liste.curselection()
+        return sel[0] if sel else 0
+
+    def _vers_liste(self, event=None):
+        if self._popup is not None and self._lignes:
+            self._liste.focus_set()
+            self._liste.selection_clear(0, tk.END)
+            self._liste.selection_set(0)
+            self._liste.activate(0)
+        return "break"
+
+    def _valider(self, index):
+        if not self._lignes or not 0 <= index < len(self._lignes):
+            return
+        ligne = self._lignes[index]
+        self.delete(0, tk.END)
+        self.insert(0, self.formater(ligne))
+        self._masquer()
+        self.focus_set()
+        self.choisir(ligne)
+        return "break"
+
+    def _masquer(self):
+        self._lignes = []
+        if self._popup is not None:
+            self._popup.withdraw()
+
+    def _masquer_si_hors_focus(self):
+        focus = self.focus_get()
+        if focus is not self and focus is not self._liste:
+            self._masquer()
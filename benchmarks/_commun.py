@@ -0,0 +1,90 @@
+import os
+import random
+import shutil
+import tempfile
+import time
+from contextlib import contextmanager
+
+import crud
+import db_phamarcie
+
+
+# Outils partagés par les benchmarks (lancer depuis la racine du projet :
+#   python -m benchmarks.bench_pool)
+
+@contextmanager
+def base_temporaire(profil=None):
+    # crée une base vide dans un dossier temporaire et y redirige crud.DB
+    dossier = tempfile.mkdtemp(prefix="pharmacie_bench_")
+    path = os.path.join(dossier, "pharmacie.db")
+    ancien, ancien_profil = crud.DB, crud.PROFIL
+    profil = profil or crud.PROFIL
+    db_phamarcie.create_table(path, profil)
+    crud.DB = path
+    crud.utiliser_profil(profil)
+    try:
+        yield path
+    finally:
+        crud.DB = ancien
+        crud.utiliser_profil(ancien_profil)
+        shutil.rmtree(dossier, ignore_errors=True)
+
+
+def remplir_base(path, n_meds=1000, n_clients=1000, stock=1_000_000, seed=42):
+    rnd = random.Random(seed)
+    conn = crud.connect_db()
+    cur = conn.cursor()
+    cur.executemany("""
+        INSERT INTO medicaments (nom, code_barre, description, quantite, prix, date_expiration)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, [(f"Medicament {i}", f"{3400000000000 + i}", f"Description {i}",
+           stock, round(rnd.uniform(1, 80), 2), "2099-12-31") for i in range(1, n_meds + 1)])
+    cur.executemany("""
+        INSERT INTO clients (nom, prenom, naissance, phone, num_assurance)
+        VALUES (?, ?, ?, ?, ?)
+    """, [(f"Nom{i}", f"Prenom{i}", "1980-01-01", f"06{i:08d}", f"ASS{i:06d}")
+          for i in range(1, n_clients + 1)])
+    conn.commit()
+    conn.close()
+
+
+def mesurer(fn, n):
+    # exécute fn() n fois et renvoie le nombre d'opérations par seconde
+    t0 = time.perf_counter()
+    for _ in range(n):
+        fn()
+    dt = time.perf_counter() - t0
+    return n / dt if dt else float("inf")
+
+
+def afficher(titre, resultats):
+    print(titre)
+    for nom, valeur in resultats:
+        print(f"  {nom:<40} {valeur:>12.1f}")
+
+
+def remplir_ventes(path, n, n_meds=1000, n_clients=1000, seed=42, lot=50_000):
+    # ventes synthétiques réparties sur ~5 ans, insérées directement (sans
+    # passer par crud.enregistrer_vente) pour aller vite
+    rnd = random.Random(seed)
+    debut = time.mktime((2020, 1, 1, 0, 0, 0, 0, 0, -1))
+    etendue = 5 * 365 * 86400
+    conn = crud.connect_db()
+    cur = conn.cursor()
+    fait = 0
+    while fait < n:
+        k = min(lot, n - fait)
+        lignes = []
+        for _ in range(k):
+            qte = rnd.randint(1, 5)
+            prix = round(rnd.uniform(1, 80), 2)
+            date = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(debut + rnd.random() * etendue))
+            lignes.append((rnd.randint(1, n_meds), rnd.randint(1, n_clients), qte, prix,
+                           round(prix * qte, 2), date, f"Pharmacien{rnd.randint(1, 5)}"))
+        cur.executemany("""
+            INSERT INTO vente (id_medicament, id_client, quantite, prix_unitaire, prix_total, date_vente, pharmacien)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, lignes)
+        fait += k
+    conn.commit()
+    conn.close()
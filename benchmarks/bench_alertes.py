@@ -0,0 +1,65 @@
+import random
+import time
+
+import alertes
+import crud
+from benchmarks._commun import base_temporaire, remplir_base, afficher
+
+
+# Coût d'un passage du moteur d'alertes sur 100 000 produits : balayage complet
+# par index, passage incrémental après quelques ventes, et la même recherche
+# sans index (parcours de toute la table) pour comparaison.
+#   python -m benchmarks.bench_alertes
+
+N_MEDS = 100_000
+VENTES_ENTRE_PASSAGES = 100
+
+
+def _ms(fn):
+    t0 = time.perf_counter()
+    res = fn()
+    return (time.perf_counter() - t0) * 1000, res
+
+
+def main():
+    rnd = random.Random(5)
+    with base_temporaire() as path:
+        remplir_base(path, n_meds=N_MEDS, n_clients=100, stock=500)
+        conn = crud.connect_db()
+        # 1 % des produits proches de la péremption, 1 % en stock bas
+        conn.executemany("UPDATE medicaments SET date_expiration = date('now', ?) WHERE id = ?",
+                         [(f"+{rnd.randint(1, 60)} days", rnd.randint(1, N_MEDS)) for _ in range(N_MEDS // 100)])
+        conn.executemany("UPDATE medicaments SET quantite = ? WHERE id = ?",
+                         [(rnd.randint(0, 10), rnd.randint(1, N_MEDS)) for _ in range(N_MEDS // 100)])
+        conn.commit()
+        conn.close()
+
+        scan = alertes.ScanAlertes(path)
+        resultats = []
+        ms, (nouvelles, _) = _ms(scan.scanner)
+        resultats.append(("balayage complet indexé (ms)", ms))
+        resultats.append(("alertes", len(nouvelles)))
+
+        for _ in range(VENTES_ENTRE_PASSAGES):
+            crud.enregistrer_vente(rnd.randint(1, N_MEDS), 1, 1, "bench")
+        lues = scan.lignes_relues
+        ms, _ = _ms(scan.scanner)
+        resultats.append((f"passage après {VENTES_ENTRE_PASSAGES} ventes (ms)", ms))
+        resultats.append(("  lignes relues", scan.lignes_relues - lues))
+        ms, _ = _ms(scan.scanner)
+        resultats.append(("passage sans changement (ms)", ms))
+
+        conn = crud.connect_db()
+        ms, rows = _ms(lambda: conn.execute("""
+            SELECT id FROM medicaments NOT INDEXED
+            WHERE quantite <= seuil_alerte OR (date_expiration > '' AND date_expiration <= date('now', '+30 days'))
+        """).fetchall())
+        conn.close()
+        resultats.append(("sans index, toute la table (ms)", ms))
+        scan.fermer()
+        crud.close_db()
+    afficher(f"Alertes sur {N_MEDS} médicaments", resultats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import analyse_ventes
+import crud
+from benchmarks._commun import base_temporaire, remplir_base, remplir_ventes, afficher
+
+
+# Indicateurs de vente vectorisés (analyse_ventes, NumPy) contre les mêmes
+# calculs en Python pur sur des tuples : courbes de demande hebdomadaires par
+# produit, moyenne mobile 7 jours de la demande journalière de chaque produit,
+# classification ABC.
+#   python -m benchmarks.bench_analyse [nb_ventes]
+
+N_VENTES = 2_000_000
+N_MEDS = 1000
+
+
+def _chrono(fn):
+    t0 = time.perf_counter()
+    res = fn()
+    return (time.perf_counter() - t0) * 1000, res
+
+
+# --- référence en Python pur ---
+
+def _charger_python():
+    conn = crud.connect_db()
+    try:
+        return conn.execute(analyse_ventes._SELECT).fetchall()
+    finally:
+        conn.close()
+
+
+def _courbes_python(lignes, pas=7):
+    j0 = min(l[3] for l in lignes)
+    courbes = defaultdict(lambda: defaultdict(float))
+    for id_med, qte, _, jour in lignes:
+        courbes[id_med][(jour - j0) // pas] += qte
+    return courbes
+
+
+def _moyennes_python(lignes, fenetre=7):
+    par_produit = defaultdict(dict)
+    for id_med, qte, _, jour in lignes:
+        par_produit[id_med][jour] = par_produit[id_med].get(jour, 0) + qte
+    res = {}
+    for id_med, jours in par_produit.items():
+        debut, fin = min(jours), max(jours)
+        serie = [jours.get(j, 0) for j in range(debut, fin + 1)]
+        somme = sum(serie[:fenetre])
+        moyennes = [somme / fenetre]
+        for i in range(fenetre, len(serie)):
+            somme += serie[i] - serie[i - fenetre]
+            moyennes.append(somme / fenetre)
+        res[id_med] = moyennes
+    return res
+
+
+def _abc_python(lignes, seuils=analyse_ventes.SEUILS_ABC):
+    ca = defaultdict(float)
+    for id_med, _, total, _ in lignes:
+        ca[id_med] += total
+    somme = sum(ca.values())
+    classes, cumul = {}, 0.0
+    for id_med, v in sorted(ca.items(), key=lambda x: -x[1]):
+        classes[id_med] = "A" if cumul / somme < seuils[0] else "B" if cumul / somme < seuils[1] else "C"
+        cumul += v
+    return classes
+
+
+def _moyennes_numpy(cols, fenetre=7):
+    ids, _, _ = analyse_ventes.courbes_demande(cols, pas=1)
+    return {i: analyse_ventes.moyenne_mobile(analyse_ventes.demande_journaliere(cols, i)[1], fenetre)
+            for i in ids.tolist()}
+
+
+def _moyennes_numpy_matrice(cols, fenetre=7):
+    # toutes les séries d'un coup : une ligne par produit, sommes cumulées par ligne
+    import numpy as np
+    _, _, m = analyse_ventes.courbes_demande(cols, pas=1)
+    cumul = np.concatenate((np.zeros((m.shape[0], 1)), np.cumsum(m, axis=1)), axis=1)
+    return (cumul[:, fenetre:] - cumul[:, :-fenetre]) / fenetre
+
+
+def main():
+    if analyse_ventes.np is None:
+        print("NumPy n'est pas installé : benchmark ignoré (pip install numpy).")
+        return
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else N_VENTES
+    with base_temporaire() as path:
+        remplir_base(path, n_meds=N_MEDS, n_clients=1000)
+        remplir_ventes(path, n, n_meds=N_MEDS)
+        resultats = []
+        dt_py, lignes = _chrono(_charger_python)
+        dt_np, cols = _chrono(analyse_ventes.charger_colonnes)
+        resultats += [("chargement, tuples (ms)", dt_py), ("chargement, numpy par lots (ms)", dt_np)]
+        with tempfile.TemporaryDirectory() as dossier:
+            analyse_ventes.creer_instantane(dossier)
+            dt, snap = _chrono(lambda: analyse_ventes.ouvrir_instantane(dossier))
+            resultats.append(("ouverture instantané mmap (ms)", dt))
+
+            for nom, f_py, f_np in (
+                ("courbes hebdo par produit", _courbes_python, analyse_ventes.courbes_demande),
+                ("moyenne mobile 7 j par produit", _moyennes_python, _moyennes_numpy_matrice),
+                ("classification ABC", _abc_python, analyse_ventes.classification_abc),
+            ):
+                dt_py, r_py = _chrono(lambda: f_py(lignes))
+                dt_np, r_np = _chrono(lambda: f_np(cols))
+                dt_mm, _ = _chrono(lambda: f_np(snap))
+                resultats += [(f"{nom}: python (ms)", dt_py), (f"{nom}: numpy (ms)", dt_np),
+                              (f"{nom}: numpy mmap (ms)", dt_mm)]
+            assert _abc_python(lignes) == analyse_ventes.classification_abc(cols)
+            dt, _ = _chrono(lambda: _moyennes_numpy(cols))
+            resultats.append(("moyenne mobile, produit par produit (ms)", dt))
+            del snap
+    afficher(f"Analyse de {n} ventes", resultats)
+
+
+if __name__ == "__main__":
+    main()
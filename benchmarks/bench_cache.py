@@ -0,0 +1,70 @@
+import random
+
+import crud
+from benchmarks._commun import base_temporaire, remplir_base, mesurer, afficher
+
+
+# Latence des lectures du catalogue avec et sans le cache (crud.CACHE_CATALOGUE),
+# puis celle des ventes : chaque vente modifie le produit vendu, le cache ne doit
+# donc pas se trouver sur ce chemin.
+# Accès « zipfien » : quelques produits très demandés, une longue traîne.
+#   python -m benchmarks.bench_cache
+
+N_MEDS = 20000
+N = 20000
+N_VENTES = 3000
+
+
+def main():
+    with base_temporaire() as path:
+        remplir_base(path, n_meds=N_MEDS, n_clients=100)
+        rnd = random.Random(1)
+        poids = [1 / i for i in range(1, N_MEDS + 1)]
+        ids = rnd.choices(range(1, N_MEDS + 1), weights=poids, k=N)
+        codes = [f"{3400000000000 + i}" for i in ids]
+
+        resultats = []
+        for actif in (False, True):
+            crud.CACHE_CATALOGUE = actif
+            mode = "cache" if actif else "sans cache"
+            it_id, it_code = iter(ids), iter(codes)
+            resultats.append((f"{mode}: détails par id (µs)",
+                              1e6 / mesurer(lambda: crud.fetch_medicament_details(next(it_id)), N)))
+            if actif:
+                cache = crud.cache_catalogue()
+                resultats.append((f"{mode}: par code-barres (µs)",
+                                  1e6 / mesurer(lambda: cache.get_par_code(next(it_code)), N)))
+            else:
+                def par_code():
+                    conn = crud.connect_db()
+                    try:
+                        crud._id_par_code(next(it_code), conn.cursor())
+                    finally:
+                        conn.close()
+                resultats.append((f"{mode}: par code-barres (µs)", 1e6 / mesurer(par_code, N)))
+
+        for actif in (False, True):
+            crud.CACHE_CATALOGUE = actif
+            mode = "cache" if actif else "sans cache"
+            avant = crud.stats_cache() if actif else None
+            it_id = iter(ids)
+            resultats.append((f"{mode}: vente (µs)",
+                              1e6 / mesurer(lambda: crud.enregistrer_vente(next(it_id), 1, 1), N_VENTES)))
+            if actif:
+                apres = crud.stats_cache()
+                lectures = apres["succes"] + apres["echecs"] - avant["succes"] - avant["echecs"]
+                resultats.append((f"{mode}: lectures du cache pendant les ventes", lectures))
+
+        # une modification invalide la ligne concernée, et elle seule
+        crud.modifier_medicament(ids[0], prix=12.5)
+        assert crud.cache_catalogue().get(ids[0])[5] == 12.5
+        stats = crud.stats_cache()
+        resultats.append(("taux de succès du cache (%)", 100 * stats["taux_succes"]))
+        resultats.append(("invalidations", stats["invalidations"]))
+        afficher("Cache du catalogue", resultats)
+        crud.close_db()
+        crud.CACHE_CATALOGUE = True
+
+
+if __name__ == "__main__":
+    main()
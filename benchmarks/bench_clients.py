@@ -0,0 +1,92 @@
+import random
+import sys
+import time
+
+import crud
+from benchmarks._commun import base_temporaire, afficher
+
+
+# Recherche de clients (crud.rechercher_clients) sur 1 000 000 de clients :
+# préfixe de nom/prénom (FTS) et correspondance exacte sur téléphone et
+# n° d'assurance (index), comparés aux mêmes requêtes sans index.
+#   python -m benchmarks.bench_clients [nb_clients]
+
+N_CLIENTS = 1_000_000
+N_REQUETES = 200
+NOMS = ("Martin", "Bernard", "Thomas", "Petit", "Robert", "Richard", "Durand", "Dubois", "Moreau",
+        "Laurent", "Simon", "Michel", "Lefèvre", "Leroy", "Roux", "David", "Bertrand", "Morel",
+        "Fournier", "Girard", "Bonnet", "Dupont", "Lambert", "Fontaine", "Rousseau", "Vincent",
+        "Müller", "Benali", "Nguyen", "Da Silva", "Garçon", "Héroux", "Bélanger", "Côté")
+PRENOMS = ("Jean", "Marie", "Élodie", "Hélène", "François", "Zoé", "Noé", "Léa", "Chloé", "Jérôme",
+           "Inès", "Loïc", "Anaïs", "Mathéo", "Amélie", "Gaëlle", "Raphaël", "Clément", "Yasmine")
+
+
+def _remplir(n, rnd):
+    conn = crud.connect_db()
+    lot = []
+    for i in range(1, n + 1):
+        nom = f"{rnd.choice(NOMS)}{'' if rnd.random() < 0.5 else rnd.choice(('', '-' + rnd.choice(NOMS)))}"
+        lot.append((nom, rnd.choice(PRENOMS), "1980-01-01", f"06{i:08d}", f"{i:013d}"))
+        if len(lot) == 100_000:
+            conn.executemany("INSERT INTO clients (nom, prenom, naissance, phone, num_assurance) "
+                             "VALUES (?, ?, ?, ?, ?)", lot)
+            lot = []
+    if lot:
+        conn.executemany("INSERT INTO clients (nom, prenom, naissance, phone, num_assurance) "
+                         "VALUES (?, ?, ?, ?, ?)", lot)
+    conn.commit()
+    conn.close()
+
+
+def _sans_index(sql):
+    def requete(valeur):
+        conn = crud.connect_db()
+        try:
+            return conn.execute(sql, (valeur, crud.RECHERCHE_LIMITE)).fetchall()
+        finally:
+            conn.close()
+    return requete
+
+
+def _latences(fn, requetes):
+    mesures = []
+    for q in requetes:
+        t0 = time.perf_counter()
+        fn(q)
+        mesures.append((time.perf_counter() - t0) * 1000)
+    mesures.sort()
+    return mesures[len(mesures) // 2], mesures[int(len(mesures) * 0.99)]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else N_CLIENTS
+    rnd = random.Random(3)
+    with base_temporaire("import") as path:
+        t0 = time.perf_counter()
+        _remplir(n, rnd)
+        resultats = [("insertion + indexation (s)", time.perf_counter() - t0)]
+        rechercher = lambda q: crud.rechercher_clients(q, 20)
+        scenarios = (
+            ("préfixe nom (3 lettres)", [rnd.choice(NOMS)[:3].lower() for _ in range(N_REQUETES)],
+             "SELECT id FROM clients WHERE nom LIKE ? || '%' LIMIT ?"),
+            ("nom + prénom accentué", [f"{rnd.choice(NOMS)[:4]} {rnd.choice(PRENOMS)[:3]}"
+                                       for _ in range(N_REQUETES)], None),
+            ("prénom sans accents", ["helene", "elodie", "zoe", "jerome", "ines"] * 40, None),
+            ("sans résultat", ["xyzw"] * 20, "SELECT id FROM clients WHERE nom LIKE ? || '%' LIMIT ?"),
+            ("téléphone exact", [f"06 {rnd.randint(1, n):08d}" for _ in range(N_REQUETES)],
+             "SELECT id FROM clients NOT INDEXED WHERE phone = replace(?, ' ', '') LIMIT ?"),
+            ("n° d'assurance exact", [f"{rnd.randint(1, n):013d}" for _ in range(N_REQUETES)],
+             "SELECT id FROM clients NOT INDEXED WHERE num_assurance = ? LIMIT ?"),
+        )
+        for nom, requetes, sql in scenarios:
+            p50, p99 = _latences(rechercher, requetes)
+            resultats.append((f"{nom}: p50 (ms)", p50))
+            resultats.append((f"{nom}: p99 (ms)", p99))
+            if sql is not None:
+                p50, _ = _latences(_sans_index(sql), requetes[:10])
+                resultats.append((f"{nom}, sans index: p50 (ms)", p50))
+    afficher(f"Recherche sur {n} clients", resultats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import random
+import sys
+import threading
+import time
+
+import crud
+import commit_groupe
+from benchmarks._commun import base_temporaire, remplir_base, afficher
+
+
+# Débit de ventes selon la fenêtre de commit groupé (profil « comptoir »,
+# synchronous=FULL : un fsync par commit). APPELANTS threads vendent en
+# parallèle ; « aucune » = une transaction par vente.
+#   python -m benchmarks.bench_commit_groupe [appelants]
+
+FENETRES = (None, 0, 0.001, 0.002, 0.005, 0.010, 0.020)
+VENTES_PAR_APPELANT = 100
+
+
+def _compter_commits(compteur):
+    # trace callback posé sur chaque connexion du pool : compte les COMMIT
+    # réellement exécutés, pas les lots formés
+    init = crud._init_connexion
+
+    def init_trace(conn):
+        init(conn)
+
+        def tracer(sql):
+            if sql.startswith("COMMIT"):
+                with compteur["lock"]:
+                    compteur["commits"] += 1
+        conn.set_trace_callback(tracer)
+    return init, init_trace
+
+
+def _scenario(fenetre, appelants):
+    compteur = {"commits": 0, "lock": threading.Lock()}
+    init, crud._init_connexion = _compter_commits(compteur)
+    try:
+        return _mesurer(fenetre, appelants, compteur)
+    finally:
+        crud._init_connexion = init
+
+
+def _mesurer(fenetre, appelants, compteur):
+    with base_temporaire("comptoir") as path:
+        remplir_base(path, n_meds=1000, n_clients=1000)
+        if fenetre is not None:
+            commit_groupe.activer(fenetre)
+
+        def appelant(seed):
+            rnd = random.Random(seed)
+            for _ in range(VENTES_PAR_APPELANT):
+                crud.enregistrer_vente(rnd.randint(1, 1000), rnd.randint(1, 1000), 1, "bench")
+
+        threads = [threading.Thread(target=appelant, args=(i,)) for i in range(appelants)]
+        compteur["commits"] = 0   # remplir_base ne compte pas
+        t0 = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        dt = time.perf_counter() - t0
+        commit_groupe.desactiver()
+        commits = max(1, compteur["commits"])
+        return appelants * VENTES_PAR_APPELANT / dt, appelants * VENTES_PAR_APPELANT / commits
+
+
+def main():
+    appelants = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    resultats = []
+    for fenetre in FENETRES:
+        nom = "aucune" if fenetre is None else f"{fenetre * 1000:g} ms"
+        debit, par_lot = _scenario(fenetre, appelants)
+        resultats.append((f"fenêtre {nom}: ventes/s", debit))
+        resultats.append((f"fenêtre {nom}: ventes par commit", par_lot))
+    afficher(f"Commit groupé, {appelants} appelants", resultats)
+
+
+if __name__ == "__main__":
+    main()
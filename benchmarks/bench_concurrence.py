@@ -0,0 +1,78 @@
+import multiprocessing as mp
+import sqlite3
+import sys
+import time
+
+import crud
+from benchmarks._commun import base_temporaire, remplir_base, afficher
+
+
+# Test de charge multi-processus : plusieurs caisses vendent en même temps
+# un petit nombre de produits au stock limité. Vérifie qu'aucune vente ne
+# dépasse le stock (stock final + quantités vendues = stock initial) et
+# mesure le débit de ventes sous contention.
+#   python -m benchmarks.bench_concurrence [processus]
+
+PRODUITS = 5
+STOCK = 2000
+TENTATIVES = 1500
+
+
+def caisse(path, numero, resultats):
+    crud.DB = path
+    ok = refus = occupe = 0
+    for i in range(TENTATIVES):
+        try:
+            crud.enregistrer_vente(i % PRODUITS + 1, 1, 1 + (i + numero) % 3, f"caisse{numero}")
+            ok += 1
+        except ValueError:
+            refus += 1
+        except sqlite3.OperationalError:
+            occupe += 1
+    resultats.put((ok, refus, occupe))
+
+
+def main():
+    processus = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    with base_temporaire() as path:
+        remplir_base(path, n_meds=PRODUITS, n_clients=1, stock=STOCK)
+        crud.close_db()
+        resultats = mp.Queue()
+        procs = [mp.Process(target=caisse, args=(path, n, resultats)) for n in range(processus)]
+        t0 = time.perf_counter()
+        for p in procs:
+            p.start()
+        bilans = [resultats.get() for _ in procs]
+        for p in procs:
+            p.join()
+        duree = time.perf_counter() - t0
+
+        conn = sqlite3.connect(path)
+        stocks = dict(conn.execute("SELECT id, quantite FROM medicaments"))
+        vendus = dict(conn.execute("SELECT id_medicament, SUM(quantite) FROM vente GROUP BY id_medicament"))
+        nb_ventes = conn.execute("SELECT COUNT(*) FROM vente").fetchone()[0]
+        conn.close()
+
+    erreurs = []
+    for id_med, stock in stocks.items():
+        if stock < 0 or stock + vendus.get(id_med, 0) != STOCK:
+            erreurs.append(f"médicament {id_med}: stock {stock}, vendu {vendus.get(id_med, 0)}")
+    ok = sum(b[0] for b in bilans)
+    if ok != nb_ventes:
+        erreurs.append(f"{ok} ventes confirmées mais {nb_ventes} lignes dans vente")
+
+    afficher(f"{processus} caisses concurrentes", [
+        ("ventes confirmées", ok),
+        ("refus (stock épuisé)", sum(b[1] for b in bilans)),
+        ("échecs de verrou", sum(b[2] for b in bilans)),
+        ("ventes/s", ok / duree),
+    ])
+    if erreurs:
+        for e in erreurs:
+            print("SURVENTE -", e)
+        sys.exit(1)
+    print("Aucune survente.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import time
+
+import db_phamarcie
+from benchmarks._commun import base_temporaire, remplir_base, remplir_ventes, afficher
+
+
+# Démarrage à froid, à plusieurs tailles de base :
+#   - create_table() sur un schéma à jour (PRAGMA user_version, aucun DDL)
+#     contre le rejeu complet des migrations (base antérieure au versionnage)
+#   - main.py lancé dans un sous-processus : temps de l'import jusqu'au premier
+#     affichage de la fenêtre, puis jusqu'au remplissage des tableaux
+#     (nécessite un affichage, sinon cette partie est sautée)
+#   python -m benchmarks.bench_demarrage [ventes1,ventes2,...]
+
+TAILLES = (0, 100_000, 1_000_000)
+REPETITIONS = 20
+RACINE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _ouverture(path, rejouer):
+    total = 0.0
+    for _ in range(REPETITIONS):
+        if rejouer:
+            conn = sqlite3.connect(path)
+            conn.execute("PRAGMA user_version = 0")
+            conn.close()
+        t0 = time.perf_counter()
+        db_phamarcie.create_table(path)
+        total += time.perf_counter() - t0
+    return total / REPETITIONS * 1000
+
+
+def _lancer_interface(dossier):
+    env = dict(os.environ, PHARMACIE_MESURE_DEMARRAGE="1",
+               PYTHONPATH=RACINE + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    t0 = time.perf_counter()
+    res = subprocess.run([sys.executable, os.path.join(RACINE, "main.py")], cwd=dossier, env=env,
+                         capture_output=True, text=True, timeout=300)
+    total = (time.perf_counter() - t0) * 1000
+    if res.returncode != 0:
+        raise RuntimeError(res.stderr.strip().splitlines()[-1] if res.stderr.strip() else res.returncode)
+    mesures = {}
+    for ligne in res.stdout.splitlines():
+        morceaux = ligne.split()
+        if len(morceaux) == 2 and morceaux[0].endswith("_ms"):
+            mesures[morceaux[0]] = float(morceaux[1])
+    return mesures["premier_affichage_ms"], mesures["tableaux_remplis_ms"], total
+
+
+def main():
+    tailles = [int(t) for t in sys.argv[1].split(",")] if len(sys.argv) > 1 else TAILLES
+    affichage = bool(os.environ.get("DISPLAY") or sys.platform in ("win32", "darwin"))
+    for n in tailles:
+        with base_temporaire() as path:
+            remplir_base(path, n_meds=2000, n_clients=5000)
+            if n:
+                remplir_ventes(path, n, n_meds=2000, n_clients=5000)
+            resultats = [
+                ("create_table, schéma à jour (ms)", _ouverture(path, False)),
+                ("create_table, rejeu des migrations (ms)", _ouverture(path, True)),
+            ]
+            if affichage:
+                try:
+                    premier, remplis, total = _lancer_interface(os.path.dirname(path))
+                    resultats += [
+                        ("main.py : premier affichage (ms)", premier),
+                        ("main.py : tableaux remplis (ms)", remplis),
+                        ("processus complet, interpréteur inclus (ms)", total),
+                    ]
+                except (RuntimeError, subprocess.TimeoutExpired, KeyError) as e:
+                    print(f"Interface non mesurée : {e}")
+            afficher(f"Démarrage avec {n} ventes", resultats)
+    if not affichage:
+        print("Pas d'affichage disponible : démarrage de l'interface non mesuré.")
+
+
+if __name__ == "__main__":
+    main()
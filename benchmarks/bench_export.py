@@ -0,0 +1,51 @@
+import os
+import sys
+import time
+import tracemalloc
+
+import crud
+import export_ventes
+from benchmarks._commun import base_temporaire, remplir_base, remplir_ventes, afficher
+
+
+# Débit et mémoire de l'export des ventes (CSV et colonnaire) sur une table
+# de plusieurs millions de lignes, comparés à fetch_ventes() + écriture.
+#   python -m benchmarks.bench_export [nombre_de_ventes]
+
+
+def _pic_memoire(fn):
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    resultats = []
+    with base_temporaire() as path:
+        dossier = os.path.dirname(path)
+        remplir_base(path, n_meds=5000, n_clients=50000)
+        remplir_ventes(path, n, n_meds=5000, n_clients=50000)
+
+        for nom, fichier in (("csv", "ventes.csv"), ("colonnaire", "ventes.phcol")):
+            chemin = os.path.join(dossier, fichier)
+            t0 = time.perf_counter()
+            export_ventes.exporter_ventes(chemin)
+            dt = time.perf_counter() - t0
+            resultats.append((f"{nom}: lignes/s", n / dt))
+            resultats.append((f"{nom}: taille (Mo)", os.path.getsize(chemin) / 1e6))
+
+        # mémoire mesurée sur 10 % de la table (tracemalloc ralentit beaucoup)
+        fin = "2020-07-01"
+        resultats.append(("flux csv: pic mémoire 10 % (Mo)", _pic_memoire(
+            lambda: export_ventes.exporter_ventes(os.path.join(dossier, "m.csv"), date_fin=fin))))
+        resultats.append(("liste complète (fetchall): pic mémoire 10 % (Mo)", _pic_memoire(
+            lambda: crud.fetch_ventes_page(limite=n // 10))))
+    afficher(f"Export de {n} ventes", resultats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import random
+import time
+
+import crud
+from historique import Historique, _INSERT
+from benchmarks._commun import base_temporaire, afficher
+
+
+# Historique des actions : 100 000 actions journalisées avec écritures
+# groupées, contre une transaction par action ; lecture de pages et rétention.
+#   python -m benchmarks.bench_historique
+
+N_ACTIONS = 100_000
+N_UNITAIRES = 2000
+ENTITES = ("medicaments", "clients")
+
+
+def _action(rnd, i):
+    entite = rnd.choice(ENTITES)
+    return f"Modification {entite} {i}", entite, rnd.randint(1, 5000)
+
+
+def main():
+    rnd = random.Random(11)
+    resultats = []
+    with base_temporaire() as path:
+        # référence : une transaction (et un fsync) par action
+        conn = crud.connect_db()
+        t0 = time.perf_counter()
+        for i in range(N_UNITAIRES):
+            conn.execute(_INSERT, ("2024-01-01 00:00:00",) + _action(rnd, i))
+            conn.commit()
+        dt = time.perf_counter() - t0
+        conn.execute("DELETE FROM historique")
+        conn.commit()
+        conn.close()
+        resultats.append(("une transaction par action (actions/s)", N_UNITAIRES / dt))
+
+        h = Historique()
+        t0 = time.perf_counter()
+        for i in range(N_ACTIONS):
+            h.ajouter(*_action(rnd, i))
+        dt_ajout = time.perf_counter() - t0
+        h.vider()
+        dt_total = time.perf_counter() - t0
+        resultats.append(("ajouter(): µs par action", dt_ajout / N_ACTIONS * 1e6))
+        resultats.append(("groupé, jusqu'à l'écriture (actions/s)", N_ACTIONS / dt_total))
+
+        t0 = time.perf_counter()
+        lignes, suivant = h.fetch_page()
+        resultats.append(("première page (ms)", (time.perf_counter() - t0) * 1000))
+        pages = 1
+        t0 = time.perf_counter()
+        while suivant is not None and pages < 100:
+            lignes, suivant = h.fetch_page(suivant)
+            pages += 1
+        resultats.append(("page suivante, moyenne sur 100 (ms)", (time.perf_counter() - t0) * 1000 / (pages - 1)))
+        t0 = time.perf_counter()
+        h.fetch_page(entite="medicaments", id_entite=42)
+        resultats.append(("actions d'une entité (ms)", (time.perf_counter() - t0) * 1000))
+
+        t0 = time.perf_counter()
+        supprimees = h.appliquer_retention(garder=N_ACTIONS // 2)
+        resultats.append(("rétention à 50 000 (ms)", (time.perf_counter() - t0) * 1000))
+        resultats.append(("  actions supprimées", supprimees))
+        h.fermer()
+    afficher(f"Historique, {N_ACTIONS} actions", resultats)
+
+
+if __name__ == "__main__":
+    main()
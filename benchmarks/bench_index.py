@@ -0,0 +1,85 @@
+import sys
+import time
+
+import crud
+import db_phamarcie
+from benchmarks._commun import base_temporaire, remplir_base, remplir_ventes, afficher
+
+
+# Vérifie que les requêtes chaudes utilisent les index secondaires
+# (EXPLAIN QUERY PLAN) puis compare leur durée avec et sans index.
+#   python -m benchmarks.bench_index [nombre_de_ventes]
+
+REQUETES = {
+    "ventes par date": (
+        "SELECT id, prix_total FROM vente WHERE date_vente BETWEEN ? AND ?",
+        ("2022-03-01", "2022-03-08"), "idx_vente_date"),
+    "ventes par client": (
+        "SELECT id, prix_total FROM vente WHERE id_client = ?", (42,), "idx_vente_client"),
+    "ventes par médicament": (
+        "SELECT id, prix_total FROM vente WHERE id_medicament = ?", (42,), "idx_vente_medicament"),
+    "stock expirant": (
+        "SELECT id, nom FROM medicaments WHERE date_expiration <= ?", ("2023-01-31",),
+        "idx_medicaments_expiration"),
+    "fetch_ventes (jointure)": (
+        """SELECT v.id, m.nom, c.nom, c.prenom, v.quantite, v.prix_total, v.date_vente
+           FROM vente v
+           LEFT JOIN medicaments m ON v.id_medicament = m.id
+           LEFT JOIN clients c ON v.id_client = c.id
+           WHERE v.date_vente >= ?""", ("2024-12-01",), "idx_vente_date"),
+}
+
+
+def plan(conn, sql, params):
+    return [r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def verifier_plans(conn):
+    erreurs = []
+    for nom, (sql, params, index) in REQUETES.items():
+        details = plan(conn, sql, params)
+        if not any(index in d for d in details):
+            erreurs.append(f"{nom}: {index} absent du plan {details}")
+    return erreurs
+
+
+def chronometrer(conn, repetitions=20):
+    res = {}
+    for nom, (sql, params, _) in REQUETES.items():
+        t0 = time.perf_counter()
+        for _ in range(repetitions):
+            conn.execute(sql, params).fetchall()
+        res[nom] = (time.perf_counter() - t0) / repetitions * 1000
+    return res
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with base_temporaire() as path:
+        remplir_base(path, n_meds=5000, n_clients=20000)
+        conn = crud.connect_db()
+        conn.execute("UPDATE medicaments SET date_expiration = date('2023-01-01', '+' || (id % 1500) || ' days')")
+        conn.commit()
+        remplir_ventes(path, n, n_meds=5000, n_clients=20000)
+        conn.execute("ANALYZE")
+
+        erreurs = verifier_plans(conn)
+        for e in erreurs:
+            print("PLAN KO -", e)
+        avec = chronometrer(conn)
+
+        for nom in db_phamarcie.INDEX:
+            conn.execute(f"DROP INDEX {nom}")
+        conn.execute("ANALYZE")
+        sans = chronometrer(conn, repetitions=3)
+        conn.close()
+
+    afficher(f"Requêtes sur {n} ventes (ms par requête, sans -> avec index)",
+             [(f"{nom} sans", sans[nom]) for nom in REQUETES] +
+             [(f"{nom} avec", avec[nom]) for nom in REQUETES])
+    if erreurs:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
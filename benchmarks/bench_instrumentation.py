@@ -0,0 +1,49 @@
+import crud
+import instrumentation
+from benchmarks._commun import base_temporaire, remplir_base, mesurer, afficher
+
+
+# Coût de l'instrumentation : appel nu, enveloppe désactivée, enveloppe active
+# (avec et sans comptage des requêtes SQL), puis rapport sur une charge réelle.
+#   python -m benchmarks.bench_instrumentation
+
+N = 1_000_000
+N_VENTES = 5000
+
+
+def _vide():
+    return None
+
+
+def main():
+    enveloppee = instrumentation.instrumente(_vide, nom="bench.vide")
+    resultats = [
+        ("appel nu (ns)", 1e9 / mesurer(_vide, N)),
+        ("enveloppe désactivée (ns)", 1e9 / mesurer(enveloppee, N)),
+    ]
+    instrumentation.activer()
+    resultats.append(("enveloppe active (ns)", 1e9 / mesurer(enveloppee, N // 10)))
+    instrumentation.desactiver()
+
+    with base_temporaire() as path:
+        remplir_base(path, n_meds=1000, n_clients=1000)
+        for mode, options in (("désactivée", None), ("active", {}), ("active + SQL", {"trace_sql": True})):
+            crud.close_db()   # nouvelles connexions : le trace callback suit l'état courant
+            if options is not None:
+                instrumentation.reinitialiser()
+                instrumentation.activer(**options)
+            i = iter(range(N_VENTES))
+            resultats.append((f"{mode}: enregistrer_vente (ops/s)",
+                              mesurer(lambda: crud.enregistrer_vente(next(i) % 1000 + 1, 1, 1), N_VENTES)))
+            instrumentation.desactiver()
+        afficher("Instrumentation", resultats)
+        print()
+        print(instrumentation.formater_rapport())
+        print()
+        for sql, n in instrumentation.requetes_frequentes(5):
+            print(f"  {n:>8}  {sql}")
+        crud.close_db()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import gc
+import sys
+import time
+import tracemalloc
+
+import crud
+from enregistrements import Enregistrement, Vente
+from benchmarks._commun import base_temporaire, remplir_base, remplir_ventes, afficher
+
+
+# Empreinte mémoire de l'historique des ventes chargé en entier, selon la
+# représentation : tuples sqlite3, dicts, objets à __slots__ (Vente) et
+# stockage par colonnes (enregistrements.Colonnes).
+#   python -m benchmarks.bench_memoire [nombre_de_ventes]
+
+
+def _dicts():
+    conn = crud.connect_db()
+    try:
+        return [dict(zip(Vente.__slots__, r)) for r in conn.execute(crud._SELECT_VENTES)]
+    finally:
+        conn.close()
+
+
+REPRESENTATIONS = (
+    ("tuple", lambda: crud.fetch_ventes()),
+    ("dict", _dicts),
+    ("__slots__", lambda: crud.fetch_ventes(forme="enregistrement")),
+    ("colonnes", lambda: crud.fetch_ventes(forme="colonnes")),
+)
+
+
+def _total_quantites(lignes):
+    if isinstance(lignes, list) and lignes and isinstance(lignes[0], dict):
+        return sum(r["quantite"] for r in lignes)
+    if hasattr(lignes, "colonne"):
+        return sum(lignes.colonne("quantite"))
+    if lignes and isinstance(lignes[0], Enregistrement):
+        return sum(r.quantite for r in lignes)
+    return sum(r[4] for r in lignes)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with base_temporaire() as path:
+        remplir_base(path, n_meds=2000, n_clients=5000)
+        remplir_ventes(path, n, n_meds=2000, n_clients=5000)
+        for nom, charger in REPRESENTATIONS:
+            gc.collect()
+            t0 = time.perf_counter()
+            lignes = charger()
+            chargement = time.perf_counter() - t0
+            t0 = time.perf_counter()
+            _total_quantites(lignes)
+            parcours = time.perf_counter() - t0
+            del lignes
+            gc.collect()
+
+            tracemalloc.start()
+            lignes = charger()
+            retenue, pic = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            del lignes
+            afficher(f"{nom} ({n} ventes)", [
+                ("mémoire retenue (Mo)", retenue / 1e6),
+                ("pic pendant le chargement (Mo)", pic / 1e6),
+                ("octets par ligne", retenue / n),
+                ("chargement (ms)", chargement * 1000),
+                ("somme des quantités (ms)", parcours * 1000),
+            ])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import random
+
+import crud
+from benchmarks._commun import base_temporaire, remplir_base, mesurer, afficher
+
+
+# Ordonnance de LIGNES médicaments : une transaction par ligne
+# (crud.enregistrer_vente en boucle) contre crud.enregistrer_panier.
+#   python -m benchmarks.bench_panier
+
+PANIERS = 300
+LIGNES = 8
+
+
+def main():
+    resultats = []
+    for profil in ("comptoir", "equilibre"):
+        with base_temporaire(profil) as path:
+            remplir_base(path, n_meds=1000, n_clients=1000)
+            rnd = random.Random(3)
+
+            def panier():
+                return [(rnd.randint(1, 1000), rnd.randint(1, 3)) for _ in range(LIGNES)], rnd.randint(1, 1000)
+
+            def par_ligne():
+                lignes, cli = panier()
+                for id_med, qte in lignes:
+                    crud.enregistrer_vente(id_med, cli, qte, "bench")
+
+            def en_lot():
+                lignes, cli = panier()
+                crud.enregistrer_panier(lignes, cli, "bench")
+
+            resultats.append((f"{profil}: par ligne (paniers/s)", mesurer(par_ligne, PANIERS)))
+            resultats.append((f"{profil}: enregistrer_panier (paniers/s)", mesurer(en_lot, PANIERS)))
+    afficher(f"Paniers de {LIGNES} lignes", resultats)
+
+
+if __name__ == "__main__":
+    main()
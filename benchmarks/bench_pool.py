@@ -0,0 +1,48 @@
+import random
+import sqlite3
+
+import crud
+from benchmarks._commun import base_temporaire, remplir_base, mesurer, afficher
+
+
+# Compare le pool de connexions à l'ancien connect_db() (ouverture +
+# PRAGMA + fermeture à chaque appel).
+#   python -m benchmarks.bench_pool
+
+N = 2000
+
+
+def _connect_db_ancien():
+    conn = sqlite3.connect(crud.DB)
+    conn.execute("PRAGMA foreign_keys = ON;")
+    return conn
+
+
+def main():
+    with base_temporaire() as path:
+        remplir_base(path, n_meds=500, n_clients=500)
+        rnd = random.Random(1)
+
+        def lecture():
+            crud.fetch_medicaments()
+
+        def vente():
+            crud.enregistrer_vente(rnd.randint(1, 500), rnd.randint(1, 500), 1, "bench")
+
+        resultats = []
+        for mode in ("ancien", "pool"):
+            original = crud.connect_db
+            if mode == "ancien":
+                crud.connect_db = _connect_db_ancien
+            try:
+                resultats.append((f"{mode}: ouverture seule (ops/s)",
+                                  mesurer(lambda: crud.connect_db().close(), N)))
+                resultats.append((f"{mode}: fetch_medicaments (ops/s)", mesurer(lecture, N // 10)))
+                resultats.append((f"{mode}: enregistrer_vente (ops/s)", mesurer(vente, N // 4)))
+            finally:
+                crud.connect_db = original
+        afficher("Pool de connexions", resultats)
+
+
+if __name__ == "__main__":
+    main()
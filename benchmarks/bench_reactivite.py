@@ -0,0 +1,69 @@
+import sys
+import time
+import tkinter as tk
+
+import crud
+from db_worker import ExecuteurDB, SondeLatence
+from benchmarks._commun import base_temporaire, remplir_base, remplir_ventes, afficher
+
+
+# Réactivité de la boucle Tk pendant des lectures lourdes : appels crud sur
+# le thread Tk (ancien comportement) contre appels via ExecuteurDB.
+# Nécessite un affichage.
+#   python -m benchmarks.bench_reactivite [nombre_de_ventes]
+
+DUREE = 5.0
+
+
+def _phase(root, lancer):
+    sonde = SondeLatence(root)
+    fin = time.perf_counter() + DUREE
+    sonde.demarrer()
+    lancer(fin)
+    while time.perf_counter() < fin:
+        root.update()
+        time.sleep(0.001)
+    sonde.arreter()
+    return sonde.rapport()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Pas d'affichage disponible : {e}")
+        return
+    with base_temporaire() as path:
+        remplir_base(path, n_meds=2000, n_clients=5000)
+        remplir_ventes(path, n, n_meds=2000, n_clients=5000)
+
+        def synchrone(fin):
+            def tour():
+                if time.perf_counter() < fin:
+                    crud.fetch_ventes()
+                    root.after(50, tour)
+            root.after(50, tour)
+
+        executeur = ExecuteurDB(root)
+
+        def en_fond(fin):
+            def tour():
+                if time.perf_counter() < fin:
+                    executeur.soumettre(crud.fetch_ventes, succes=lambda r: root.after(50, tour),
+                                        cle="lecture")
+            tour()
+
+        sync = _phase(root, synchrone)
+        fond = _phase(root, en_fond)
+        executeur.arreter()
+    root.destroy()
+    resultats = []
+    for nom, r in (("thread Tk", sync), ("ExecuteurDB", fond)):
+        for cle in ("p50_ms", "p99_ms", "max_ms"):
+            resultats.append((f"{nom}: retard {cle}", r.get(cle, 0.0)))
+    afficher(f"Retard de la boucle Tk pendant fetch_ventes() sur {n} ventes", resultats)
+
+
+if __name__ == "__main__":
+    main()
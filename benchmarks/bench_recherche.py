@@ -0,0 +1,91 @@
+import random
+import time
+
+import crud
+from benchmarks._commun import base_temporaire, afficher
+
+
+# Recherche de médicaments sur un catalogue de 100 000 produits : FTS5
+# (crud.rechercher_medicaments, classée par bm25) contre LIKE '%...%' sur nom,
+# description et code-barres. LIKE s'arrête dès LIMIT lignes trouvées : il
+# est rapide sur un préfixe très courant, mais parcourt toute la table quand
+# il y a peu ou pas de correspondances.
+#   python -m benchmarks.bench_recherche
+
+N_MEDS = 100_000
+N_REQUETES = 200
+SYLLABES = ("pa", "ra", "ce", "ta", "mol", "ibu", "pro", "fene", "dol", "ami", "xi", "cil",
+            "line", "lor", "ata", "di", "ne", "zol", "ome", "pra", "az", "an", "tal", "gine")
+FORMES = ("comprimé", "gélule", "sirop", "sachet", "effervescent", "pommade", "injectable")
+
+
+def _mot(rnd):
+    return "".join(rnd.choice(SYLLABES) for _ in range(rnd.randint(2, 4)))
+
+
+def _remplir(rnd):
+    lignes = []
+    for i in range(1, N_MEDS + 1):
+        nom = f"{_mot(rnd).capitalize()} {rnd.choice((100, 200, 250, 500, 1000))} mg"
+        desc = f"{_mot(rnd)} {rnd.choice(FORMES)} boîte de {rnd.randint(1, 60)}"
+        lignes.append((nom, f"{3400000000000 + i}", desc, 10, 5.0, "2099-12-31"))
+    conn = crud.connect_db()
+    conn.executemany("""
+        INSERT INTO medicaments (nom, code_barre, description, quantite, prix, date_expiration)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, lignes)
+    conn.commit()
+    conn.close()
+    return [l[0] for l in lignes]
+
+
+def _like(texte, limite=crud.RECHERCHE_LIMITE):
+    conn = crud.connect_db()
+    try:
+        motif = f"%{texte}%"
+        return conn.execute("""
+            SELECT id, nom, code_barre, quantite, prix, date_expiration FROM medicaments
+            WHERE nom LIKE ? OR description LIKE ? OR code_barre LIKE ? LIMIT ?
+        """, (motif, motif, motif, limite)).fetchall()
+    finally:
+        conn.close()
+
+
+def _latences(fn, requetes):
+    mesures = []
+    for q in requetes:
+        t0 = time.perf_counter()
+        fn(q)
+        mesures.append((time.perf_counter() - t0) * 1000)
+    mesures.sort()
+    return mesures[len(mesures) // 2], mesures[int(len(mesures) * 0.99)]
+
+
+def main():
+    rnd = random.Random(7)
+    with base_temporaire() as path:
+        t0 = time.perf_counter()
+        noms = _remplir(rnd)
+        resultats = [("insertion + indexation (s)", time.perf_counter() - t0)]
+        # frappe progressive : 2, 3, 4 puis 6 premières lettres d'un nom existant
+        for n in (2, 3, 4, 6):
+            requetes = [rnd.choice(noms)[:n] for _ in range(N_REQUETES)]
+            for mode, fn in (("fts5", crud.rechercher_medicaments), ("like", _like)):
+                p50, p99 = _latences(fn, requetes)
+                resultats.append((f"{mode}, {n} lettres: p50 (ms)", p50))
+                resultats.append((f"{mode}, {n} lettres: p99 (ms)", p99))
+        requetes = [f"{rnd.choice(noms)[:4]} {rnd.choice(FORMES)[:3]}" for _ in range(N_REQUETES)]
+        p50, p99 = _latences(crud.rechercher_medicaments, requetes)
+        resultats.append(("fts5, deux mots: p50 (ms)", p50))
+        resultats.append(("fts5, deux mots: p99 (ms)", p99))
+        # aucun résultat : LIKE doit parcourir toute la table
+        for mode, fn in (("fts5", crud.rechercher_medicaments), ("like", _like)):
+            p50, p99 = _latences(fn, ["introuvable"] * 20)
+            resultats.append((f"{mode}, sans résultat: p50 (ms)", p50))
+        p50, p99 = _latences(crud.rechercher_medicaments, [f"34000000{rnd.randint(10, 99)}" for _ in range(50)])
+        resultats.append(("fts5, préfixe code-barres: p50 (ms)", p50))
+    afficher(f"Recherche sur {N_MEDS} médicaments", resultats)
+
+
+if __name__ == "__main__":
+    main()
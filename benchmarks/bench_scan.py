@@ -0,0 +1,95 @@
+import random
+import threading
+import time
+
+import crud
+import commit_groupe
+from benchmarks._commun import base_temporaire, remplir_base, afficher
+
+
+# Rejeu d'une rafale de scans de codes-barres : codes populaires (zipf), 2 %
+# de codes inconnus, quelques produits en rupture. Mesure la résolution seule
+# (index en mémoire), la vente complète par scan, et la vente par scan sur
+# plusieurs caisses, une transaction par vente puis avec commit groupé
+# (profil « comptoir », synchronous=FULL). Le commit groupé ne se compare qu'à
+# plusieurs caisses : une caisse seule n'a rien à regrouper.
+#   python -m benchmarks.bench_scan
+
+N_MEDS = 10000
+N_SCANS = 5000
+CAISSES = 8
+
+
+def _rafale(n, seed=1):
+    rnd = random.Random(seed)
+    poids = [1 / i for i in range(1, N_MEDS + 1)]
+    scans = []
+    for i in rnd.choices(range(1, N_MEDS + 1), weights=poids, k=n):
+        scans.append(f"{3400000000000 + i}" if rnd.random() > 0.02 else f"{2000000000000 + i}")
+    return scans
+
+
+def _rejouer(scans):
+    refus = 0
+    for code in scans:
+        try:
+            crud.vendre_par_code(code, 1, 1, "bench")
+        except ValueError:
+            refus += 1
+    return refus
+
+
+def _caisses(scans):
+    parts = [scans[i::CAISSES] for i in range(CAISSES)]
+    threads = [threading.Thread(target=_rejouer, args=(p,)) for p in parts]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return time.perf_counter() - t0
+
+
+def main():
+    scans = _rafale(N_SCANS)
+    resultats = []
+    with base_temporaire("comptoir") as path:
+        remplir_base(path, n_meds=N_MEDS, n_clients=100)
+        conn = crud.connect_db()
+        conn.execute("UPDATE medicaments SET quantite = 0 WHERE id % 500 = 0")
+        conn.commit()
+        conn.close()
+
+        t0 = time.perf_counter()
+        index = crud.index_codes()
+        resultats.append(("chargement de l'index (ms)", (time.perf_counter() - t0) * 1000))
+
+        t0 = time.perf_counter()
+        for code in scans:
+            index.chercher(code)
+        dt = time.perf_counter() - t0
+        resultats.append(("résolution seule: scans/s", N_SCANS / dt))
+        resultats.append(("résolution seule: µs/scan", dt / N_SCANS * 1e6))
+
+        t0 = time.perf_counter()
+        refus = _rejouer(scans)
+        dt = time.perf_counter() - t0
+        resultats.append(("vente par scan: scans/s", N_SCANS / dt))
+        resultats.append(("vente par scan: µs/scan", dt / N_SCANS * 1e6))
+        resultats.append(("vente par scan: refus", refus))
+
+        # plusieurs caisses en parallèle
+        dt = _caisses(scans)
+        resultats.append((f"{CAISSES} caisses, un commit par vente: scans/s", N_SCANS / dt))
+        commit_groupe.activer()
+        try:
+            dt = _caisses(scans)
+        finally:
+            commit_groupe.desactiver()
+        resultats.append((f"{CAISSES} caisses, commit groupé: scans/s", N_SCANS / dt))
+        crud.close_db()
+    afficher("Vente par scan de code-barres", resultats)
+
+
+if __name__ == "__main__":
+    main()
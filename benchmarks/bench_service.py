@@ -0,0 +1,70 @@
+import asyncio
+import random
+import sys
+import time
+
+from service import ServicePharmacie
+from benchmarks._commun import base_temporaire, remplir_base, remplir_ventes, afficher
+
+
+# Générateur de charge local pour le service asyncio : CAISSES clients
+# concurrents, 80 % de lectures (fiche produit, fiche client, page de ventes)
+# et 20 % de ventes. Rapporte latences p50/p99 et débit.
+#   python -m benchmarks.bench_service [caisses] [durée_s]
+
+
+async def caisse(service, rnd, fin, latences, erreurs):
+    while time.perf_counter() < fin:
+        tirage = rnd.random()
+        t0 = time.perf_counter()
+        try:
+            if tirage < 0.4:
+                await service.get_medicament(rnd.randint(1, 2000))
+                genre = "lecture"
+            elif tirage < 0.6:
+                await service.get_client(rnd.randint(1, 5000))
+                genre = "lecture"
+            elif tirage < 0.8:
+                await service.fetch_ventes_page(limite=50, desc=True)
+                genre = "lecture"
+            else:
+                await service.enregistrer_vente(rnd.randint(1, 2000), rnd.randint(1, 5000), 1, "charge")
+                genre = "vente"
+        except ValueError:
+            erreurs.append(1)
+            continue
+        latences.setdefault(genre, []).append((time.perf_counter() - t0) * 1000)
+
+
+def _centile(valeurs, p):
+    v = sorted(valeurs)
+    return v[min(len(v) - 1, int(len(v) * p))] if v else 0.0
+
+
+async def charge(caisses, duree):
+    latences, erreurs = {}, []
+    async with ServicePharmacie() as service:
+        fin = time.perf_counter() + duree
+        await asyncio.gather(*(caisse(service, random.Random(i), fin, latences, erreurs)
+                               for i in range(caisses)))
+    return latences, erreurs
+
+
+def main():
+    caisses = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    duree = float(sys.argv[2]) if len(sys.argv) > 2 else 5.0
+    with base_temporaire("equilibre") as path:
+        remplir_base(path, n_meds=2000, n_clients=5000)
+        remplir_ventes(path, 100_000, n_meds=2000, n_clients=5000)
+        latences, erreurs = asyncio.run(charge(caisses, duree))
+    resultats = []
+    for genre, valeurs in sorted(latences.items()):
+        resultats.append((f"{genre}: opérations/s", len(valeurs) / duree))
+        resultats.append((f"{genre}: p50 (ms)", _centile(valeurs, 0.50)))
+        resultats.append((f"{genre}: p99 (ms)", _centile(valeurs, 0.99)))
+    resultats.append(("refus métier", len(erreurs)))
+    afficher(f"Service asyncio, {caisses} caisses, {duree:.0f} s", resultats)
+
+
+if __name__ == "__main__":
+    main()
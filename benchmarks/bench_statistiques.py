@@ -0,0 +1,93 @@
+import sys
+import time
+
+import crud
+import statistiques
+from benchmarks._commun import base_temporaire, remplir_base, remplir_ventes, afficher
+
+
+# Rapports lus dans les cumuls journaliers (statistiques.py) contre le même
+# GROUP BY sur la table vente brute, et coût des triggers de cumul à l'insertion.
+#   python -m benchmarks.bench_statistiques [nb_ventes]
+
+N_VENTES = 2_000_000
+REPETITIONS = 5
+
+_BRUT = {
+    "jour": """
+        SELECT date(date_vente), COUNT(*), SUM(quantite), ROUND(SUM(prix_total), 2)
+        FROM vente WHERE date_vente >= ? AND date_vente < date(?, '+1 day') GROUP BY 1 ORDER BY 1
+    """,
+    "medicament": """
+        SELECT v.id_medicament, m.nom, COUNT(*), SUM(v.quantite), ROUND(SUM(v.prix_total), 2)
+        FROM vente v LEFT JOIN medicaments m ON m.id = v.id_medicament
+        WHERE v.date_vente >= ? AND v.date_vente < date(?, '+1 day')
+        GROUP BY v.id_medicament ORDER BY SUM(v.prix_total) DESC
+    """,
+    "pharmacien": """
+        SELECT IFNULL(pharmacien, ''), COUNT(*), SUM(quantite), ROUND(SUM(prix_total), 2)
+        FROM vente WHERE date_vente >= ? AND date_vente < date(?, '+1 day')
+        GROUP BY 1 ORDER BY SUM(prix_total) DESC
+    """,
+}
+
+PERIODES = (("1 mois", "2023-03-01", "2023-03-31"), ("1 an", "2023-01-01", "2023-12-31"),
+            ("5 ans", "2020-01-01", "2024-12-31"))
+
+
+def _chrono(fn):
+    t0 = time.perf_counter()
+    for _ in range(REPETITIONS):
+        res = fn()
+    return (time.perf_counter() - t0) / REPETITIONS * 1000, res
+
+
+def _brut(regroupement, debut, fin):
+    conn = crud.connect_db()
+    try:
+        return conn.execute(_BRUT[regroupement], (debut, fin)).fetchall()
+    finally:
+        conn.close()
+
+
+def _debit_insertion(avec_cumuls):
+    with base_temporaire() as path:
+        remplir_base(path, n_meds=1000, n_clients=1000)
+        if not avec_cumuls:
+            conn = crud.connect_db()
+            for t in ("i", "d", "u"):
+                conn.execute(f"DROP TRIGGER trg_ventes_jour_{t}")
+            conn.commit()
+            conn.close()
+        t0 = time.perf_counter()
+        remplir_ventes(path, 200_000)
+        return 200_000 / (time.perf_counter() - t0)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else N_VENTES
+    resultats = [
+        ("insertion sans cumuls (ventes/s)", _debit_insertion(False)),
+        ("insertion avec cumuls (ventes/s)", _debit_insertion(True)),
+    ]
+    with base_temporaire() as path:
+        remplir_base(path, n_meds=1000, n_clients=1000)
+        remplir_ventes(path, n)
+        conn = crud.connect_db()
+        resultats.append(("lignes de cumul", conn.execute("SELECT COUNT(*) FROM ventes_jour").fetchone()[0]))
+        conn.close()
+        for nom, debut, fin in PERIODES:
+            for regroupement in statistiques.REGROUPEMENTS:
+                ms_brut, brut = _chrono(lambda: _brut(regroupement, debut, fin))
+                ms_cumul, cumul = _chrono(lambda: statistiques.rapport(regroupement, debut, fin))
+                assert len(brut) == len(cumul)
+                resultats.append((f"{nom}, par {regroupement}: brut (ms)", ms_brut))
+                resultats.append((f"{nom}, par {regroupement}: cumuls (ms)", ms_cumul))
+        t0 = time.perf_counter()
+        statistiques.reconstruire()
+        resultats.append(("reconstruction complète (s)", time.perf_counter() - t0))
+    afficher(f"Rapports sur {n} ventes", resultats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import random
+import sqlite3
+import threading
+import time
+
+import crud
+import stockage
+from benchmarks._commun import base_temporaire, remplir_base, afficher
+
+
+# Contention lecture/écriture selon le profil de stockage : un thread
+# enregistre des ventes pendant que plusieurs lecteurs rafraîchissent
+# fetch_ventes(), comme les boutons « Actualiser » de l'interface.
+#   python -m benchmarks.bench_stockage
+
+DUREE = 3.0
+LECTEURS = 3
+
+
+def _scenario(profil):
+    with base_temporaire(profil) as path:
+        remplir_base(path, n_meds=200, n_clients=200)
+        for i in range(2000):
+            crud.enregistrer_vente(i % 200 + 1, i % 200 + 1, 1, "init")
+
+        fin = time.perf_counter() + DUREE
+        compteurs = {"ecritures": 0, "lectures": 0, "verrous": 0}
+        lock = threading.Lock()
+
+        def redacteur():
+            rnd = random.Random(0)
+            n = 0
+            while time.perf_counter() < fin:
+                try:
+                    crud.enregistrer_vente(rnd.randint(1, 200), rnd.randint(1, 200), 1, "bench")
+                    n += 1
+                except (ValueError, sqlite3.OperationalError):
+                    with lock:
+                        compteurs["verrous"] += 1
+            with lock:
+                compteurs["ecritures"] += n
+
+        def lecteur():
+            n = 0
+            while time.perf_counter() < fin:
+                try:
+                    crud.fetch_ventes()
+                    n += 1
+                except sqlite3.OperationalError:
+                    with lock:
+                        compteurs["verrous"] += 1
+            with lock:
+                compteurs["lectures"] += n
+
+        threads = [threading.Thread(target=redacteur)]
+        threads += [threading.Thread(target=lecteur) for _ in range(LECTEURS)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return compteurs
+
+
+def main():
+    resultats = []
+    for profil in stockage.PROFILS:
+        c = _scenario(profil)
+        resultats.append((f"{profil}: ventes/s", c["ecritures"] / DUREE))
+        resultats.append((f"{profil}: lectures/s", c["lectures"] / DUREE))
+        resultats.append((f"{profil}: erreurs de verrou", c["verrous"]))
+    afficher("Profils de stockage (1 rédacteur, %d lecteurs)" % LECTEURS, resultats)
+
+
+if __name__ == "__main__":
+    main()
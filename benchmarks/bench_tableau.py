@@ -0,0 +1,74 @@
+import sys
+import time
+import tkinter as tk
+from tkinter import ttk
+
+import crud
+from tableau_virtuel import TableauVirtuel
+from benchmarks._commun import base_temporaire, remplir_base, remplir_ventes, afficher
+
+
+# Temps d'actualisation de l'onglet Ventes : rechargement complet du
+# Treeview (ancien afficher_ventes) contre le tableau virtualisé.
+# Nécessite un affichage (X11/Windows/macOS).
+#   python -m benchmarks.bench_tableau [--complet]
+# --complet mesure aussi l'ancien mode à 1M lignes (très lent).
+
+TAILLES = (10_000, 100_000, 1_000_000)
+COLONNES = ("ID", "Médicament", "Nom Client", "Prénom", "Quantité", "Total", "Date")
+
+
+def actualisation_complete(tree):
+    tree.delete(*tree.get_children())
+    for r in crud.fetch_ventes():
+        tree.insert("", "end", values=r)
+
+
+def chrono(fn, root):
+    t0 = time.perf_counter()
+    fn()
+    root.update_idletasks()
+    return time.perf_counter() - t0
+
+
+def main():
+    complet = "--complet" in sys.argv
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Pas d'affichage disponible : {e}")
+        return
+    root.geometry("1200x650")
+    resultats = []
+    for n in TAILLES:
+        with base_temporaire() as path:
+            remplir_base(path, n_meds=2000, n_clients=5000)
+            remplir_ventes(path, n, n_meds=2000, n_clients=5000)
+
+            if complet or n <= 100_000:
+                frame = ttk.Frame(root)
+                frame.pack(fill="both", expand=True)
+                tree = ttk.Treeview(frame, columns=COLONNES, show="headings")
+                tree.pack(fill="both", expand=True)
+                root.update()
+                resultats.append((f"{n} lignes, complet (s)", chrono(lambda: actualisation_complete(tree), root)))
+                frame.destroy()
+
+            frame = ttk.Frame(root)
+            frame.pack(fill="both", expand=True)
+            scroll = ttk.Scrollbar(frame, orient="vertical")
+            vt = TableauVirtuel(frame, lambda: crud.fetch_ventes_ids(desc=True), crud.fetch_ventes_par_ids,
+                                scrollbar=scroll, columns=COLONNES)
+            scroll.pack(side="right", fill="y")
+            vt.pack(side="left", fill="both", expand=True)
+            root.update()
+            resultats.append((f"{n} lignes, virtuel (s)", chrono(vt.actualiser, root)))
+            resultats.append((f"{n} lignes, virtuel, défilement x100 (s)",
+                              chrono(lambda: [vt.defiler(40) for _ in range(100)], root)))
+            frame.destroy()
+    root.destroy()
+    afficher("Actualisation de l'onglet Ventes", resultats)
+
+
+if __name__ == "__main__":
+    main()
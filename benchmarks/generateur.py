@@ -0,0 +1,291 @@
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from bisect import bisect
+from contextlib import contextmanager
+from datetime import date, timedelta
+from itertools import accumulate
+
+import crud
+import db_phamarcie
+
+
+# Générateur de données de pharmacie synthétiques et reproductibles.
+#
+# Même graine et même volume => mêmes données (hors horodatages de création) :
+#   - médicaments : noms (molécule, dosage, forme), codes EAN-13 valides,
+#     prix log-normaux, stocks, seuils d'alerte, quelques produits périmés
+#   - clients : noms et prénoms courants, naissances, téléphones, n° d'assurance
+#   - ventes : popularité zipfienne des produits, clients fidèles, horaires
+#     d'ouverture (pics matin et fin d'après-midi), dimanches creux, dates
+#     croissantes sur la période, 1 à 3 boîtes le plus souvent
+#
+# Les bases générées sont gardées dans CACHE (clé : volume + graine + version du
+# schéma, une migration invalide donc le cache) et copiées
+# dans un dossier temporaire pour chaque utilisation :
+#   with base_generee(1_000_000) as infos:
+#       ...            # crud.DB pointe sur la copie
+#
+#   python -m benchmarks.generateur 10M [graine]   # prépare le cache
+
+CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".donnees")
+VOLUMES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+LOT = 50_000
+JOURS = 3 * 365   # période couverte par les ventes, jusqu'à hier
+
+MOLECULES = (
+    "Paracétamol", "Ibuprofène", "Amoxicilline", "Oméprazole", "Metformine", "Amlodipine",
+    "Atorvastatine", "Lévothyroxine", "Salbutamol", "Cétirizine", "Loratadine", "Diclofénac",
+    "Tramadol", "Prednisolone", "Azithromycine", "Clopidogrel", "Ramipril", "Bisoprolol",
+    "Furosémide", "Simvastatine", "Pantoprazole", "Sertraline", "Escitalopram", "Métoclopramide",
+    "Dompéridone", "Lopéramide", "Phloroglucinol", "Acide acétylsalicylique", "Codéine",
+    "Fexofénadine", "Desloratadine", "Montélukast", "Budésonide", "Fluticasone", "Insuline glargine",
+    "Gliclazide", "Losartan", "Valsartan", "Hydrochlorothiazide", "Spironolactone", "Warfarine",
+    "Apixaban", "Rivaroxaban", "Allopurinol", "Colchicine", "Alprazolam", "Zolpidem", "Vitamine D3",
+    "Fer", "Magnésium",
+)
+FORMES = ("comprimé", "comprimé pelliculé", "gélule", "sirop", "sachet", "suspension buvable",
+          "crème", "pommade", "collyre", "solution injectable", "spray nasal", "suppositoire")
+DOSAGES = ("5 mg", "10 mg", "20 mg", "25 mg", "40 mg", "50 mg", "100 mg", "200 mg", "250 mg",
+           "400 mg", "500 mg", "1 g")
+CONDITIONNEMENTS = (8, 10, 12, 14, 16, 20, 28, 30, 60, 90)
+LABORATOIRES = ("Sanofi", "Servier", "Pierre Fabre", "Biogaran", "Mylan", "Sandoz", "Teva",
+                "Arrow", "Zentiva", "EG Labo")
+
+NOMS = ("Martin", "Bernard", "Thomas", "Petit", "Robert", "Richard", "Durand", "Dubois", "Moreau",
+        "Laurent", "Simon", "Michel", "Lefebvre", "Leroy", "Roux", "David", "Bertrand", "Morel",
+        "Fournier", "Girard", "Bonnet", "Dupont", "Lambert", "Fontaine", "Rousseau", "Vincent",
+        "Muller", "Lefèvre", "Faure", "André", "Mercier", "Blanc", "Guérin", "Boyer", "Garnier",
+        "Chevalier", "François", "Legrand", "Gauthier", "Garcia", "Perrin", "Robin", "Clément",
+        "Morin", "Nicolas", "Henry", "Roussel", "Mathieu", "Gautier", "Masson", "Benali", "Haddad",
+        "Mansouri", "Khelifi", "Nguyen", "Ghalab")
+PRENOMS = ("Marie", "Jean", "Pierre", "Michel", "André", "Philippe", "Nathalie", "Isabelle",
+           "Sylvie", "Catherine", "Françoise", "Nicolas", "Christophe", "Stéphane", "Sandrine",
+           "Julien", "Camille", "Léa", "Manon", "Chloé", "Emma", "Lucas", "Hugo", "Louis", "Gabriel",
+           "Arthur", "Jade", "Louise", "Alice", "Inès", "Yasmine", "Karim", "Mohamed", "Sofia",
+           "Adam", "Lina", "Nour", "Rayan", "Sarah", "Thomas", "Lena")
+PHARMACIENS = ("Dr Lambert", "Dr Haddad", "Dr Moreau", "Dr Nguyen", "Dr Roussel", "Préparateur 1",
+               "Préparateur 2")
+# répartition des ventes par heure d'ouverture (8h-20h) et par jour (lundi..dimanche)
+POIDS_HEURES = (4, 9, 10, 9, 7, 5, 5, 6, 8, 10, 11, 9, 6)
+POIDS_JOURS = (1.0, 0.95, 0.95, 1.0, 1.1, 1.2, 0.25)
+ZIPF = 1.1
+
+
+def _ean13(base):
+    # base : 12 chiffres ; ajoute la clé de contrôle EAN-13
+    somme = sum(int(c) * (3 if i % 2 else 1) for i, c in enumerate(base))
+    return base + str((10 - somme % 10) % 10)
+
+
+def dimensions(n_ventes):
+    # (n_medicaments, n_clients) pour un volume de ventes : un catalogue d'officine,
+    # une clientèle qui grandit avec l'activité
+    n_meds = min(5000, max(500, n_ventes // 100))
+    n_clients = min(200_000, max(1000, n_ventes // 20))
+    return n_meds, n_clients
+
+
+class Generateur:
+    def __init__(self, n_meds, n_clients, seed=42, fin=None):
+        self.n_meds = n_meds
+        self.n_clients = n_clients
+        self.seed = seed
+        # fin de période fixée par l'appelant pour une base identique d'un jour à l'autre
+        self.fin = fin or date.today()
+        self.prix = []   # prix de chaque médicament, pour les ventes
+
+    def _rnd(self, flux):
+        # un flux aléatoire indépendant par table : le nombre de ventes ne
+        # change pas les médicaments ni les clients générés
+        return random.Random(f"{self.seed}:{flux}")
+
+    def medicaments(self):
+        # (nom, code_barre, description, quantite, prix, date_expiration, seuil_alerte)
+        rnd = self._rnd("medicaments")
+        self.prix = []
+        for i in range(1, self.n_meds + 1):
+            molecule = rnd.choice(MOLECULES)
+            forme = rnd.choice(FORMES)
+            nom = f"{molecule} {rnd.choice(LABORATOIRES)} {rnd.choice(DOSAGES)} {forme}"
+            prix = round(min(250.0, rnd.lognormvariate(1.9, 0.8)) + 0.5, 2)
+            self.prix.append(prix)
+            seuil = rnd.choice((5, 10, 10, 20, 50))
+            # la plupart bien approvisionnés, quelques ruptures proches du seuil
+            quantite = rnd.randint(0, seuil * 2) if rnd.random() < 0.05 else rnd.randint(seuil, 2000)
+            # ~2 % périmés, ~5 % à moins de 30 jours, le reste à 6 mois - 3 ans
+            r = rnd.random()
+            if r < 0.02:
+                jours = -rnd.randint(1, 90)
+            elif r < 0.07:
+                jours = rnd.randint(1, 30)
+            else:
+                jours = rnd.randint(180, 3 * 365)
+            expiration = (self.fin + timedelta(days=jours)).isoformat()
+            description = f"{molecule}, {forme}, boîte de {rnd.choice(CONDITIONNEMENTS)}"
+            yield (nom, _ean13(f"340{i:09d}"), description, quantite, prix, expiration, seuil)
+
+    def clients(self):
+        # (nom, prenom, naissance, phone, num_assurance)
+        rnd = self._rnd("clients")
+        for i in range(1, self.n_clients + 1):
+            naissance = (self.fin - timedelta(days=rnd.randint(18 * 365, 95 * 365))).isoformat()
+            phone = f"0{rnd.choice('67')}{rnd.randint(0, 99_999_999):08d}" if rnd.random() < 0.9 else ""
+            assurance = f"{rnd.choice('12')}{rnd.randint(0, 10 ** 13 - 1):013d}" if rnd.random() < 0.8 else ""
+            yield (rnd.choice(NOMS), rnd.choice(PRENOMS), naissance, phone, assurance)
+
+    def ventes(self, n, lot=LOT):
+        # lots de (id_medicament, id_client, quantite, prix_unitaire, prix_total,
+        # date_vente, pharmacien), dates croissantes
+        if not self.prix:
+            for _ in self.medicaments():
+                pass
+        rnd = self._rnd("ventes")
+        ids_meds = range(1, self.n_meds + 1)
+        cumul_meds = list(accumulate(1 / i ** ZIPF for i in ids_meds))
+        # l'ordre de popularité ne suit pas les id
+        rang = list(ids_meds)
+        rnd.shuffle(rang)
+        # 20 % des clients font ~60 % des passages ; ~15 % des ventes sans client
+        fideles = max(1, self.n_clients // 5)
+        debut = self.fin - timedelta(days=JOURS)
+        cumul_jours = list(accumulate(POIDS_JOURS[(debut + timedelta(days=j)).weekday()]
+                                      for j in range(JOURS)))
+        cumul_heures = list(accumulate(POIDS_HEURES))
+        total_jours = cumul_jours[-1]
+        fait = 0
+        while fait < n:
+            k = min(lot, n - fait)
+            # chaque lot couvre sa tranche de la période : dates croissantes d'un lot à l'autre
+            bas, haut = total_jours * fait / n, total_jours * (fait + k) / n
+            jours = sorted(bisect(cumul_jours, bas + rnd.random() * (haut - bas)) for _ in range(k))
+            meds = rnd.choices(rang, cum_weights=cumul_meds, k=k)
+            heures = rnd.choices(range(8, 21), cum_weights=cumul_heures, k=k)
+            lignes = []
+            for j, med, heure in zip(jours, meds, heures):
+                r = rnd.random()
+                if r < 0.15:
+                    client = None
+                elif r < 0.6:
+                    client = rnd.randint(1, fideles)
+                else:
+                    client = rnd.randint(1, self.n_clients)
+                qte = 1 if rnd.random() < 0.6 else rnd.randint(2, 3) if rnd.random() < 0.9 else rnd.randint(4, 10)
+                prix = self.prix[med - 1]
+                instant = f"{(debut + timedelta(days=min(j, JOURS - 1))).isoformat()} " \
+                          f"{heure:02d}:{rnd.randint(0, 59):02d}:{rnd.randint(0, 59):02d}"
+                lignes.append((med, client, qte, prix, round(prix * qte, 2), instant,
+                               rnd.choice(PHARMACIENS)))
+            lignes.sort(key=lambda l: l[5])
+            yield lignes
+            fait += k
+
+
+def generer(path, n_ventes, seed=42, n_meds=None, n_clients=None, fin=None, progression=None):
+    # crée (ou complète) la base `path` ; renvoie les paramètres de génération
+    defaut_meds, defaut_clients = dimensions(n_ventes)
+    gen = Generateur(n_meds or defaut_meds, n_clients or defaut_clients, seed, fin)
+    db_phamarcie.create_table(path)
+    conn = sqlite3.connect(path)
+    try:
+        conn.executemany("""
+            INSERT INTO medicaments (nom, code_barre, description, quantite, prix, date_expiration, seuil_alerte)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, gen.medicaments())
+        conn.executemany("""
+            INSERT INTO clients (nom, prenom, naissance, phone, num_assurance)
+            VALUES (?, ?, ?, ?, ?)
+        """, gen.clients())
+        conn.commit()
+        fait = 0
+        for lignes in gen.ventes(n_ventes):
+            conn.executemany("""
+                INSERT INTO vente (id_medicament, id_client, quantite, prix_unitaire, prix_total, date_vente, pharmacien)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, lignes)
+            conn.commit()
+            fait += len(lignes)
+            if progression is not None:
+                progression(fait, n_ventes)
+        # comme au démarrage de l'application : le journal ne garde que la fin
+        conn.execute("DELETE FROM journal_modifications WHERE seq <= (SELECT MAX(seq) FROM journal_modifications) - 10000")
+        conn.commit()
+        conn.execute("ANALYZE")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    return {"ventes": n_ventes, "medicaments": gen.n_meds, "clients": gen.n_clients, "graine": seed,
+            "fin": gen.fin.isoformat()}
+
+
+def volume(texte):
+    # "100k", "1M", "250000"
+    if texte in VOLUMES:
+        return VOLUMES[texte]
+    texte = texte.lower().replace("_", "")
+    for suffixe, facteur in (("k", 1_000), ("m", 1_000_000)):
+        if texte.endswith(suffixe):
+            return int(float(texte[:-1]) * facteur)
+    return int(texte)
+
+
+def _chemin_cache(n_ventes, seed):
+    return os.path.join(CACHE, f"pharmacie-{n_ventes}-{seed}-v{db_phamarcie.SCHEMA_VERSION}.db")
+
+
+def preparer(n_ventes, seed=42, progression=None):
+    # chemin de la base de référence en cache, générée si absente ; la fin de
+    # période est fixe (1er janvier de l'année courante) pour qu'une base
+    # régénérée reste identique
+    chemin = _chemin_cache(n_ventes, seed)
+    if not os.path.exists(chemin):
+        os.makedirs(CACHE, exist_ok=True)
+        temporaire = chemin + ".tmp"
+        if os.path.exists(temporaire):
+            os.remove(temporaire)
+        generer(temporaire, n_ventes, seed, fin=date(date.today().year, 1, 1), progression=progression)
+        os.replace(temporaire, chemin)
+    return chemin
+
+
+@contextmanager
+def base_generee(n_ventes, seed=42, progression=None):
+    # copie de la base de référence dans un dossier temporaire ; crud.DB la désigne
+    source = preparer(n_ventes, seed, progression)
+    dossier = tempfile.mkdtemp(prefix="pharmacie_bench_")
+    path = os.path.join(dossier, "pharmacie.db")
+    shutil.copyfile(source, path)
+    ancien = crud.DB
+    crud.close_db()
+    crud.DB = path
+    try:
+        conn = sqlite3.connect(path)
+        try:
+            n_meds, n_clients = (conn.execute(f"SELECT MAX(id) FROM {t}").fetchone()[0]
+                                 for t in ("medicaments", "clients"))
+        finally:
+            conn.close()
+        yield {"path": path, "ventes": n_ventes, "medicaments": n_meds, "clients": n_clients, "graine": seed}
+    finally:
+        crud.close_db()
+        crud.DB = ancien
+        shutil.rmtree(dossier, ignore_errors=True)
+
+
+def main():
+    n = volume(sys.argv[1]) if len(sys.argv) > 1 else VOLUMES["100k"]
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 42
+    t0 = time.perf_counter()
+
+    def progression(fait, total):
+        print(f"\r  {fait}/{total} ventes", end="", flush=True)
+    chemin = preparer(n, seed, progression)
+    print(f"\n{chemin} ({os.path.getsize(chemin) / 1e6:.0f} Mo) en {time.perf_counter() - t0:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
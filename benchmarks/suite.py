@@ -0,0 +1,507 @@
+import argparse
+import hashlib
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import crud
+import instrumentation
+from benchmarks.generateur import base_generee, volume, ZIPF, MOLECULES, NOMS
+
+
+# Suite de benchmarks reproductible : mêmes données (benchmarks/generateur.py,
+# graine fixe), mêmes opérations (tirées avec la même graine), résultats en JSON.
+#
+#   python -m benchmarks.suite --ventes 1M
+#   python -m benchmarks.suite --ventes 1M --scenarios vente,fetch --repetitions 10
+#   python -m benchmarks.suite --ventes 1M --comparer benchmarks/resultats/avant.json
+#
+# Chaque scénario prépare ses arguments puis renvoie (nb_operations, tour) ;
+# tour() est exécuté une fois à blanc puis --repetitions fois, chronométré.
+# On compare la médiane par opération ; une hausse de plus de --seuil % est
+# signalée comme régression (code de sortie 1). Les comparaisons n'ont de sens
+# qu'entre deux exécutions sur la même machine (empreinte dans le JSON).
+#
+# Les scénarios s'exécutent dans l'ordre de déclaration sur une même copie de
+# la base (les ventes précèdent les lectures) : ne comparer que des exécutions
+# de la même sélection de scénarios.
+#
+# Les scénarios gui.* rejouent les rafraîchissements des onglets de main.py
+# (TableauVirtuel) et sont ignorés sans affichage.
+
+RESULTATS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resultats")
+FORMAT = 1
+SEUIL = 10.0
+
+SCENARIOS = {}
+
+
+def scenario(nom, gui=False):
+    def enregistrer(fn):
+        SCENARIOS[nom] = (fn, gui)
+        return fn
+    return enregistrer
+
+
+class Contexte:
+    def __init__(self, infos, seed, root=None):
+        self.n_ventes = infos["ventes"]
+        self.n_meds = infos["medicaments"]
+        self.n_clients = infos["clients"]
+        self.seed = seed
+        self.root = root
+        self._poids = None
+
+    def rnd(self, nom):
+        # un tirage indépendant par scénario : en lancer un sous-ensemble ne
+        # change pas les opérations des autres
+        return random.Random(f"{self.seed}:{nom}")
+
+    def medicaments(self, rnd, k):
+        # ids tirés selon la popularité (les petits ids ne sont pas favorisés)
+        if self._poids is None:
+            self._poids = [1 / i ** ZIPF for i in range(1, self.n_meds + 1)]
+        ids = list(range(1, self.n_meds + 1))
+        random.Random(self.seed).shuffle(ids)
+        return rnd.choices(ids, weights=self._poids, k=k)
+
+    def clients(self, rnd, k):
+        return [rnd.randint(1, self.n_clients) for _ in range(k)]
+
+
+def _reapprovisionner(ids, quantite):
+    # les ventes des scénarios ne doivent pas échouer faute de stock
+    conn = crud.connect_db()
+    try:
+        conn.executemany("UPDATE medicaments SET quantite = quantite + ? WHERE id = ?",
+                         [(quantite, i) for i in set(ids)])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# --- ventes ---
+
+@scenario("vente.enregistrer")
+def _vente_enregistrer(ctx):
+    n = 500
+    rnd = ctx.rnd("vente.enregistrer")
+    meds, clients = ctx.medicaments(rnd, n), ctx.clients(rnd, n)
+    _reapprovisionner(meds, 100_000)
+
+    def tour():
+        for m, c in zip(meds, clients):
+            crud.enregistrer_vente(m, c, 1, "Benchmark")
+    return n, tour
+
+
+@scenario("vente.panier")
+def _vente_panier(ctx):
+    n = 200
+    rnd = ctx.rnd("vente.panier")
+    paniers = [[(m, rnd.randint(1, 3)) for m in set(ctx.medicaments(rnd, 3))] for _ in range(n)]
+    clients = ctx.clients(rnd, n)
+    _reapprovisionner([m for p in paniers for m, _ in p], 100_000)
+
+    def tour():
+        for panier, c in zip(paniers, clients):
+            crud.enregistrer_panier(panier, c, "Benchmark")
+    return n, tour
+
+
+@scenario("vente.par_code")
+def _vente_par_code(ctx):
+    n = 500
+    rnd = ctx.rnd("vente.par_code")
+    meds = ctx.medicaments(rnd, n)
+    _reapprovisionner(meds, 100_000)
+    par_id = {r[0]: r[2] for r in crud.fetch_medicaments_par_ids(sorted(set(meds)))}
+    codes = [par_id[m] for m in meds]
+    clients = ctx.clients(rnd, n)
+
+    def tour():
+        for code, c in zip(codes, clients):
+            crud.vendre_par_code(code, c, 1, "Benchmark")
+    return n, tour
+
+
+# --- lectures ---
+
+@scenario("fetch.medicaments")
+def _fetch_medicaments(ctx):
+    return 1, crud.fetch_medicaments
+
+
+@scenario("fetch.clients")
+def _fetch_clients(ctx):
+    return 1, crud.fetch_clients
+
+
+@scenario("fetch.ventes")
+def _fetch_ventes(ctx):
+    if ctx.n_ventes > 1_000_000:
+        return None   # liste complète trop lourde : voir fetch.ventes_colonnes
+    return 1, crud.fetch_ventes
+
+
+@scenario("fetch.ventes_colonnes")
+def _fetch_ventes_colonnes(ctx):
+    return 1, lambda: crud.fetch_ventes(forme="colonnes")
+
+
+@scenario("fetch.ventes_pages")
+def _fetch_ventes_pages(ctx):
+    n = 20
+
+    def tour():
+        apres = None
+        for _ in range(n):
+            _, apres = crud.fetch_ventes_page(apres, desc=True)
+    return n, tour
+
+
+@scenario("fetch.ventes_ids")
+def _fetch_ventes_ids(ctx):
+    return 1, lambda: crud.fetch_ventes_ids(desc=True)
+
+
+@scenario("fetch.ventes_par_ids")
+def _fetch_ventes_par_ids(ctx):
+    # fenêtres de 100 lignes, comme un défilement du tableau des ventes
+    n = 200
+    rnd = ctx.rnd("fetch.ventes_par_ids")
+    fenetres = [list(range(d, d + 100)) for d in (rnd.randint(1, max(1, ctx.n_ventes - 100)) for _ in range(n))]
+
+    def tour():
+        for ids in fenetres:
+            crud.fetch_ventes_par_ids(ids)
+    return n, tour
+
+
+@scenario("fetch.ventes_filtrees")
+def _fetch_ventes_filtrees(ctx):
+    # historique d'un client, puis d'un médicament
+    n = 200
+    rnd = ctx.rnd("fetch.ventes_filtrees")
+    clients, meds = ctx.clients(rnd, n // 2), ctx.medicaments(rnd, n // 2)
+
+    def tour():
+        for c in clients:
+            crud.fetch_ventes_page(id_client=c)
+        for m in meds:
+            crud.fetch_ventes_page(id_medicament=m)
+    return n, tour
+
+
+@scenario("fetch.medicament_details")
+def _fetch_medicament_details(ctx):
+    n = 2000
+    meds = ctx.medicaments(ctx.rnd("fetch.medicament_details"), n)
+
+    def tour():
+        for m in meds:
+            crud.fetch_medicament_details(m)
+    return n, tour
+
+
+@scenario("fetch.recherche")
+def _fetch_recherche(ctx):
+    n = 200
+    rnd = ctx.rnd("fetch.recherche")
+    textes = [rnd.choice(MOLECULES)[:rnd.randint(3, 6)] for _ in range(n // 2)]
+    noms = [rnd.choice(NOMS)[:rnd.randint(2, 5)] for _ in range(n // 2)]
+
+    def tour():
+        for t in textes:
+            crud.rechercher_medicaments(t)
+        for t in noms:
+            crud.rechercher_clients(t)
+    return n, tour
+
+
+# --- modifications ---
+
+@scenario("modifier.medicament")
+def _modifier_medicament(ctx):
+    n = 500
+    rnd = ctx.rnd("modifier.medicament")
+    modifs = [(m, round(rnd.uniform(1, 80), 2)) for m in ctx.medicaments(rnd, n)]
+
+    def tour():
+        for m, prix in modifs:
+            crud.modifier_medicament(m, prix=prix)
+    return n, tour
+
+
+@scenario("modifier.client")
+def _modifier_client(ctx):
+    n = 500
+    rnd = ctx.rnd("modifier.client")
+    modifs = [(c, f"06{rnd.randint(0, 99_999_999):08d}") for c in ctx.clients(rnd, n)]
+
+    def tour():
+        for c, phone in modifs:
+            crud.modifier_client(c, phone=phone)
+    return n, tour
+
+
+# --- interface (TableauVirtuel, comme les onglets de main.py) ---
+
+def _tableau(ctx, charger_ids, charger_lignes, colonnes, decroissant=False):
+    from tkinter import ttk
+    from tableau_virtuel import TableauVirtuel
+    frame = ttk.Frame(ctx.root)
+    frame.pack(fill="both", expand=True)
+    scroll = ttk.Scrollbar(frame, orient="vertical")
+    tableau = TableauVirtuel(frame, charger_ids, charger_lignes, scrollbar=scroll,
+                             decroissant=decroissant, columns=colonnes)
+    scroll.pack(side="right", fill="y")
+    tableau.pack(side="left", fill="both", expand=True)
+    ctx.root.update()
+    return tableau
+
+
+def _actualiser(ctx, tableau):
+    def tour():
+        tableau.actualiser()
+        ctx.root.update_idletasks()
+    return 1, tour
+
+
+@scenario("gui.afficher_medicaments", gui=True)
+def _gui_medicaments(ctx):
+    return _actualiser(ctx, _tableau(ctx, crud.fetch_medicaments_ids, crud.fetch_medicaments_par_ids,
+                                     ("ID", "Nom", "Code-barre", "Quantité", "Prix", "Expiration")))
+
+
+@scenario("gui.afficher_clients", gui=True)
+def _gui_clients(ctx):
+    return _actualiser(ctx, _tableau(ctx, crud.fetch_clients_ids, crud.fetch_clients_par_ids,
+                                     ("ID", "Nom", "Prénom", "Naissance", "Téléphone", "Assurance")))
+
+
+_COLONNES_VENTES = ("ID", "Médicament", "Nom Client", "Prénom", "Quantité", "Total", "Date")
+
+
+@scenario("gui.afficher_ventes", gui=True)
+def _gui_ventes(ctx):
+    return _actualiser(ctx, _tableau(ctx, lambda: crud.fetch_ventes_ids(desc=True), crud.fetch_ventes_par_ids,
+                                     _COLONNES_VENTES, decroissant=True))
+
+
+@scenario("gui.defiler_ventes", gui=True)
+def _gui_defiler_ventes(ctx):
+    n = 100
+    tableau = _tableau(ctx, lambda: crud.fetch_ventes_ids(desc=True), crud.fetch_ventes_par_ids,
+                       _COLONNES_VENTES, decroissant=True)
+    tableau.actualiser()
+
+    def tour():
+        for i in range(n):
+            tableau.defiler(40 if i < n // 2 else -40)
+        ctx.root.update_idletasks()
+    return n, tour
+
+
+@scenario("gui.rafraichir_apres_vente", gui=True)
+def _gui_rafraichir(ctx):
+    # une vente puis le rafraîchissement incrémental de main.rafraichir_tableaux
+    n = 50
+    rnd = ctx.rnd("gui.rafraichir_apres_vente")
+    meds, clients = ctx.medicaments(rnd, n), ctx.clients(rnd, n)
+    _reapprovisionner(meds, 100_000)
+    tableaux = {
+        "medicaments": _tableau(ctx, crud.fetch_medicaments_ids, crud.fetch_medicaments_par_ids, ("ID", "Nom")),
+        "vente": _tableau(ctx, lambda: crud.fetch_ventes_ids(desc=True), crud.fetch_ventes_par_ids,
+                          _COLONNES_VENTES, decroissant=True),
+    }
+    for t in tableaux.values():
+        t.actualiser()
+    etat = {"seq": crud.dernier_changement()}
+
+    def tour():
+        for m, c in zip(meds, clients):
+            crud.enregistrer_vente(m, c, 1, "Benchmark")
+            seq, changements = crud.fetch_changements(etat["seq"])
+            etat["seq"] = max(etat["seq"], seq)
+            for table, tableau in tableaux.items():
+                if table in changements:
+                    tableau.appliquer_changements(*changements[table])
+            ctx.root.update_idletasks()
+    return n, tour
+
+
+# --- exécution ---
+
+def machine():
+    # empreinte de l'environnement : deux résultats ne se comparent que si elle est identique
+    infos = {
+        "systeme": platform.platform(),
+        "processeur": platform.processor() or platform.machine(),
+        "coeurs": os.cpu_count(),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "hote": hashlib.sha1(platform.node().encode()).hexdigest()[:12],
+    }
+    infos["empreinte"] = hashlib.sha1(json.dumps(infos, sort_keys=True).encode()).hexdigest()[:12]
+    return infos
+
+
+def _mesurer(nb, tour, repetitions):
+    tour()   # à blanc : caches, pages SQLite, imports
+    durees = []
+    for _ in range(repetitions):
+        t0 = time.perf_counter()
+        tour()
+        durees.append(time.perf_counter() - t0)
+    par_op = sorted(d / nb * 1000 for d in durees)
+    return {
+        "operations": nb,
+        "repetitions": repetitions,
+        "durees_s": [round(d, 6) for d in durees],
+        "mediane_ms": statistics.median(par_op),
+        "min_ms": par_op[0],
+        "max_ms": par_op[-1],
+        "ecart_type_ms": statistics.stdev(par_op) if len(par_op) > 1 else 0.0,
+        "ops_par_s": nb / statistics.median(durees) if statistics.median(durees) else float("inf"),
+    }
+
+
+def executer(n_ventes, seed=42, repetitions=5, selection=None, instrumenter=False, journal=print):
+    noms = [n for n in SCENARIOS if not selection or any(n == s or n.startswith(s + ".") for s in selection)]
+    root = None
+    if any(SCENARIOS[n][1] for n in noms):
+        try:
+            import tkinter as tk
+            root = tk.Tk()
+            root.geometry("1200x650")
+        except Exception as e:
+            journal(f"Pas d'affichage disponible, scénarios gui ignorés : {e}")
+
+    def progression(fait, total):
+        journal(f"  génération : {fait}/{total} ventes")
+
+    resultats = {}
+    with base_generee(n_ventes, seed, progression) as infos:
+        ctx = Contexte(infos, seed, root)
+        for nom in noms:
+            fn, gui = SCENARIOS[nom]
+            if gui and root is None:
+                continue
+            prepare = fn(ctx)
+            if prepare is None:
+                continue
+            if instrumenter:
+                instrumentation.reinitialiser()
+                instrumentation.activer()
+            try:
+                resultats[nom] = _mesurer(*prepare, repetitions)
+            finally:
+                if instrumenter:
+                    resultats.setdefault(nom, {})["instrumentation"] = instrumentation.rapport()
+                    instrumentation.desactiver()
+            if root is not None:
+                for enfant in root.winfo_children():
+                    enfant.destroy()
+            r = resultats[nom]
+            journal(f"  {nom:<32} {r['mediane_ms']:>10.3f} ms/op  {r['ops_par_s']:>10.1f} ops/s")
+    if root is not None:
+        root.destroy()
+    return {
+        "format": FORMAT,
+        "date": datetime.now().isoformat(timespec="seconds"),
+        "machine": machine(),
+        "parametres": {"ventes": n_ventes, "medicaments": infos["medicaments"], "clients": infos["clients"],
+                       "graine": seed, "repetitions": repetitions, "profil": crud.PROFIL,
+                       "cache_catalogue": crud.CACHE_CATALOGUE, "instrumentation": instrumenter},
+        "scenarios": resultats,
+    }
+
+
+def comparer(ancien, nouveau, seuil=SEUIL):
+    # [(scénario, médiane avant, médiane après, écart %, verdict)] et avertissements
+    avertissements = []
+    if ancien["machine"]["empreinte"] != nouveau["machine"]["empreinte"]:
+        avertissements.append("machines ou environnements différents : comparaison indicative")
+    a, n = dict(ancien["parametres"]), dict(nouveau["parametres"])
+    a.pop("repetitions", None), n.pop("repetitions", None)
+    if a != n:
+        avertissements.append(f"paramètres différents : {a} / {n}")
+    lignes = []
+    for nom, r in nouveau["scenarios"].items():
+        avant = ancien["scenarios"].get(nom)
+        if avant is None:
+            lignes.append((nom, None, r["mediane_ms"], None, "nouveau"))
+            continue
+        ecart = (r["mediane_ms"] - avant["mediane_ms"]) / avant["mediane_ms"] * 100 if avant["mediane_ms"] else 0.0
+        # un écart dans le bruit des deux séries n'est pas une régression
+        bruit = max(avant.get("ecart_type_ms", 0.0), r.get("ecart_type_ms", 0.0))
+        significatif = abs(r["mediane_ms"] - avant["mediane_ms"]) > 2 * bruit
+        if ecart > seuil and significatif:
+            verdict = "RÉGRESSION"
+        elif ecart < -seuil and significatif:
+            verdict = "amélioration"
+        else:
+            verdict = ""
+        lignes.append((nom, avant["mediane_ms"], r["mediane_ms"], ecart, verdict))
+    return lignes, avertissements
+
+
+def formater_comparaison(lignes, avertissements):
+    texte = [f"attention : {a}" for a in avertissements]
+    texte.append(f"{'scénario':<32} {'avant ms':>10} {'après ms':>10} {'écart':>8}")
+    for nom, avant, apres, ecart, verdict in lignes:
+        texte.append(f"{nom:<32} {avant if avant is not None else float('nan'):>10.3f} {apres:>10.3f} "
+                     f"{ecart if ecart is not None else float('nan'):>+7.1f}% {verdict}")
+    return "\n".join(texte)
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="python -m benchmarks.suite", description="Suite de benchmarks de la pharmacie")
+    p.add_argument("--ventes", default="100k", help="volume de ventes : 10k, 100k, 1M, 10M ou un nombre")
+    p.add_argument("--graine", type=int, default=42)
+    p.add_argument("--repetitions", type=int, default=5)
+    p.add_argument("--scenarios", default="", help="noms ou préfixes séparés par des virgules (vente,fetch,...)")
+    p.add_argument("--sortie", help="fichier JSON (défaut : benchmarks/resultats/<date>-<ventes>.json)")
+    p.add_argument("--comparer", help="résultats JSON de référence")
+    p.add_argument("--seuil", type=float, default=SEUIL, help="hausse en %% signalée comme régression")
+    p.add_argument("--instrumentation", action="store_true",
+                   help="ajoute le rapport d'instrumentation de chaque scénario au JSON")
+    p.add_argument("--liste", action="store_true", help="affiche les scénarios et quitte")
+    args = p.parse_args(argv)
+
+    if args.liste:
+        for nom, (_, gui) in SCENARIOS.items():
+            print(f"{nom}{'  (affichage requis)' if gui else ''}")
+        return 0
+
+    n = volume(args.ventes)
+    selection = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    print(f"Suite de benchmarks : {n} ventes, graine {args.graine}, {args.repetitions} répétitions")
+    res = executer(n, args.graine, args.repetitions, selection, args.instrumentation)
+
+    sortie = args.sortie or os.path.join(RESULTATS, f"{datetime.now():%Y%m%d-%H%M%S}-{args.ventes}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, "w", encoding="utf-8") as f:
+        json.dump(res, f, ensure_ascii=False, indent=2)
+    print(f"Résultats : {sortie}")
+
+    if args.comparer:
+        with open(args.comparer, encoding="utf-8") as f:
+            ancien = json.load(f)
+        lignes, avertissements = comparer(ancien, res, args.seuil)
+        print()
+        print(formater_comparaison(lignes, avertissements))
+        if any(l[4] == "RÉGRESSION" for l in lignes):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
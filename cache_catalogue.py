@@ -0,0 +1,219 @@
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+# Cache en lecture du catalogue des médicaments, indexé par id et par code-barres.
+#
+# - lecture « read-through » : une absence est lue en base puis mise en cache
+# - taille bornée, éviction LRU
+# - invalidation : le cache garde sa propre connexion, dont PRAGMA data_version
+#   change dès qu'une autre connexion valide une transaction. Dans ce cas
+#   seulement, il relit journal_modifications (alimenté par les triggers) et
+#   oublie les médicaments modifiés ou supprimés depuis sa dernière synchronisation.
+#
+# Les lignes ont l'ordre de COLONNES.
+
+TAILLE_MAX = 10000
+
+COLONNES = ("id", "nom", "code_barre", "description", "quantite", "prix", "date_expiration", "mise_a_jour",
+            "seuil_alerte")
+_SELECT = f"SELECT {', '.join(COLONNES)} FROM medicaments"
+
+TOUT = "tout"
+
+
+# Suivi des médicaments modifiés depuis la dernière consultation, partagé par
+# le cache et l'index des codes-barres.
+class SuiviJournal:
+    def __init__(self, conn):
+        self._conn = conn
+        self._version = None
+        self._seq = conn.execute("SELECT IFNULL(MAX(seq), 0) FROM journal_modifications").fetchone()[0]
+
+    def changements(self):
+        # ids modifiés ou supprimés depuis l'appel précédent, ou TOUT si le
+        # journal a été purgé au-delà de notre position
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._version:
+            return ()
+        self._version = version
+        # lecture cohérente du journal (une seule transaction de lecture)
+        self._conn.execute("BEGIN")
+        try:
+            rows = self._conn.execute("""
+                SELECT id_ligne FROM journal_modifications
+                WHERE seq > ? AND table_nom = 'medicaments'
+            """, (self._seq,)).fetchall()
+            # deux sous-requêtes : MIN et MAX dans le même SELECT parcourent toute la table
+            premier, dernier = self._conn.execute("""
+                SELECT IFNULL((SELECT MIN(seq) FROM journal_modifications), 0),
+                       IFNULL((SELECT MAX(seq) FROM journal_modifications), 0)
+            """).fetchone()
+        finally:
+            self._conn.execute("COMMIT")
+        purge = premier > self._seq + 1
+        self._seq = max(self._seq, dernier)
+        if purge:
+            return TOUT
+        return {r[0] for r in rows}
+
+
+class CacheCatalogue:
+    def __init__(self, path, taille_max=TAILLE_MAX):
+        self.path = path
+        self.taille_max = taille_max
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._lignes = OrderedDict()   # id -> ligne, ordre LRU
+        self._par_code = {}            # code_barre -> id (lignes en cache)
+        self._codes_absents = set()    # codes-barres connus comme inexistants
+        self._suivi = SuiviJournal(self._conn)
+        self.succes = 0
+        self.echecs = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    # --- synchronisation ---
+
+    def _synchroniser(self):
+        changes = self._suivi.changements()
+        if changes is TOUT:
+            self._vider()
+        elif changes:
+            for id_ligne in changes:
+                self._oublier(id_ligne)
+            # un ajout ou un changement de code-barres peut rendre un code existant
+            self._codes_absents.clear()
+
+    def _oublier(self, id_):
+        ligne = self._lignes.pop(id_, None)
+        if ligne is not None:
+            self._par_code.pop(ligne[2], None)
+            self.invalidations += 1
+
+    def _vider(self):
+        self.invalidations += len(self._lignes)
+        self._lignes.clear()
+        self._par_code.clear()
+        self._codes_absents.clear()
+
+    def _memoriser(self, ligne):
+        self._lignes[ligne[0]] = ligne
+        self._lignes.move_to_end(ligne[0])
+        if ligne[2] is not None:
+            self._par_code[ligne[2]] = ligne[0]
+        while len(self._lignes) > self.taille_max:
+            _, ancienne = self._lignes.popitem(last=False)
+            self._par_code.pop(ancienne[2], None)
+            self.evictions += 1
+
+    # --- lectures ---
+
+    def get(self, id_):
+        id_ = int(id_)
+        with self._lock:
+            self._synchroniser()
+            ligne = self._lignes.get(id_)
+            if ligne is not None:
+                self._lignes.move_to_end(id_)
+                self.succes += 1
+                return ligne
+            self.echecs += 1
+            ligne = self._conn.execute(_SELECT + " WHERE id = ?", (id_,)).fetchone()
+            if ligne is not None:
+                self._memoriser(ligne)
+            return ligne
+
+    def get_par_code(self, code_barre):
+        with self._lock:
+            self._synchroniser()
+            id_ = self._par_code.get(code_barre)
+            if id_ is not None:
+                self._lignes.move_to_end(id_)
+                self.succes += 1
+                return self._lignes[id_]
+            if code_barre in self._codes_absents:
+                self.succes += 1
+                return None
+            self.echecs += 1
+            ligne = self._conn.execute(_SELECT + " WHERE code_barre = ?", (code_barre,)).fetchone()
+            if ligne is not None:
+                self._memoriser(ligne)
+            else:
+                if len(self._codes_absents) >= self.taille_max:
+                    self._codes_absents.clear()
+                self._codes_absents.add(code_barre)
+            return ligne
+
+    def stats(self):
+        with self._lock:
+            total = self.succes + self.echecs
+            return {
+                "taille": len(self._lignes),
+                "succes": self.succes,
+                "echecs": self.echecs,
+                "taux_succes": self.succes / total if total else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def fermer(self):
+        with self._lock:
+            self._conn.close()
+
+
+# Index complet code-barres -> [id, prix, stock], préchargé en mémoire pour la
+# vente par scan. Synchronisé de la même façon que le cache : seules les lignes
+# modifiées depuis le dernier scan sont relues.
+class IndexCodesBarres:
+    def __init__(self, path):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self._suivi = SuiviJournal(self._conn)
+        self._par_code = {}
+        self._code_par_id = {}
+        self._charger()
+
+    def _charger(self):
+        self._par_code.clear()
+        self._code_par_id.clear()
+        for id_, code, prix, quantite in self._conn.execute(
+                "SELECT id, code_barre, prix, quantite FROM medicaments WHERE code_barre IS NOT NULL"):
+            self._par_code[code] = [id_, prix, quantite]
+            self._code_par_id[id_] = code
+
+    def _synchroniser(self):
+        changes = self._suivi.changements()
+        if changes is TOUT:
+            self._charger()
+            return
+        if not changes:
+            return
+        ids = list(changes)
+        for id_ in ids:
+            code = self._code_par_id.pop(id_, None)
+            if code is not None:
+                self._par_code.pop(code, None)
+        for i in range(0, len(ids), 900):
+            part = ids[i:i + 900]
+            for id_, code, prix, quantite in self._conn.execute(
+                    f"SELECT id, code_barre, prix, quantite FROM medicaments "
+                    f"WHERE id IN ({','.join('?' * len(part))}) AND code_barre IS NOT NULL", part):
+                self._par_code[code] = [id_, prix, quantite]
+                self._code_par_id[id_] = code
+
+    def chercher(self, code_barre):
+        # (id, prix, stock) ou None
+        with self._lock:
+            self._synchroniser()
+            entree = self._par_code.get(code_barre)
+            return tuple(entree) if entree is not None else None
+
+    def __len__(self):
+        return len(self._par_code)
+
+    def fermer(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,138 @@
+import queue
+import sqlite3
+import threading
+import time
+
+import crud
+
+
+# Commit groupé des ventes.
+#
+# En mode normal, chaque crud.enregistrer_vente paie son propre commit (et donc
+# son fsync). Une fois le mode activé, les ventes des différents appelants sont
+# mises en file et un thread unique les enregistre ensemble dans une seule
+# transaction, dès que `fenetre` secondes se sont écoulées ou que `taille_max`
+# ventes sont en attente. Chaque vente a son propre SAVEPOINT : un stock
+# insuffisant n'annule que la vente concernée, et chaque appelant reçoit son
+# propre résultat (True ou ValueError), comme en mode normal.
+#
+# Le lot prend aussi toutes les ventes déjà en file à la fin de la fenêtre.
+# Avec fenetre=0 (défaut), il n'y a aucune attente : les ventes arrivées
+# pendant le commit précédent forment le lot suivant.
+#
+# À n'activer qu'avec plusieurs caisses qui vendent en même temps. Avec un
+# seul appelant, chaque vente paie en plus le passage par le thread de commit
+# (environ 2x plus lent : python -m benchmarks.bench_commit_groupe 1). Une fenêtre
+# > 0 n'est utile que si un fsync coûte plus que la fenêtre (synchronous=FULL
+# sur disque lent) ; sinon elle ne fait qu'ajouter de la latence.
+#
+#   commit_groupe.activer(fenetre=0, taille_max=200)
+#   ...
+#   commit_groupe.desactiver()
+
+FENETRE = 0
+TAILLE_MAX = 200
+
+
+class _Demande:
+    def __init__(self, args):
+        self.args = args
+        self.fait = threading.Event()
+        self.erreur = None
+
+
+class CommitGroupe:
+    def __init__(self, fenetre=FENETRE, taille_max=TAILLE_MAX):
+        self.fenetre = fenetre
+        self.taille_max = taille_max
+        self._file = queue.Queue()
+        self._thread = threading.Thread(target=self._boucle, name="commit-groupe", daemon=True)
+        self._arrete = False
+        self.lots = 0
+        self.commits = 0
+        self.ventes = 0
+        self._thread.start()
+
+    def soumettre(self, id_med, id_cli, qte, pharmacien):
+        if self._arrete:
+            raise RuntimeError("Commit groupé arrêté.")
+        d = _Demande((id_med, id_cli, qte, pharmacien))
+        self._file.put(d)
+        d.fait.wait()
+        if d.erreur is not None:
+            raise d.erreur
+        return True
+
+    def arreter(self):
+        self._arrete = True
+        self._file.put(None)
+        self._thread.join()
+
+    def _boucle(self):
+        while True:
+            premiere = self._file.get()
+            if premiere is None:
+                return
+            lot = [premiere]
+            limite = time.perf_counter() + self.fenetre
+            fin = False
+            while len(lot) < self.taille_max:
+                reste = limite - time.perf_counter()
+                try:
+                    # fenêtre écoulée : on prend encore les ventes déjà en file
+                    d = self._file.get(timeout=reste) if reste > 0 else self._file.get_nowait()
+                except queue.Empty:
+                    break
+                if d is None:
+                    fin = True
+                    break
+                lot.append(d)
+            self._traiter(lot)
+            if fin:
+                return
+
+    def _traiter(self, lot):
+        conn = crud.connect_db()
+        cur = conn.cursor()
+        try:
+            # les SAVEPOINT s'imbriquent dans cette transaction : sans elle, chaque
+            # RELEASE validerait sa vente seule
+            cur.execute("BEGIN IMMEDIATE")
+            for d in lot:
+                cur.execute("SAVEPOINT vente")
+                try:
+                    crud._vendre(cur, *d.args)
+                    cur.execute("RELEASE vente")
+                except (ValueError, sqlite3.IntegrityError) as e:
+                    cur.execute("ROLLBACK TO vente")
+                    cur.execute("RELEASE vente")
+                    if isinstance(e, sqlite3.IntegrityError):
+                        e = ValueError("Erreur base (contrainte) : " + str(e))
+                    d.erreur = e
+            conn.commit()
+            self.commits += 1
+            self.lots += 1
+            self.ventes += len(lot)
+        except Exception as e:
+            # échec du commit lui-même : aucune vente du lot n'est enregistrée
+            if conn.in_transaction:
+                conn.rollback()
+            for d in lot:
+                if d.erreur is None:
+                    d.erreur = e
+        finally:
+            conn.close()
+            for d in lot:
+                d.fait.set()
+
+
+def activer(fenetre=FENETRE, taille_max=TAILLE_MAX):
+    desactiver()
+    crud._commit_groupe = CommitGroupe(fenetre, taille_max)
+    return crud._commit_groupe
+
+
+def desactiver():
+    groupe, crud._commit_groupe = crud._commit_groupe, None
+    if groupe is not None:
+        groupe.arreter()
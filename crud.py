@@ -1,33 +1,110 @@
+import re
 import sqlite3
+from array import array
 from datetime import datetime
+from functools import lru_cache
+import pool
+import stockage
+from cache_catalogue import CacheCatalogue, IndexCodesBarres
+from enregistrements import Medicament, Client, Vente, Colonnes
+import instrumentation
+from instrumentation import instrumente
 
 DB = "pharmacie.db"
-
+PROFIL = stockage.PROFIL_DEFAUT
+CACHE_CATALOGUE = True   # False : toutes les lectures du catalogue vont en base
+# Les opérations publiques sont décorées par @instrumente : sans coût notable
+# tant que instrumentation.activer() n'a pas été appelé (voir instrumentation.py).
+_cache = None
+_index_codes = None
+
+def _init_connexion(conn):
+    stockage.appliquer_profil(conn, PROFIL)
+    instrumentation.suivre_connexion(conn)
+
+@instrumente
 def connect_db():
-    conn = sqlite3.connect(DB)
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+    # connexion persistante empruntée au pool (conn.close() la restitue)
+    return pool.get_pool(DB, size=pool.POOL_SIZE, init=_init_connexion).acquire()
+
+def close_db():
+    # à appeler à la fermeture de l'application
+    global _cache, _index_codes
+    pool.close_all()
+    if _cache is not None:
+        _cache.fermer()
+        _cache = None
+    if _index_codes is not None:
+        _index_codes.fermer()
+        _index_codes = None
+
+def cache_catalogue():
+    # cache du catalogue pour la base courante (None si désactivé)
+    global _cache
+    if not CACHE_CATALOGUE:
+        return None
+    if _cache is None or _cache.path != DB:
+        if _cache is not None:
+            _cache.fermer()
+        _cache = CacheCatalogue(DB)
+    return _cache
+
+def index_codes():
+    # index code-barres -> (id, prix, stock) de la base courante, chargé au premier scan
+    global _index_codes
+    if _index_codes is None or _index_codes.path != DB:
+        if _index_codes is not None:
+            _index_codes.fermer()
+        _index_codes = IndexCodesBarres(DB)
+    return _index_codes
+
+def stats_cache():
+    return _cache.stats() if _cache is not None else None
+
+def _id_par_code(code_barre, cur):
+    cache = cache_catalogue()
+    if cache is not None:
+        ligne = cache.get_par_code(code_barre)
+        return ligne[0] if ligne else None
+    cur.execute("SELECT id FROM medicaments WHERE code_barre = ?", (code_barre,))
+    r = cur.fetchone()
+    return r[0] if r else None
+
+def utiliser_profil(nom):
+    # change le profil de stockage ; les connexions existantes sont fermées
+    # pour que les nouvelles PRAGMA s'appliquent
+    global PROFIL
+    stockage.get_profil(nom)
+    PROFIL = nom
+    pool.close_all()
 
 # --- Helpers validation ---
-def _is_valid_date(s):
+@lru_cache(maxsize=4096)
+def _parse_date(s):
+    # strptime est coûteux ; les imports en masse répètent souvent les mêmes dates
     try:
-        datetime.strptime(s, "%Y-%m-%d")
-        return True
+        return datetime.strptime(s, "%Y-%m-%d").date()
     except Exception:
+        return None
+
+def _is_valid_date(s):
+    try:
+        return _parse_date(s) is not None
+    except TypeError:
         return False
 
 def _is_future_date(s):
     try:
-        d = datetime.strptime(s, "%Y-%m-%d").date()
-    except Exception:
+        d = _parse_date(s)
+    except TypeError:
         return False
-    return d > datetime.today().date()
+    return d is not None and d > datetime.today().date()
 
 
 # MÉDICAMENTS
 
-def ajouter_medicament(nom, code_barre, description, quantite, prix, date_expiration):
-    # validations
+def valider_medicament(nom, code_barre, description, quantite, prix, date_expiration):
+    # renvoie les valeurs normalisées prêtes pour l'INSERT (utilisé aussi par l'import en masse)
     if not nom or not nom.strip():
         raise ValueError("Le nom du médicament ne peut pas être vide.")
     if not code_barre or not code_barre.strip():
@@ -51,12 +128,16 @@ def ajouter_medicament(nom, code_barre, description, quantite, prix, date_expira
             raise ValueError("Format date d'expiration invalide (YYYY-MM-DD).")
         if not _is_future_date(date_expiration):
             raise ValueError("La date d'expiration doit être une date future.")
+    return (nom.strip(), code_barre.strip(), description or "", quantite, prix, date_expiration or None)
+
+@instrumente
+def ajouter_medicament(nom, code_barre, description, quantite, prix, date_expiration):
+    valeurs = valider_medicament(nom, code_barre, description, quantite, prix, date_expiration)
 
     conn = connect_db()
     cur = conn.cursor()
-    # unicité code-barre
-    cur.execute("SELECT id FROM medicaments WHERE code_barre = ?", (code_barre.strip(),))
-    if cur.fetchone():
+    # unicité code-barre (la contrainte UNIQUE reste le dernier garde-fou)
+    if _id_par_code(valeurs[1], cur) is not None:
         conn.close()
         raise ValueError("Un médicament avec ce code-barres existe déjà.")
 
@@ -64,7 +145,7 @@ def ajouter_medicament(nom, code_barre, description, quantite, prix, date_expira
         cur.execute("""
             INSERT INTO medicaments (nom, code_barre, description, quantite, prix, date_expiration)
             VALUES (?, ?, ?, ?, ?, ?)
-        """, (nom.strip(), code_barre.strip(), description or "", quantite, prix, date_expiration))
+        """, valeurs)
         conn.commit()
         return True
     except sqlite3.IntegrityError as e:
@@ -72,7 +153,9 @@ def ajouter_medicament(nom, code_barre, description, quantite, prix, date_expira
     finally:
         conn.close()
 
-def modifier_medicament(id_med, nom=None, quantite=None, prix=None, description=None, code_barre=None, date_expiration=None):
+@instrumente
+def modifier_medicament(id_med, nom=None, quantite=None, prix=None, description=None, code_barre=None, date_expiration=None,
+                        seuil_alerte=None):
     # id check
     if id_med is None:
         raise ValueError("ID médicament requis.")
@@ -116,6 +199,15 @@ def modifier_medicament(id_med, nom=None, quantite=None, prix=None, description=
         if prix < 0:
             conn.close()
             raise ValueError("Prix doit être >= 0.")
+    if seuil_alerte is not None:
+        try:
+            seuil_alerte = int(seuil_alerte)
+        except Exception:
+            conn.close()
+            raise ValueError("Seuil d'alerte invalide.")
+        if seuil_alerte < 0:
+            conn.close()
+            raise ValueError("Seuil d'alerte doit être >= 0.")
     if date_expiration:
         if not _is_valid_date(date_expiration):
             conn.close()
@@ -126,8 +218,8 @@ def modifier_medicament(id_med, nom=None, quantite=None, prix=None, description=
 
     # check code_barre uniqueness if changed
     if code_barre is not None:
-        cur.execute("SELECT id FROM medicaments WHERE code_barre = ? AND id != ?", (code_barre.strip(), id_med))
-        if cur.fetchone():
+        existant = _id_par_code(code_barre.strip(), cur)
+        if existant is not None and existant != id_med:
             conn.close()
             raise ValueError("Ce code-barres est déjà utilisé par un autre médicament.")
 
@@ -146,6 +238,8 @@ def modifier_medicament(id_med, nom=None, quantite=None, prix=None, description=
         updates.append("prix = ?"); params.append(prix)
     if date_expiration is not None:
         updates.append("date_expiration = ?"); params.append(date_expiration)
+    if seuil_alerte is not None:
+        updates.append("seuil_alerte = ?"); params.append(seuil_alerte)
 
     if not updates:
         conn.close()
@@ -165,6 +259,21 @@ def modifier_medicament(id_med, nom=None, quantite=None, prix=None, description=
     finally:
         conn.close()
 
+@instrumente
+def fetch_medicament_details(id_med):
+    # champs non affichés dans le tableau (description, date d'expiration, seuil d'alerte)
+    cache = cache_catalogue()
+    if cache is not None:
+        ligne = cache.get(id_med)
+        return (ligne[3], ligne[6], ligne[8]) if ligne else None
+    conn = connect_db()
+    try:
+        return conn.execute("SELECT description, date_expiration, seuil_alerte FROM medicaments WHERE id = ?",
+                            (int(id_med),)).fetchone()
+    finally:
+        conn.close()
+
+@instrumente
 def supprimer_medicament(id_med):
     try:
         id_med = int(id_med)
@@ -188,7 +297,8 @@ def supprimer_medicament(id_med):
 
 # CLIENTS
 
-def ajouter_client(nom, prenom, naissance, phone=None, num_assurance=None):
+def valider_client(nom, prenom, naissance, phone=None, num_assurance=None):
+    # renvoie les valeurs normalisées prêtes pour l'INSERT (utilisé aussi par l'import en masse)
     if not nom or not nom.strip():
         raise ValueError("Nom obligatoire.")
     if not prenom or not prenom.strip():
@@ -203,6 +313,11 @@ def ajouter_client(nom, prenom, naissance, phone=None, num_assurance=None):
             raise ValueError("Téléphone trop court.")
     if num_assurance and num_assurance.strip() and len(num_assurance.strip()) < 4:
         raise ValueError("Numéro d'assurance trop court (min 4 caractères).")
+    return (nom.strip(), prenom.strip(), naissance, (phone or "").strip(), (num_assurance or "").strip())
+
+@instrumente
+def ajouter_client(nom, prenom, naissance, phone=None, num_assurance=None):
+    valeurs = valider_client(nom, prenom, naissance, phone, num_assurance)
 
     conn = connect_db()
     cur = conn.cursor()
@@ -210,7 +325,7 @@ def ajouter_client(nom, prenom, naissance, phone=None, num_assurance=None):
         cur.execute("""
             INSERT INTO clients (nom, prenom, naissance, phone, num_assurance)
             VALUES (?, ?, ?, ?, ?)
-        """, (nom.strip(), prenom.strip(), naissance, (phone or "").strip(), (num_assurance or "").strip()))
+        """, valeurs)
         conn.commit()
         return True
     except sqlite3.IntegrityError as e:
@@ -218,6 +333,7 @@ def ajouter_client(nom, prenom, naissance, phone=None, num_assurance=None):
     finally:
         conn.close()
 
+@instrumente
 def modifier_client(id_cli, nom=None, prenom=None, naissance=None, phone=None, num_assurance=None):
     try:
         idc = int(id_cli)
@@ -271,6 +387,7 @@ def modifier_client(id_cli, nom=None, prenom=None, naissance=None, phone=None, n
     finally:
         conn.close()
 
+@instrumente
 def supprimer_client(id_cli):
     try:
         idc = int(id_cli)
@@ -291,8 +408,10 @@ def supprimer_client(id_cli):
 
 # VENTES
 
-def enregistrer_vente(id_medicament, id_client, quantite, pharmacien="Inconnu"):
-    # validations & conversions
+# mode « commit groupé » (voir commit_groupe.py) : None = une transaction par vente
+_commit_groupe = None
+
+def _valider_vente(id_medicament, id_client, quantite):
     try:
         id_med = int(id_medicament)
     except Exception:
@@ -307,68 +426,500 @@ def enregistrer_vente(id_medicament, id_client, quantite, pharmacien="Inconnu"):
         raise ValueError("Quantité invalide.")
     if qte <= 0:
         raise ValueError("La quantité doit être > 0.")
+    return id_med, id_cli, qte
+
+@instrumente
+def enregistrer_vente(id_medicament, id_client, quantite, pharmacien="Inconnu"):
+    # validations & conversions
+    id_med, id_cli, qte = _valider_vente(id_medicament, id_client, quantite)
+
+    if _commit_groupe is not None:
+        return _commit_groupe.soumettre(id_med, id_cli, qte, pharmacien)
 
     conn = connect_db()
     cur = conn.cursor()
-
-    # vérifier médicament
-    cur.execute("SELECT prix, quantite FROM medicaments WHERE id = ?", (id_med,))
-    med = cur.fetchone()
-    if not med:
-        conn.close()
-        raise ValueError("Médicament introuvable.")
-    prix_unitaire, stock = med
-    if stock < qte:
+    try:
+        _vendre(cur, id_med, id_cli, qte, pharmacien)
+        conn.commit()
+        return True
+    except sqlite3.IntegrityError as e:
+        raise ValueError("Erreur base (contrainte) : " + str(e))
+    finally:
+        # close() annule la transaction si elle n'a pas été validée
         conn.close()
-        raise ValueError(f"Stock insuffisant. Disponible: {stock}, demandé: {qte}.")
+
+@instrumente
+def vendre_par_code(code_barre, id_client, quantite=1, pharmacien="Inconnu"):
+    # vente depuis une douchette : le code est résolu en mémoire, et un stock
+    # visiblement insuffisant est refusé sans ouvrir de transaction. Le
+    # décrément conditionnel de enregistrer_vente reste la vérification qui fait foi.
+    # Renvoie l'id du médicament vendu.
+    code = str(code_barre).strip() if code_barre is not None else ""
+    if not code:
+        raise ValueError("Code-barres vide.")
+    entree = index_codes().chercher(code)
+    if entree is None:
+        raise ValueError(f"Code-barres inconnu : {code}.")
+    id_med, id_cli, qte = _valider_vente(entree[0], id_client, quantite)
+    if entree[2] < qte:
+        raise ValueError(f"Stock insuffisant. Disponible: {entree[2]}, demandé: {qte}.")
+    enregistrer_vente(id_med, id_cli, qte, pharmacien)
+    return id_med
+
+def _vendre(cur, id_med, id_cli, qte, pharmacien):
+    # partie transactionnelle d'une vente (sans commit)
+    # décrément conditionnel : le contrôle du stock et la mise à jour sont une
+    # seule instruction, deux caisses ne peuvent donc pas vendre le même stock.
+    # Le verrou d'écriture est pris ici et relâché au commit.
+    # Le prix est relu par le même UPDATE (RETURNING), sur la connexion de la
+    # vente : pas le cache, que chaque vente invalide pour ce produit.
+    prix_unitaire = _decrementer_stock(cur, id_med, qte)
 
     # vérifier client
     cur.execute("SELECT id FROM clients WHERE id = ?", (id_cli,))
     if not cur.fetchone():
-        conn.close()
         raise ValueError("Client introuvable.")
 
     prix_total = prix_unitaire * qte
+    cur.execute("""
+        INSERT INTO vente (id_medicament, id_client, quantite, prix_unitaire, prix_total, pharmacien)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (id_med, id_cli, qte, prix_unitaire, prix_total, pharmacien))
+
+def _decrementer_stock(cur, id_med, qte):
+    # renvoie le prix unitaire du médicament décrémenté (SQLite >= 3.35 pour RETURNING)
+    cur.execute("UPDATE medicaments SET quantite = quantite - ? WHERE id = ? AND quantite >= ? RETURNING prix",
+                (qte, id_med, qte))
+    r = cur.fetchone()
+    if r is not None:
+        return r[0]
+    cur.execute("SELECT quantite FROM medicaments WHERE id = ?", (id_med,))
+    med = cur.fetchone()
+    if not med:
+        raise ValueError("Médicament introuvable.")
+    raise ValueError(f"Stock insuffisant. Disponible: {med[0]}, demandé: {qte}.")
 
+# Utilitaires d'affichage (lectures)
+#
+# Forme des lignes renvoyées (paramètre `forme`) :
+#   "tuple"           tuples sqlite3 (défaut)
+#   "enregistrement"  objets à __slots__ Medicament, Client, Vente
+#   "colonnes"        un enregistrements.Colonnes, stockage par colonne
+FORMES = ("tuple", "enregistrement", "colonnes")
+
+def _convertir(lignes, forme, type_):
+    # lignes : liste de tuples ou curseur (lu en flux)
+    if forme == "tuple":
+        return lignes if isinstance(lignes, list) else lignes.fetchall()
+    if forme == "enregistrement":
+        return type_.lire(lignes)
+    if forme == "colonnes":
+        colonnes = Colonnes(type_)
+        colonnes.etendre(lignes)
+        return colonnes
+    raise ValueError(f"Forme invalide : {forme}. Choix : {', '.join(FORMES)}.")
+
+def _tout_lire(select, forme, type_):
+    conn = connect_db()
     try:
-        cur.execute("""
-            INSERT INTO vente (id_medicament, id_client, quantite, prix_unitaire, prix_total, pharmacien)
-            VALUES (?, ?, ?, ?, ?, ?)
-        """, (id_med, id_cli, qte, prix_unitaire, prix_total, pharmacien))
-        cur.execute("UPDATE medicaments SET quantite = quantite - ? WHERE id = ?", (qte, id_med))
-        conn.commit()
-        return True
-    except sqlite3.IntegrityError as e:
-        raise ValueError("Erreur base (contrainte) : " + str(e))
+        return _convertir(conn.execute(select), forme, type_)
     finally:
         conn.close()
 
-# Utilitaires d'affichage (lectures)
-def fetch_medicaments():
+@instrumente
+def fetch_medicaments(forme="tuple"):
+    return _tout_lire(_SELECT_MEDICAMENTS, forme, Medicament)
+
+@instrumente
+def fetch_clients(forme="tuple"):
+    return _tout_lire(_SELECT_CLIENTS, forme, Client)
+
+@instrumente
+def fetch_ventes(forme="tuple"):
+    return _tout_lire(_SELECT_VENTES, forme, Vente)
+
+
+# Lectures paginées (keyset) et en flux
+#
+# Chaque fonction *_page renvoie (lignes, suivant) : `suivant` est le curseur
+# à repasser en `apres` pour obtenir la page suivante (None à la fin).
+# Le curseur est la valeur de tri + l'id de la dernière ligne, ce qui évite
+# les OFFSET dont le coût croît avec le numéro de page.
+
+PAGE_SIZE = 200
+
+# tri autorisé -> (expression SQL, position dans la ligne renvoyée)
+_TRI_MEDICAMENTS = {
+    "id": ("id", 0),
+    "nom": ("nom", 1),
+    "quantite": ("quantite", 3),
+    "prix": ("prix", 4),
+    "date_expiration": ("IFNULL(date_expiration, '')", 5),
+}
+_TRI_CLIENTS = {
+    "id": ("id", 0),
+    "nom": ("nom", 1),
+    "prenom": ("prenom", 2),
+    "naissance": ("naissance", 3),
+}
+_TRI_VENTES = {
+    "id": ("v.id", 0),
+    "prix_total": ("v.prix_total", 5),
+    "date_vente": ("v.date_vente", 6),
+}
+
+def _page(select, colonne_id, tris, where, params, apres, limite, tri, desc, forme="tuple", type_=None):
+    if tri not in tris:
+        raise ValueError(f"Tri invalide : {tri}. Choix : {', '.join(tris)}.")
+    try:
+        limite = int(limite)
+    except Exception:
+        raise ValueError("Taille de page invalide.")
+    if limite <= 0:
+        raise ValueError("La taille de page doit être > 0.")
+    expr, pos = tris[tri]
+    where = list(where)
+    params = list(params)
+    op = "<" if desc else ">"
+    sens = "DESC" if desc else "ASC"
+    if tri == "id":
+        if apres is not None:
+            where.append(f"{colonne_id} {op} ?"); params.append(apres[1])
+        order = f"{colonne_id} {sens}"
+    else:
+        if apres is not None:
+            where.append(f"({expr}, {colonne_id}) {op} (?, ?)"); params.extend(apres)
+        order = f"{expr} {sens}, {colonne_id} {sens}"
+    q = select
+    if where:
+        q += " WHERE " + " AND ".join(where)
+    q += f" ORDER BY {order} LIMIT ?"
+    params.append(limite)
+
     conn = connect_db()
-    cur = conn.cursor()
-    cur.execute("SELECT id, nom, code_barre, quantite, prix, date_expiration FROM medicaments")
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    try:
+        rows = conn.execute(q, params).fetchall()
+    finally:
+        conn.close()
+    suivant = None
+    if len(rows) == limite:
+        last = rows[-1]
+        val = last[pos]
+        if tri == "date_expiration" and val is None:
+            val = ""
+        suivant = (val, last[0])
+    return _convertir(rows, forme, type_), suivant
+
+def _iter_pages(fetch_page, taille_lot, **kw):
+    apres = None
+    while True:
+        rows, apres = fetch_page(apres=apres, limite=taille_lot, **kw)
+        yield from rows
+        if apres is None:
+            return
+
+_SELECT_MEDICAMENTS = "SELECT id, nom, code_barre, quantite, prix, date_expiration FROM medicaments"
+_SELECT_CLIENTS = "SELECT id, nom, prenom, naissance, phone, num_assurance FROM clients"
+_SELECT_VENTES = """
+    SELECT v.id, m.nom, c.nom, c.prenom, v.quantite, v.prix_total, v.date_vente
+    FROM vente v
+    LEFT JOIN medicaments m ON v.id_medicament = m.id
+    LEFT JOIN clients c ON v.id_client = c.id
+"""
+
+def _filtres_medicaments(nom=None, expire_avant=None, stock_max=None):
+    where, params = [], []
+    if nom:
+        where.append("nom LIKE ?"); params.append(nom.strip() + "%")
+    if expire_avant:
+        where.append("date_expiration <= ?"); params.append(expire_avant)
+    if stock_max is not None:
+        where.append("quantite <= ?"); params.append(int(stock_max))
+    return where, params
+
+def _filtres_clients(nom=None):
+    where, params = [], []
+    if nom:
+        where.append("nom LIKE ?"); params.append(nom.strip() + "%")
+    return where, params
+
+def _filtres_ventes(date_debut=None, date_fin=None, id_client=None, id_medicament=None):
+    where, params = [], []
+    if date_debut:
+        where.append("v.date_vente >= ?"); params.append(date_debut)
+    if date_fin:
+        # date_fin incluse : "2024-01-31" couvre toute la journée
+        where.append("v.date_vente < date(?, '+1 day')"); params.append(date_fin)
+    if id_client is not None:
+        where.append("v.id_client = ?"); params.append(int(id_client))
+    if id_medicament is not None:
+        where.append("v.id_medicament = ?"); params.append(int(id_medicament))
+    return where, params
+
+@instrumente
+def fetch_medicaments_page(apres=None, limite=PAGE_SIZE, tri="id", desc=False, forme="tuple", **filtres):
+    where, params = _filtres_medicaments(**filtres)
+    return _page(_SELECT_MEDICAMENTS, "id", _TRI_MEDICAMENTS, where, params, apres, limite, tri, desc, forme, Medicament)
+
+@instrumente
+def fetch_clients_page(apres=None, limite=PAGE_SIZE, tri="id", desc=False, forme="tuple", **filtres):
+    where, params = _filtres_clients(**filtres)
+    return _page(_SELECT_CLIENTS, "id", _TRI_CLIENTS, where, params, apres, limite, tri, desc, forme, Client)
+
+@instrumente
+def fetch_ventes_page(apres=None, limite=PAGE_SIZE, tri="id", desc=False, forme="tuple", **filtres):
+    where, params = _filtres_ventes(**filtres)
+    return _page(_SELECT_VENTES, "v.id", _TRI_VENTES, where, params, apres, limite, tri, desc, forme, Vente)
+
+def iter_medicaments(taille_lot=1000, **filtres):
+    return _iter_pages(fetch_medicaments_page, taille_lot, **filtres)
+
+def iter_clients(taille_lot=1000, **filtres):
+    return _iter_pages(fetch_clients_page, taille_lot, **filtres)
+
+def iter_ventes(taille_lot=1000, **filtres):
+    return _iter_pages(fetch_ventes_page, taille_lot, **filtres)
+
+
+# Accès par identifiants (utilisé par l'affichage virtualisé de main.py) :
+# *_ids renvoie la liste ordonnée des id (tableau compact), *_par_ids les
+# lignes complètes des seuls id demandés, dans l'ordre demandé.
+
+def _ids(table, colonne_id, tris, where, params, tri, desc):
+    if tri not in tris:
+        raise ValueError(f"Tri invalide : {tri}. Choix : {', '.join(tris)}.")
+    expr = tris[tri][0]
+    sens = "DESC" if desc else "ASC"
+    q = f"SELECT {colonne_id} FROM {table}"
+    if where:
+        q += " WHERE " + " AND ".join(where)
+    q += f" ORDER BY {expr} {sens}" if tri == "id" else f" ORDER BY {expr} {sens}, {colonne_id} {sens}"
+    conn = connect_db()
+    try:
+        return array("q", [r for (r,) in conn.execute(q, params)])
+    finally:
+        conn.close()
 
-def fetch_clients():
+def _par_ids(select, colonne_id, ids):
+    ids = [int(i) for i in ids]
+    if not ids:
+        return []
     conn = connect_db()
-    cur = conn.cursor()
-    cur.execute("SELECT id, nom, prenom, naissance, phone, num_assurance FROM clients")
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    try:
+        rows = conn.execute(f"{select} WHERE {colonne_id} IN ({','.join('?' * len(ids))})", ids).fetchall()
+    finally:
+        conn.close()
+    par_id = {r[0]: r for r in rows}
+    return [par_id[i] for i in ids if i in par_id]
+
+@instrumente
+def fetch_medicaments_ids(tri="id", desc=False, **filtres):
+    where, params = _filtres_medicaments(**filtres)
+    return _ids("medicaments", "id", _TRI_MEDICAMENTS, where, params, tri, desc)
+
+@instrumente
+def fetch_clients_ids(tri="id", desc=False, **filtres):
+    where, params = _filtres_clients(**filtres)
+    return _ids("clients", "id", _TRI_CLIENTS, where, params, tri, desc)
+
+@instrumente
+def fetch_ventes_ids(tri="id", desc=False, **filtres):
+    where, params = _filtres_ventes(**filtres)
+    return _ids("vente v", "v.id", _TRI_VENTES, where, params, tri, desc)
+
+@instrumente
+def fetch_medicaments_par_ids(ids, forme="tuple"):
+    return _convertir(_par_ids(_SELECT_MEDICAMENTS, "id", ids), forme, Medicament)
+
+@instrumente
+def fetch_clients_par_ids(ids, forme="tuple"):
+    return _convertir(_par_ids(_SELECT_CLIENTS, "id", ids), forme, Client)
+
+@instrumente
+def fetch_ventes_par_ids(ids, forme="tuple"):
+    return _convertir(_par_ids(_SELECT_VENTES, "v.id", ids), forme, Vente)
+
+
+# Recherche plein texte (tables FTS5 créées par db_phamarcie.create_recherche)
+
+RECHERCHE_LIMITE = 200
+# poids bm25 par colonne : nom, description, code_barre
+_POIDS_MEDICAMENTS = (10.0, 1.0, 5.0)
+
+def _requete_fts(texte):
+    # chaque mot devient un préfixe ; les mots sont combinés en ET.
+    # Les guillemets neutralisent la syntaxe FTS5 (AND, NOT, -, ^...)
+    mots = re.findall(r"\w+", texte or "")
+    return " ".join(f'"{m}"*' for m in mots)
+
+def _rechercher(sql, texte, limite):
+    requete = _requete_fts(texte)
+    if not requete:
+        return []
+    conn = connect_db()
+    try:
+        return conn.execute(sql, (requete, int(limite))).fetchall()
+    except sqlite3.OperationalError as e:
+        if "no such table" in str(e):
+            raise ValueError("Recherche indisponible (SQLite sans FTS5).")
+        raise
+    finally:
+        conn.close()
+
+@instrumente
+def rechercher_medicaments_ids(texte, limite=RECHERCHE_LIMITE):
+    # ids par pertinence décroissante
+    return [r[0] for r in _rechercher(f"""
+        SELECT rowid FROM medicaments_fts WHERE medicaments_fts MATCH ?
+        ORDER BY bm25(medicaments_fts, {', '.join(map(str, _POIDS_MEDICAMENTS))}) LIMIT ?
+    """, texte, limite)]
+
+@instrumente
+def rechercher_medicaments(texte, limite=RECHERCHE_LIMITE):
+    # lignes au format de fetch_medicaments_page, par pertinence décroissante
+    return _rechercher(f"""
+        SELECT m.id, m.nom, m.code_barre, m.quantite, m.prix, m.date_expiration
+        FROM medicaments_fts f JOIN medicaments m ON m.id = f.rowid
+        WHERE medicaments_fts MATCH ?
+        ORDER BY bm25(medicaments_fts, {', '.join(map(str, _POIDS_MEDICAMENTS))}) LIMIT ?
+    """, texte, limite)
+
+@instrumente
+def rechercher_clients(texte, limite=RECHERCHE_LIMITE):
+    # correspondances exactes sur le téléphone ou le n° d'assurance d'abord (index),
+    # puis préfixes sur nom et prénom (FTS, insensible à la casse et aux accents)
+    texte = (texte or "").strip()
+    if not texte:
+        return []
+    lignes = []
+    conn = connect_db()
+    try:
+        tel = re.sub(r"[\s.\-/()]", "", texte)
+        if re.fullmatch(r"\+?\d{6,}", tel):
+            lignes += conn.execute(_SELECT_CLIENTS + " WHERE phone = ?", (tel,)).fetchall()
+        cle = re.sub(r"\s", "", texte).upper()
+        if len(cle) >= 4:
+            lignes += conn.execute(_SELECT_CLIENTS + " WHERE num_assurance_cle = ?", (cle,)).fetchall()
+    finally:
+        conn.close()
+    vus = {r[0] for r in lignes}
+    if len(lignes) < limite:
+        # pas de classement bm25 : un préfixe courant (« mar ») correspond à des
+        # dizaines de milliers de clients qu'il faudrait tous noter. Les premiers
+        # trouvés sont triés par nom et prénom pour l'affichage.
+        trouves = _rechercher("""
+            SELECT c.id, c.nom, c.prenom, c.naissance, c.phone, c.num_assurance
+            FROM clients_fts f JOIN clients c ON c.id = f.rowid
+            WHERE clients_fts MATCH ? LIMIT ?
+        """, texte, limite)
+        trouves.sort(key=lambda r: (r[1].casefold(), r[2].casefold()))
+        lignes += [r for r in trouves if r[0] not in vus]
+    return lignes[:int(limite)]
+
+
+# Suivi des modifications (table journal_modifications, alimentée par triggers)
+
+@instrumente
+def dernier_changement():
+    conn = connect_db()
+    try:
+        return conn.execute("SELECT IFNULL(MAX(seq), 0) FROM journal_modifications").fetchone()[0]
+    finally:
+        conn.close()
+
+@instrumente
+def fetch_changements(depuis):
+    # renvoie (dernier_seq, {table: (ids_modifies_ou_ajoutes, ids_supprimes)})
+    conn = connect_db()
+    try:
+        rows = conn.execute("""
+            SELECT seq, table_nom, id_ligne, operation FROM journal_modifications
+            WHERE seq > ? ORDER BY seq
+        """, (int(depuis),)).fetchall()
+    finally:
+        conn.close()
+    dernier = rows[-1][0] if rows else int(depuis)
+    etat = {}
+    for _, table, id_ligne, op in rows:
+        etat.setdefault(table, {})[id_ligne] = op
+    changements = {}
+    for table, ops in etat.items():
+        maj = {i for i, op in ops.items() if op != "D"}
+        suppr = {i for i, op in ops.items() if op == "D"}
+        changements[table] = (maj, suppr)
+    return dernier, changements
+
+@instrumente
+def purger_journal(garder=10000):
+    # ne conserve que les `garder` dernières entrées du journal
+    conn = connect_db()
+    try:
+        conn.execute("DELETE FROM journal_modifications WHERE seq <= (SELECT MAX(seq) FROM journal_modifications) - ?",
+                     (int(garder),))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# PANIER (vente de plusieurs médicaments en une transaction)
+
+@instrumente
+def enregistrer_panier(lignes, id_client, pharmacien="Inconnu"):
+    # lignes : [(id_medicament, quantite), ...] ; tout ou rien
+    try:
+        id_cli = int(id_client)
+    except Exception:
+        raise ValueError("ID client invalide.")
+    if not lignes:
+        raise ValueError("Le panier est vide.")
+    panier = []
+    for ligne in lignes:
+        try:
+            id_med, quantite = ligne
+        except Exception:
+            raise ValueError("Ligne de panier invalide (id_medicament, quantite).")
+        try:
+            id_med = int(id_med)
+        except Exception:
+            raise ValueError("ID médicament invalide.")
+        try:
+            qte = int(quantite)
+        except Exception:
+            raise ValueError("Quantité invalide.")
+        if qte <= 0:
+            raise ValueError("La quantité doit être > 0.")
+        panier.append((id_med, qte))
+
+    # quantités cumulées par médicament (un même produit peut apparaître deux fois)
+    demande = {}
+    for id_med, qte in panier:
+        demande[id_med] = demande.get(id_med, 0) + qte
 
-def fetch_ventes():
     conn = connect_db()
     cur = conn.cursor()
-    cur.execute("""
-        SELECT v.id, m.nom, c.nom, c.prenom, v.quantite, v.prix_total, v.date_vente
-        FROM vente v
-        LEFT JOIN medicaments m ON v.id_medicament = m.id
-        LEFT JOIN clients c ON v.id_client = c.id
-    """)
-    rows = cur.fetchall()
-    conn.close()
-    return rows
+    try:
+        # décréments conditionnels (cf. enregistrer_vente) ; la moindre ligne
+        # en échec annule tout le panier
+        prix = {}
+        for id_med, qte in demande.items():
+            try:
+                prix[id_med] = _decrementer_stock(cur, id_med, qte)
+            except ValueError as e:
+                raise ValueError(f"Médicament ID {id_med} : {e}")
+
+        cur.execute("SELECT id FROM clients WHERE id = ?", (id_cli,))
+        if not cur.fetchone():
+            raise ValueError("Client introuvable.")
+
+        cur.executemany("""
+            INSERT INTO vente (id_medicament, id_client, quantite, prix_unitaire, prix_total, pharmacien)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, [(id_med, id_cli, qte, prix[id_med], prix[id_med] * qte, pharmacien)
+              for id_med, qte in panier])
+        conn.commit()
+        return True
+    except sqlite3.IntegrityError as e:
+        raise ValueError("Erreur base (contrainte) : " + str(e))
+    finally:
+        # close() annule la transaction si elle n'a pas été validée
+        conn.close()
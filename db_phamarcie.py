@@ -1,10 +1,89 @@
 import sqlite3
-db=sqlite3.connect("pharmacie.db")
+import stockage
 
-def create_table():
-    conn = sqlite3.connect("pharmacie.db")
-    cur = conn.cursor()
+# Index secondaires (recherches par date, client, médicament, expiration)
+INDEX = {
+    "idx_vente_date": "vente(date_vente)",
+    "idx_vente_client": "vente(id_client, date_vente)",
+    "idx_vente_medicament": "vente(id_medicament, date_vente)",
+    "idx_medicaments_expiration": "medicaments(date_expiration)",
+    "idx_clients_phone": "clients(phone)",
+    "idx_clients_assurance": "clients(num_assurance_cle)",
+    "idx_medicaments_marge": "medicaments(marge_stock)",
+    "idx_historique_horodatage": "historique(horodatage)",
+    "idx_historique_entite": "historique(entite, id_entite)",
+}
+# NB : les jointures de crud.fetch_ventes() passent déjà par la clé primaire
+# entière (rowid) de medicaments/clients, qu'un index couvrant ne bat pas.
+
+# Tables suivies par journal_modifications (vente : UPDATE via ON DELETE SET NULL)
+JOURNAL = {
+    "medicaments": ("I", "U", "D"),
+    "clients": ("I", "U", "D"),
+    "vente": ("I", "U", "D"),
+}
+
+# Tables dont la colonne mise_a_jour est tenue par un trigger (trg_*_updated_at)
+HORODATEES = ("medicaments", "clients")
+
+# Index plein texte (FTS5, contenu externe) : table virtuelle -> (table source, colonnes)
+# unicode61 + remove_diacritics : recherche insensible à la casse et aux accents
+RECHERCHE = {
+    "medicaments_fts": ("medicaments", ("nom", "description", "code_barre")),
+    "clients_fts": ("clients", ("nom", "prenom")),
+}
+
+# Colonnes ajoutées après coup (aussi aux bases existantes, par ALTER TABLE),
+# dans l'ordre : une colonne calculée peut dépendre d'une colonne précédente
+COLONNES_AJOUTEES = {
+    "clients": {
+        # clé de recherche : n° d'assurance sans espaces, en majuscules
+        "num_assurance_cle": "TEXT GENERATED ALWAYS AS (upper(replace(num_assurance, ' ', ''))) VIRTUAL",
+    },
+    "medicaments": {
+        # seuil de réapprovisionnement propre au produit
+        "seuil_alerte": "INTEGER NOT NULL DEFAULT 10 CHECK(seuil_alerte >= 0)",
+        # <= 0 : stock bas (indexé, pour une recherche par intervalle)
+        "marge_stock": "INTEGER GENERATED ALWAYS AS (quantite - seuil_alerte) VIRTUAL",
+    },
+}
+
+def create_index(cur):
+    for nom, cible in INDEX.items():
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {nom} ON {cible}")
 
+def create_table(path="pharmacie.db", profil=stockage.PROFIL_DEFAUT):
+    # ouverture de la base : migre le schéma si besoin (aucun DDL s'il est à jour)
+    conn = sqlite3.connect(path)
+    try:
+        # passe la base en WAL (persistant) selon le profil choisi
+        stockage.appliquer_profil(conn, profil)
+        return migrer(conn)
+    finally:
+        conn.close()
+
+def version_schema(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrer(conn):
+    # renvoie le nombre de migrations appliquées
+    if version_schema(conn) >= SCHEMA_VERSION:
+        return 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # relue sous verrou : un autre processus a pu migrer entre-temps
+        version = version_schema(conn)
+        cur = conn.cursor()
+        for migration in MIGRATIONS[version:]:
+            migration(cur)
+        conn.execute(f"PRAGMA user_version = {max(version, SCHEMA_VERSION)}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return max(0, SCHEMA_VERSION - version)
+
+def create_tables_base(cur):
     #Table des médicaments
     cur.execute("""
     CREATE TABLE IF NOT EXISTS medicaments (
@@ -68,7 +147,205 @@ def create_table():
        END;
        """)
 
-    conn.commit()
+    #journal des modifications : permet à l'interface de ne recharger que
+    #les lignes modifiées depuis son dernier rafraîchissement
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS journal_modifications(
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        table_nom TEXT NOT NULL,
+        id_ligne INTEGER NOT NULL,
+        operation TEXT NOT NULL CHECK(operation IN ('I', 'U', 'D'))
+    );
+    """)
+    for table, operations in JOURNAL.items():
+        for op in operations:
+            ligne = "OLD.id" if op == "D" else "NEW.id"
+            evenement = {"I": "INSERT", "U": "UPDATE", "D": "DELETE"}[op]
+            cur.execute(f"""
+               CREATE TRIGGER IF NOT EXISTS trg_journal_{table}_{op.lower()}
+               AFTER {evenement} ON {table}
+               FOR EACH ROW
+               BEGIN
+                   INSERT INTO journal_modifications (table_nom, id_ligne, operation)
+                   VALUES ('{table}', {ligne}, '{op}');
+               END;
+               """)
+
+    #suivi des exports incrémentaux (dernière vente exportée par tâche)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS etat_exports(
+        nom TEXT PRIMARY KEY,
+        dernier_id INTEGER NOT NULL DEFAULT 0,
+        date_export TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    """)
+
+    #historique des actions (journal d'audit en ajout seul, voir historique.py)
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS historique(
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        horodatage TIMESTAMP NOT NULL,
+        action TEXT NOT NULL,
+        entite TEXT,
+        id_entite INTEGER
+    );
+    """)
+    cur.execute("""
+       CREATE TRIGGER IF NOT EXISTS trg_historique_ajout_seul
+       BEFORE UPDATE ON historique
+       BEGIN
+           SELECT RAISE(ABORT, 'historique en ajout seul');
+       END;
+       """)
+
+def create_colonnes(cur):
+    for table, colonnes in COLONNES_AJOUTEES.items():
+        existantes = {r[1] for r in cur.execute(f"PRAGMA table_xinfo({table})")}
+        for nom, definition in colonnes.items():
+            if nom not in existantes:
+                cur.execute(f"ALTER TABLE {table} ADD COLUMN {nom} {definition}")
+
+def create_recherche(cur):
+    for fts, (table, colonnes) in RECHERCHE.items():
+        existe = cur.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (fts,)).fetchone()
+        try:
+            cur.execute(f"""
+            CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5(
+                {', '.join(colonnes)},
+                content='{table}', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+            );
+            """)
+        except sqlite3.OperationalError:
+            # SQLite compilé sans FTS5 : la recherche sera indisponible
+            return
+        cols = ", ".join(colonnes)
+        new = ", ".join(f"NEW.{c}" for c in colonnes)
+        old = ", ".join(f"OLD.{c}" for c in colonnes)
+        # synchronisation par triggers, comme trg_medicaments_updated_at ; la mise
+        # à jour de mise_a_jour ou du stock ne touche pas l'index (UPDATE OF)
+        cur.execute(f"""
+           CREATE TRIGGER IF NOT EXISTS trg_{fts}_i AFTER INSERT ON {table}
+           BEGIN
+               INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.id, {new});
+           END;
+           """)
+        cur.execute(f"""
+           CREATE TRIGGER IF NOT EXISTS trg_{fts}_d AFTER DELETE ON {table}
+           BEGIN
+               INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', OLD.id, {old});
+           END;
+           """)
+        cur.execute(f"""
+           CREATE TRIGGER IF NOT EXISTS trg_{fts}_u AFTER UPDATE OF {cols} ON {table}
+           BEGIN
+               INSERT INTO {fts} ({fts}, rowid, {cols}) VALUES ('delete', OLD.id, {old});
+               INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.id, {new});
+           END;
+           """)
+        if not existe:
+            # base existante : indexer les lignes déjà présentes
+            cur.execute(f"INSERT INTO {fts} ({fts}) VALUES ('rebuild')")
+
+# Cumuls journaliers des ventes (jour x médicament x pharmacien), tenus à jour
+# par triggers sur vente. Un pharmacien absent est compté sous ''.
+_CLE_CUMUL = {
+    "NEW": "date(NEW.date_vente), NEW.id_medicament, IFNULL(NEW.pharmacien, '')",
+    "OLD": "date(OLD.date_vente), OLD.id_medicament, IFNULL(OLD.pharmacien, '')",
+}
+
+def _ajouter_cumul(ligne):
+    return f"""
+               INSERT INTO ventes_jour (jour, id_medicament, pharmacien, nb_ventes, quantite, montant)
+               VALUES ({_CLE_CUMUL[ligne]}, 1, {ligne}.quantite, {ligne}.prix_total)
+               ON CONFLICT(jour, id_medicament, pharmacien) DO UPDATE SET
+                   nb_ventes = nb_ventes + 1,
+                   quantite = quantite + excluded.quantite,
+                   montant = montant + excluded.montant;"""
+
+def _retirer_cumul():
+    return f"""
+               UPDATE ventes_jour SET nb_ventes = nb_ventes - 1,
+                   quantite = quantite - OLD.quantite,
+                   montant = montant - OLD.prix_total
+               WHERE (jour, id_medicament, pharmacien) = ({_CLE_CUMUL["OLD"]});
+               DELETE FROM ventes_jour
+               WHERE (jour, id_medicament, pharmacien) = ({_CLE_CUMUL["OLD"]}) AND nb_ventes <= 0;"""
+
+def create_cumuls(cur):
+    existe = cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'ventes_jour'").fetchone()
+    cur.execute("""
+    CREATE TABLE IF NOT EXISTS ventes_jour(
+        jour DATE NOT NULL,
+        id_medicament INTEGER NOT NULL,
+        pharmacien TEXT NOT NULL,
+        nb_ventes INTEGER NOT NULL,
+        quantite INTEGER NOT NULL,
+        montant REAL NOT NULL,
+        PRIMARY KEY (jour, id_medicament, pharmacien)
+    ) WITHOUT ROWID;
+    """)
+    cur.execute(f"""
+       CREATE TRIGGER IF NOT EXISTS trg_ventes_jour_i AFTER INSERT ON vente
+       BEGIN{_ajouter_cumul("NEW")}
+       END;
+       """)
+    cur.execute(f"""
+       CREATE TRIGGER IF NOT EXISTS trg_ventes_jour_d AFTER DELETE ON vente
+       BEGIN{_retirer_cumul()}
+       END;
+       """)
+    cur.execute(f"""
+       CREATE TRIGGER IF NOT EXISTS trg_ventes_jour_u
+       AFTER UPDATE OF date_vente, id_medicament, pharmacien, quantite, prix_total ON vente
+       BEGIN{_retirer_cumul()}{_ajouter_cumul("NEW")}
+       END;
+       """)
+    if not existe:
+        reconstruire_cumuls(cur)
+
+def create_journal_colonnes(cur):
+    # journal des UPDATE limité aux colonnes de données : la mise à jour de
+    # mise_a_jour par trg_*_updated_at ne produit plus une seconde ligne 'U'.
+    # À rejouer par une migration qui ajoute une colonne à ces tables.
+    for table in HORODATEES:
+        colonnes = [r[1] for r in cur.execute(f"PRAGMA table_info({table})") if r[1] != "mise_a_jour"]
+        cur.execute(f"DROP TRIGGER IF EXISTS trg_journal_{table}_u")
+        cur.execute(f"""
+           CREATE TRIGGER trg_journal_{table}_u
+           AFTER UPDATE OF {', '.join(colonnes)} ON {table}
+           FOR EACH ROW
+           BEGIN
+               INSERT INTO journal_modifications (table_nom, id_ligne, operation)
+               VALUES ('{table}', NEW.id, 'U');
+           END;
+           """)
+
+def reconstruire_cumuls(cur):
+    # recalcul complet (base existante, ou après un chargement fait sans triggers)
+    cur.execute("DELETE FROM ventes_jour")
+    cur.execute("""
+        INSERT INTO ventes_jour (jour, id_medicament, pharmacien, nb_ventes, quantite, montant)
+        SELECT date(date_vente), id_medicament, IFNULL(pharmacien, ''),
+               COUNT(*), SUM(quantite), SUM(prix_total)
+        FROM vente GROUP BY 1, 2, 3
+    """)
+
+# Migrations du schéma : la version d'une base (PRAGMA user_version) est le
+# nombre de migrations déjà appliquées. Toutes sont idempotentes (IF NOT
+# EXISTS...), une base antérieure au versionnage (version 0) les rejoue donc
+# sans dommage. Pour faire évoluer le schéma, ajouter une entrée à la fin
+# (par ex. create_index après un ajout dans INDEX) ; ne jamais modifier ni
+# réordonner les entrées existantes.
+MIGRATIONS = (
+    create_tables_base,
+    create_colonnes,
+    create_index,
+    create_recherche,
+    create_cumuls,
+    create_journal_colonnes,
+)
+SCHEMA_VERSION = len(MIGRATIONS)
 
 def remplir(conn: sqlite3.Connection):
     cur = conn.cursor()
@@ -113,4 +390,4 @@ def remplir(conn: sqlite3.Connection):
 
 #create_table()
 
-#remplir(db)
+#remplir(sqlite3.connect("pharmacie.db"))
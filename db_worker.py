@@ -0,0 +1,168 @@
+import queue
+import threading
+import time
+
+import instrumentation
+
+
+# Exécution des appels base de données hors du thread Tk.
+#
+# Les fonctions crud sont exécutées par des threads de travail ; leurs
+# résultats sont remis au thread de l'interface par une file relevée avec
+# root.after (Tk ne doit être manipulé que depuis son propre thread).
+#
+# Une tâche soumise avec une clé annule la tâche précédente de même clé :
+# un rafraîchissement périmé n'est jamais appliqué à l'écran.
+#
+# Instrumentation active : temps d'attente dans la file (db_worker.attente) et
+# durée de chaque callback sur le thread Tk (tk.<clé ou fonction>).
+
+INTERVALLE_MS = 15
+
+
+class Tache:
+    def __init__(self, fn, args, kwargs, succes, erreur, cle):
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.succes = succes
+        self.erreur = erreur
+        self.cle = cle
+        self.annulee = False
+        self.soumise = time.perf_counter()
+
+    def annuler(self):
+        self.annulee = True
+
+
+class ExecuteurDB:
+    def __init__(self, root, nb_threads=2, intervalle_ms=INTERVALLE_MS):
+        self.root = root
+        self.intervalle_ms = intervalle_ms
+        self._taches = queue.Queue()
+        self._resultats = queue.Queue()
+        self._par_cle = {}
+        self._lock = threading.Lock()
+        self._arrete = False
+        self._en_attente = 0   # tâches soumises dont le résultat n'est pas encore remis
+        self._threads = [threading.Thread(target=self._travailler, name=f"db-{i}", daemon=True)
+                         for i in range(nb_threads)]
+        for t in self._threads:
+            t.start()
+        self._apres = root.after(self.intervalle_ms, self._pomper)
+
+    def soumettre(self, fn, *args, succes=None, erreur=None, cle=None, **kwargs):
+        tache = Tache(fn, args, kwargs, succes, erreur, cle)
+        if cle is not None:
+            with self._lock:
+                precedente = self._par_cle.get(cle)
+                if precedente is not None:
+                    precedente.annuler()
+                self._par_cle[cle] = tache
+        self._en_attente += 1
+        self._taches.put(tache)
+        return tache
+
+    def annuler(self, cle):
+        with self._lock:
+            tache = self._par_cle.pop(cle, None)
+        if tache is not None:
+            tache.annuler()
+
+    def en_attente(self):
+        # nombre de tâches dont le callback n'a pas encore été exécuté
+        return self._en_attente
+
+    def _travailler(self):
+        while True:
+            tache = self._taches.get()
+            if tache is None:
+                return
+            if tache.annulee:
+                # remise quand même au thread Tk, pour le décompte des tâches en attente
+                self._resultats.put((tache, True, None))
+                continue
+            if instrumentation.actif():
+                instrumentation.enregistrer("db_worker.attente", time.perf_counter() - tache.soumise)
+            try:
+                res = tache.fn(*tache.args, **tache.kwargs)
+                self._resultats.put((tache, True, res))
+            except Exception as e:
+                self._resultats.put((tache, False, e))
+
+    def _pomper(self):
+        # thread Tk : remet les résultats aux callbacks
+        if not self._arrete:
+            self._apres = self.root.after(self.intervalle_ms, self._pomper)
+        while True:
+            try:
+                tache, ok, valeur = self._resultats.get_nowait()
+            except queue.Empty:
+                break
+            self._en_attente -= 1
+            if tache.cle is not None:
+                with self._lock:
+                    if self._par_cle.get(tache.cle) is tache:
+                        del self._par_cle[tache.cle]
+            if tache.annulee:
+                continue
+            callback = tache.succes if ok else tache.erreur
+            if callback is not None:
+                if instrumentation.actif():
+                    t0 = time.perf_counter()
+                    callback(valeur)
+                    nom = tache.cle or getattr(tache.fn, "__name__", "tache")
+                    instrumentation.enregistrer(f"tk.{nom}", time.perf_counter() - t0)
+                else:
+                    callback(valeur)
+            elif not ok:
+                raise valeur
+
+    def arreter(self, attendre=True):
+        self._arrete = True
+        try:
+            self.root.after_cancel(self._apres)
+        except Exception:
+            pass
+        for _ in self._threads:
+            self._taches.put(None)
+        if attendre:
+            for t in self._threads:
+                t.join(timeout=5)
+
+
+# Sonde de réactivité : planifie un réveil toutes les `periode_ms` et mesure
+# le retard réel, c'est-à-dire le temps pendant lequel la boucle Tk était bloquée.
+class SondeLatence:
+    def __init__(self, root, periode_ms=20):
+        self.root = root
+        self.periode_ms = periode_ms
+        self.retards = []
+        self._attendu = None
+        self._apres = None
+
+    def demarrer(self):
+        self._attendu = time.perf_counter() + self.periode_ms / 1000
+        self._apres = self.root.after(self.periode_ms, self._tic)
+
+    def _tic(self):
+        maintenant = time.perf_counter()
+        self.retards.append(max(0.0, maintenant - self._attendu) * 1000)
+        self._attendu = maintenant + self.periode_ms / 1000
+        self._apres = self.root.after(self.periode_ms, self._tic)
+
+    def arreter(self):
+        if self._apres is not None:
+            self.root.after_cancel(self._apres)
+            self._apres = None
+
+    def rapport(self):
+        if not self.retards:
+            return {"mesures": 0}
+        r = sorted(self.retards)
+        return {
+            "mesures": len(r),
+            "p50_ms": r[len(r) // 2],
+            "p99_ms": r[min(len(r) - 1, int(len(r) * 0.99))],
+            "max_ms": r[-1],
+        }
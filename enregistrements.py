@@ -0,0 +1,214 @@
+from array import array
+from itertools import islice
+
+
+# Représentations compactes des lignes lues par crud (voir crud.FORMES).
+#
+#   - "enregistrement" : une instance par ligne, attributs nommés en __slots__
+#     (pas de __dict__ par objet). Se comporte aussi comme le tuple d'origine
+#     (indexation, déballage, len) : le code existant qui lit row[0] continue
+#     de fonctionner. Les textes répétés sont partagés entre instances.
+#   - "colonnes" : un objet Colonnes pour toutes les lignes, une colonne par
+#     champ : entiers et réels dans des array, textes répétés (noms de
+#     médicaments, de clients...) codés par dictionnaire, textes presque
+#     uniques (dates) en liste. Le coût par ligne tombe à quelques octets par
+#     colonne numérique ; les lignes sont reconstruites à la demande.
+#
+# Les champs suivent l'ordre des SELECT de crud (_SELECT_MEDICAMENTS, ...).
+# Les colonnes "int" et "float" doivent être NOT NULL.
+
+TAILLE_LOT = 10000
+
+
+class Enregistrement:
+    __slots__ = ()
+
+    def __iter__(self):
+        for c in self.__slots__:
+            yield getattr(self, c)
+
+    def __len__(self):
+        return len(self.__slots__)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return tuple(self)[i]
+        return getattr(self, self.__slots__[i])
+
+    def __eq__(self, autre):
+        if isinstance(autre, (Enregistrement, tuple)):
+            return tuple(self) == tuple(autre)
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        champs = ", ".join(f"{c}={getattr(self, c)!r}" for c in self.__slots__)
+        return f"{type(self).__name__}({champs})"
+
+    def en_dict(self):
+        return {c: getattr(self, c) for c in self.__slots__}
+
+    @classmethod
+    def lire(cls, lignes):
+        # une instance par ligne ; les textes répétés des colonnes "str" sont
+        # partagés (sqlite3 crée une nouvelle chaîne par ligne lue)
+        positions = [i for i, t in enumerate(cls.TYPES) if t == "str"]
+        partages = [{} for _ in positions]
+        res = []
+        for ligne in lignes:
+            ligne = list(ligne)
+            for i, vus in zip(positions, partages):
+                v = ligne[i]
+                ligne[i] = vus.setdefault(v, v)
+            res.append(cls(*ligne))
+        return res
+
+
+class Medicament(Enregistrement):
+    __slots__ = ("id", "nom", "code_barre", "quantite", "prix", "date_expiration")
+    TYPES = ("int", "str", "texte", "int", "float", "str")
+
+    def __init__(self, id, nom, code_barre, quantite, prix, date_expiration):
+        self.id = id
+        self.nom = nom
+        self.code_barre = code_barre
+        self.quantite = quantite
+        self.prix = prix
+        self.date_expiration = date_expiration
+
+
+class Client(Enregistrement):
+    __slots__ = ("id", "nom", "prenom", "naissance", "phone", "num_assurance")
+    TYPES = ("int", "str", "str", "str", "texte", "texte")
+
+    def __init__(self, id, nom, prenom, naissance, phone, num_assurance):
+        self.id = id
+        self.nom = nom
+        self.prenom = prenom
+        self.naissance = naissance
+        self.phone = phone
+        self.num_assurance = num_assurance
+
+
+class Vente(Enregistrement):
+    __slots__ = ("id", "medicament", "nom_client", "prenom_client", "quantite", "prix_total", "date_vente")
+    TYPES = ("int", "str", "str", "str", "int", "float", "texte")
+
+    def __init__(self, id, medicament, nom_client, prenom_client, quantite, prix_total, date_vente):
+        self.id = id
+        self.medicament = medicament
+        self.nom_client = nom_client
+        self.prenom_client = prenom_client
+        self.quantite = quantite
+        self.prix_total = prix_total
+        self.date_vente = date_vente
+
+
+class _ColonneDictionnaire:
+    # textes répétés : chaque valeur distincte stockée une fois, un code par ligne
+    __slots__ = ("codes", "valeurs", "_index")
+
+    def __init__(self):
+        self.codes = array("I")
+        self.valeurs = []
+        self._index = {}
+
+    def append(self, v):
+        code = self._index.get(v)
+        if code is None:
+            code = self._index[v] = len(self.valeurs)
+            self.valeurs.append(v)
+        self.codes.append(code)
+
+    def extend(self, valeurs):
+        index, codes = self._index, []
+        for v in valeurs:
+            code = index.get(v)
+            if code is None:
+                code = index[v] = len(self.valeurs)
+                self.valeurs.append(v)
+            codes.append(code)
+        self.codes.extend(codes)
+
+    def __getitem__(self, i):
+        return self.valeurs[self.codes[i]]
+
+    def __len__(self):
+        return len(self.codes)
+
+
+def _nouvelle_colonne(type_):
+    if type_ == "int":
+        return array("q")
+    if type_ == "float":
+        return array("d")
+    if type_ == "str":
+        return _ColonneDictionnaire()
+    if type_ == "texte":
+        return []
+    raise ValueError(f"Type de colonne inconnu : {type_}.")
+
+
+class Colonnes:
+    # toutes les lignes d'un type d'enregistrement, rangées par colonne
+    def __init__(self, type_enregistrement):
+        self.type = type_enregistrement
+        self.champs = type_enregistrement.__slots__
+        self._colonnes = [_nouvelle_colonne(t) for t in type_enregistrement.TYPES]
+
+    def ajouter(self, ligne):
+        for col, v in zip(self._colonnes, ligne):
+            col.append(v)
+
+    def etendre(self, lignes, taille_lot=TAILLE_LOT):
+        # par lots transposés : une extension de tableau par colonne et par lot
+        lignes = iter(lignes)
+        while True:
+            lot = list(islice(lignes, taille_lot))
+            if not lot:
+                return
+            for col, valeurs in zip(self._colonnes, zip(*lot)):
+                col.extend(valeurs)
+
+    def __len__(self):
+        return len(self._colonnes[0])
+
+    def ligne(self, i):
+        return tuple(col[i] for col in self._colonnes)
+
+    def enregistrement(self, i):
+        return self.type(*self.ligne(i))
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self.ligne(j) for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return self.ligne(i)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.ligne(i)
+
+    def colonne(self, nom):
+        # array pour "int"/"float" (utilisable tel quel par sum(), numpy.frombuffer...),
+        # liste de valeurs sinon
+        col = self._colonnes[self.champs.index(nom)]
+        if isinstance(col, _ColonneDictionnaire):
+            return [col.valeurs[c] for c in col.codes]
+        return col
+
+    def dictionnaire(self, nom):
+        # colonne "str" sous forme (codes, valeurs) : valeurs[codes[i]] est la
+        # valeur de la ligne i ; pratique pour regrouper sans recréer les textes
+        col = self._colonnes[self.champs.index(nom)]
+        if not isinstance(col, _ColonneDictionnaire):
+            raise ValueError(f"La colonne {nom} n'est pas codée par dictionnaire.")
+        return col.codes, col.valeurs
+
+    def __repr__(self):
+        return f"Colonnes({self.type.__name__}, {len(self)} lignes)"
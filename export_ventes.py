@@ -0,0 +1,262 @@
+import csv
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+import crud
+
+
+# Export de l'historique des ventes pour la comptabilité.
+# Les lignes sont lues en flux (curseur + fetchmany) : la mémoire utilisée ne
+# dépend pas de la taille de la table. Deux formats :
+#   - CSV
+#   - « colonnaire » (.phcol) : groupes de lignes, une colonne par bloc, entiers
+#     et réels en tableaux binaires, textes en dictionnaire ou bout à bout,
+#     chaque bloc compressé avec zlib. Relu par lire_colonnaire().
+#
+# Mode incrémental : exporter_ventes(..., tache="compta") n'exporte que les
+# ventes postérieures au dernier export de la même tâche (table etat_exports).
+#
+#   python export_ventes.py ventes.csv [--depuis 2024-01-01] [--jusqu 2024-01-31] [--tache compta]
+
+TAILLE_LOT = 5000
+LIGNES_PAR_GROUPE = 100_000
+
+COLONNES = (
+    ("id", "int"),
+    ("date_vente", "str"),
+    ("id_medicament", "int"),
+    ("medicament", "str"),
+    ("code_barre", "str"),
+    ("id_client", "int"),
+    ("nom_client", "str"),
+    ("prenom_client", "str"),
+    ("quantite", "int"),
+    ("prix_unitaire", "float"),
+    ("prix_total", "float"),
+    ("pharmacien", "str"),
+)
+
+_SELECT = """
+    SELECT v.id, v.date_vente, v.id_medicament, m.nom, m.code_barre, v.id_client,
+           c.nom, c.prenom, v.quantite, v.prix_unitaire, v.prix_total, v.pharmacien
+    FROM vente v
+    LEFT JOIN medicaments m ON v.id_medicament = m.id
+    LEFT JOIN clients c ON v.id_client = c.id
+"""
+
+MAGIC = b"PHCOL1"
+
+
+def iter_lignes(date_debut=None, date_fin=None, apres_id=0, taille_lot=TAILLE_LOT):
+    where, params = crud._filtres_ventes(date_debut=date_debut, date_fin=date_fin)
+    where.append("v.id > ?"); params.append(int(apres_id))
+    conn = crud.connect_db()
+    try:
+        cur = conn.execute(_SELECT + " WHERE " + " AND ".join(where) + " ORDER BY v.id", params)
+        while True:
+            lot = cur.fetchmany(taille_lot)
+            if not lot:
+                return
+            yield from lot
+    finally:
+        conn.close()
+
+
+# --- écrivains ---
+
+def _ecrire_csv(chemin, lignes):
+    n, dernier = 0, None
+    with open(chemin, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow([c for c, _ in COLONNES])
+        for ligne in lignes:
+            w.writerow(ligne)
+            n += 1
+            dernier = ligne[0]
+    return n, dernier
+
+
+def _encoder_colonne(valeurs, type_):
+    nulls = bytes(1 if v is None else 0 for v in valeurs)
+    entete = {"nulls": any(nulls)}
+    if type_ in ("int", "float"):
+        donnees = array("q" if type_ == "int" else "d", [0 if v is None else v for v in valeurs])
+        if sys.byteorder != "little":
+            donnees.byteswap()
+        corps = donnees.tobytes()
+        entete["encodage"] = "plain"
+    else:
+        textes = ["" if v is None else v for v in valeurs]
+        uniques = {}
+        for t in textes:
+            if t not in uniques:
+                uniques[t] = len(uniques)
+        if len(uniques) <= len(textes) // 2:
+            # peu de valeurs distinctes (médicaments, pharmaciens) : dictionnaire
+            dico = "\x00".join(uniques).encode("utf-8")
+            index = array("i", [uniques[t] for t in textes])
+            if sys.byteorder != "little":
+                index.byteswap()
+            corps = struct.pack("<I", len(dico)) + dico + index.tobytes()
+            entete["encodage"] = "dictionnaire"
+        else:
+            corps = "\x00".join(textes).encode("utf-8")
+            entete["encodage"] = "plain"
+    blocs = [zlib.compress(corps, 6)]
+    if entete["nulls"]:
+        blocs.append(zlib.compress(nulls, 6))
+    return entete, blocs
+
+
+def _ecrire_colonnaire(chemin, lignes, lignes_par_groupe=LIGNES_PAR_GROUPE):
+    n, dernier = 0, None
+    groupes = []
+    with open(chemin, "wb") as f:
+        f.write(MAGIC)
+
+        def vider(tampon):
+            groupe = {"lignes": len(tampon[0]), "colonnes": []}
+            for (nom, type_), valeurs in zip(COLONNES, tampon):
+                entete, blocs = _encoder_colonne(valeurs, type_)
+                entete["blocs"] = []
+                for b in blocs:
+                    entete["blocs"].append([f.tell(), len(b)])
+                    f.write(b)
+                groupe["colonnes"].append(entete)
+            groupes.append(groupe)
+
+        tampon = [[] for _ in COLONNES]
+        for ligne in lignes:
+            for col, v in zip(tampon, ligne):
+                col.append(v)
+            n += 1
+            dernier = ligne[0]
+            if len(tampon[0]) >= lignes_par_groupe:
+                vider(tampon)
+                tampon = [[] for _ in COLONNES]
+        if tampon[0]:
+            vider(tampon)
+
+        pied = json.dumps({"colonnes": COLONNES, "groupes": groupes, "lignes": n}).encode("utf-8")
+        f.write(pied)
+        f.write(struct.pack("<I", len(pied)))
+        f.write(MAGIC)
+    return n, dernier
+
+
+def _decoder_colonne(f, entete, type_, nb):
+    f.seek(entete["blocs"][0][0])
+    corps = zlib.decompress(f.read(entete["blocs"][0][1]))
+    if type_ in ("int", "float"):
+        valeurs = array("q" if type_ == "int" else "d")
+        valeurs.frombytes(corps)
+        if sys.byteorder != "little":
+            valeurs.byteswap()
+        valeurs = valeurs.tolist()
+    elif entete["encodage"] == "dictionnaire":
+        taille = struct.unpack_from("<I", corps)[0]
+        dico = corps[4:4 + taille].decode("utf-8").split("\x00")
+        index = array("i")
+        index.frombytes(corps[4 + taille:])
+        if sys.byteorder != "little":
+            index.byteswap()
+        valeurs = [dico[i] for i in index]
+    else:
+        valeurs = corps.decode("utf-8").split("\x00") if nb else []
+    if entete["nulls"]:
+        f.seek(entete["blocs"][1][0])
+        nulls = zlib.decompress(f.read(entete["blocs"][1][1]))
+        valeurs = [None if z else v for v, z in zip(valeurs, nulls)]
+    return valeurs
+
+
+def lire_colonnaire(chemin, colonnes=None):
+    # génère un dict {colonne: liste de valeurs} par groupe de lignes
+    with open(chemin, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError("Fichier colonnaire invalide.")
+        f.seek(-(4 + len(MAGIC)), os.SEEK_END)
+        taille = struct.unpack("<I", f.read(4))[0]
+        f.seek(-(4 + len(MAGIC) + taille), os.SEEK_END)
+        meta = json.loads(f.read(taille))
+        noms = [c for c, _ in meta["colonnes"]]
+        voulues = colonnes or noms
+        for groupe in meta["groupes"]:
+            res = {}
+            for (nom, type_), entete in zip(meta["colonnes"], groupe["colonnes"]):
+                if nom in voulues:
+                    res[nom] = _decoder_colonne(f, entete, type_, groupe["lignes"])
+            yield res
+
+
+# --- point d'entrée ---
+
+def _dernier_export(tache):
+    conn = crud.connect_db()
+    try:
+        r = conn.execute("SELECT dernier_id FROM etat_exports WHERE nom = ?", (tache,)).fetchone()
+        return r[0] if r else 0
+    finally:
+        conn.close()
+
+
+def _enregistrer_export(tache, dernier_id):
+    conn = crud.connect_db()
+    try:
+        conn.execute("""
+            INSERT INTO etat_exports (nom, dernier_id, date_export) VALUES (?, ?, CURRENT_TIMESTAMP)
+            ON CONFLICT(nom) DO UPDATE SET dernier_id = excluded.dernier_id, date_export = excluded.date_export
+        """, (tache, dernier_id))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def exporter_ventes(chemin, format=None, date_debut=None, date_fin=None, tache=None):
+    # renvoie le nombre de ventes exportées ; le format se déduit de l'extension
+    format = format or ("colonnaire" if chemin.endswith(".phcol") else "csv")
+    if format not in ("csv", "colonnaire"):
+        raise ValueError("Format d'export invalide (csv ou colonnaire).")
+    apres_id = _dernier_export(tache) if tache else 0
+    lignes = iter_lignes(date_debut, date_fin, apres_id)
+    # écriture dans un fichier temporaire : un export interrompu ne laisse
+    # pas de fichier partiel et ne fait pas avancer l'état incrémental
+    tmp = chemin + ".tmp"
+    try:
+        if format == "csv":
+            n, dernier = _ecrire_csv(tmp, lignes)
+        else:
+            n, dernier = _ecrire_colonnaire(tmp, lignes)
+        os.replace(tmp, chemin)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+    if tache and dernier is not None:
+        _enregistrer_export(tache, dernier)
+    return n
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args:
+        print("Usage : python export_ventes.py fichier.csv|fichier.phcol "
+              "[--depuis AAAA-MM-JJ] [--jusqu AAAA-MM-JJ] [--tache nom]")
+        sys.exit(2)
+    options = {"--depuis": None, "--jusqu": None, "--tache": None}
+    chemin = args.pop(0)
+    while args:
+        cle = args.pop(0)
+        if cle not in options or not args:
+            print(f"Option invalide : {cle}")
+            sys.exit(2)
+        options[cle] = args.pop(0)
+    n = exporter_ventes(chemin, date_debut=options["--depuis"], date_fin=options["--jusqu"],
+                        tache=options["--tache"])
+    print(f"{n} ventes exportées vers {chemin}")
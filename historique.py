@@ -0,0 +1,138 @@
+import threading
+from datetime import datetime, timedelta
+
+import crud
+from instrumentation import instrumente
+
+
+# Historique des actions (journal d'audit) persistant, table historique.
+#
+# ajouter() ne fait que mettre l'action en mémoire tampon ; un thread écrit le
+# tampon en une seule transaction toutes les `intervalle` secondes, ou dès que
+# `taille_lot` actions attendent. Les lectures vident d'abord le tampon.
+#
+# Lecture par pages (plus récentes d'abord, pagination par id) et rétention :
+# appliquer_retention() ne garde que les `garder` dernières actions, et
+# éventuellement que celles des `jours` derniers jours.
+#
+#   h = Historique()
+#   h.ajouter("Suppression médicament ID 4", "medicaments", 4)
+#   lignes, suivant = h.fetch_page()
+#   h.fermer()
+
+INTERVALLE = 0.5
+TAILLE_LOT = 500
+PAGE_SIZE = 200
+GARDER = 100_000
+
+_INSERT = "INSERT INTO historique (horodatage, action, entite, id_entite) VALUES (?, ?, ?, ?)"
+
+
+class Historique:
+    def __init__(self, intervalle=INTERVALLE, taille_lot=TAILLE_LOT):
+        self.intervalle = intervalle
+        self.taille_lot = taille_lot
+        self._tampon = []
+        self._lock = threading.Lock()
+        self._ecriture = threading.Lock()   # une seule écriture de lot à la fois
+        self._reveil = threading.Event()
+        self._arrete = False
+        self._thread = threading.Thread(target=self._boucle, name="historique", daemon=True)
+        self._thread.start()
+
+    def ajouter(self, action, entite=None, id_entite=None):
+        horodatage = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            self._tampon.append((horodatage, action, entite, id_entite))
+            plein = len(self._tampon) >= self.taille_lot
+        if plein:
+            self._reveil.set()
+
+    def _boucle(self):
+        while not self._arrete:
+            self._reveil.wait(self.intervalle)
+            self._reveil.clear()
+            try:
+                self.vider()
+            except Exception:
+                pass  # base momentanément indisponible : nouvel essai au tour suivant
+
+    @instrumente
+    def vider(self):
+        # écrit le tampon ; renvoie le nombre d'actions écrites
+        with self._ecriture:
+            with self._lock:
+                lot, self._tampon = self._tampon, []
+            if not lot:
+                return 0
+            conn = crud.connect_db()
+            try:
+                conn.executemany(_INSERT, lot)
+                conn.commit()
+            except Exception:
+                with self._lock:
+                    self._tampon[:0] = lot   # rien n'est perdu, l'ordre est conservé
+                raise
+            finally:
+                conn.close()
+            return len(lot)
+
+    def fermer(self):
+        self._arrete = True
+        self._reveil.set()
+        self._thread.join(timeout=5)
+        self.vider()
+
+    # --- lecture ---
+
+    @instrumente
+    def fetch_page(self, avant=None, limite=PAGE_SIZE, entite=None, id_entite=None):
+        # (lignes, suivant) ; lignes : (id, horodatage, action, entite, id_entite),
+        # plus récentes d'abord ; suivant : `avant` de la page suivante (None à la fin)
+        self.vider()
+        where, params = [], []
+        if avant is not None:
+            where.append("id < ?"); params.append(int(avant))
+        if entite is not None:
+            where.append("entite = ?"); params.append(entite)
+        if id_entite is not None:
+            where.append("id_entite = ?"); params.append(int(id_entite))
+        params.append(int(limite) + 1)
+        conn = crud.connect_db()
+        try:
+            rows = conn.execute(f"""
+                SELECT id, horodatage, action, entite, id_entite FROM historique
+                {"WHERE " + " AND ".join(where) if where else ""}
+                ORDER BY id DESC LIMIT ?
+            """, params).fetchall()
+        finally:
+            conn.close()
+        if len(rows) > limite:
+            return rows[:limite], rows[limite - 1][0]
+        return rows, None
+
+    @instrumente
+    def compter(self):
+        self.vider()
+        conn = crud.connect_db()
+        try:
+            return conn.execute("SELECT COUNT(*) FROM historique").fetchone()[0]
+        finally:
+            conn.close()
+
+    @instrumente
+    def appliquer_retention(self, garder=GARDER, jours=None):
+        # renvoie le nombre d'actions supprimées
+        self.vider()
+        conn = crud.connect_db()
+        try:
+            n = conn.execute("""
+                DELETE FROM historique WHERE id <= (SELECT MAX(id) FROM historique) - ?
+            """, (int(garder),)).rowcount
+            if jours is not None:
+                limite = (datetime.now() - timedelta(days=int(jours))).strftime("%Y-%m-%d %H:%M:%S")
+                n += conn.execute("DELETE FROM historique WHERE horodatage < ?", (limite,)).rowcount
+            conn.commit()
+            return n
+        finally:
+            conn.close()
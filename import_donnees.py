@@ -0,0 +1,218 @@
+import csv
+import json
+import os
+import sqlite3
+import sys
+import time
+
+import crud
+import instrumentation
+import stockage
+
+
+# Import en masse de médicaments et de clients depuis un fichier CSV ou JSON.
+# Le fichier est lu en flux, validé ligne par ligne avec les mêmes règles que
+# crud.ajouter_medicament / crud.ajouter_client, puis inséré par lots
+# (executemany, une transaction par lot). Les lignes rejetées sont renvoyées
+# avec leur numéro et le motif.
+#
+#   python import_donnees.py medicaments catalogue.csv
+#   python import_donnees.py clients clients.json
+#
+# Formats : CSV avec en-tête, JSON (tableau d'objets) ou JSON Lines (.jsonl).
+# Colonnes : nom, code_barre, description, quantite, prix, date_expiration
+#            nom, prenom, naissance, phone, num_assurance
+#
+# L'import utilise sa propre connexion, réglée avec le profil « import »
+# (synchronous=OFF, gros cache) : le profil et les pools de crud, donc la
+# durabilité des ventes faites en parallèle, ne sont pas modifiés.
+
+TAILLE_LOT = 10000
+
+COLONNES_MEDICAMENTS = ("nom", "code_barre", "description", "quantite", "prix", "date_expiration")
+COLONNES_CLIENTS = ("nom", "prenom", "naissance", "phone", "num_assurance")
+
+
+# --- lecture en flux ---
+
+def lire_csv(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.DictReader(f)
+
+
+def lire_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        for ligne in f:
+            if ligne.strip():
+                yield json.loads(ligne)
+
+
+def lire_json(path, taille_bloc=1 << 16):
+    # tableau JSON décodé objet par objet, sans charger tout le fichier
+    decodeur = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        tampon = ""
+        debut = True
+        fini = False
+        while True:
+            bloc = f.read(taille_bloc)
+            tampon += bloc
+            pos = 0
+            while True:
+                while pos < len(tampon) and tampon[pos] in " \t\r\n,":
+                    pos += 1
+                if debut and pos < len(tampon):
+                    if tampon[pos] != "[":
+                        raise ValueError("Le fichier JSON doit contenir un tableau d'objets.")
+                    debut = False
+                    pos += 1
+                    continue
+                if pos < len(tampon) and tampon[pos] == "]":
+                    fini = True
+                    break
+                try:
+                    obj, fin = decodeur.raw_decode(tampon, pos)
+                except json.JSONDecodeError:
+                    break  # objet incomplet : lire le bloc suivant
+                yield obj
+                pos = fin
+            tampon = tampon[pos:]
+            if fini:
+                return
+            if not bloc:
+                if tampon.strip():
+                    raise ValueError("Fichier JSON tronqué ou invalide.")
+                return
+
+
+def lire(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        return lire_csv(path)
+    if ext in (".jsonl", ".ndjson"):
+        return lire_jsonl(path)
+    if ext == ".json":
+        return lire_json(path)
+    raise ValueError(f"Format non pris en charge : {ext} (csv, json, jsonl).")
+
+
+def _lots(lignes, taille):
+    lot = []
+    for numero, ligne in enumerate(lignes, start=1):
+        lot.append((numero, ligne))
+        if len(lot) >= taille:
+            yield lot
+            lot = []
+    if lot:
+        yield lot
+
+
+# --- import ---
+
+def _valeurs(ligne, colonnes):
+    if not isinstance(ligne, dict):
+        raise ValueError("Ligne invalide (objet attendu).")
+    # les champs JSON numériques (code-barres, téléphone...) sont ramenés au texte
+    return [None if ligne.get(c) is None else str(ligne.get(c)) for c in colonnes]
+
+
+def _inserer(conn, sql, lot, rejets):
+    # lot : [(numero, valeurs)] ; en cas de conflit, on annule le lot
+    # (savepoint) et on le repasse ligne par ligne
+    conn.execute("SAVEPOINT lot")
+    try:
+        conn.executemany(sql, [v for _, v in lot])
+        conn.execute("RELEASE lot")
+        return len(lot)
+    except sqlite3.IntegrityError:
+        conn.execute("ROLLBACK TO lot")
+        conn.execute("RELEASE lot")
+    n = 0
+    for numero, v in lot:
+        try:
+            conn.execute(sql, v)
+            n += 1
+        except sqlite3.IntegrityError as e:
+            rejets.append((numero, "Erreur base (contrainte) : " + str(e)))
+    return n
+
+
+def _connexion_import():
+    conn = sqlite3.connect(crud.DB)
+    conn.execute("PRAGMA foreign_keys = ON;")
+    # journal_mode laissé tel quel : il vaut pour toutes les connexions au fichier
+    stockage.appliquer_profil(conn, "import", journal=False)
+    instrumentation.suivre_connexion(conn)
+    return conn
+
+
+def _importer(lignes, colonnes, valider, sql, taille_lot, filtrer_lot=None):
+    rapport = {"importes": 0, "rejets": [], "duree": 0.0}
+    t0 = time.perf_counter()
+    conn = _connexion_import()
+    try:
+        for lot in _lots(lignes, taille_lot):
+            valides = []
+            for numero, ligne in lot:
+                try:
+                    valides.append((numero, valider(*_valeurs(ligne, colonnes))))
+                except ValueError as e:
+                    rapport["rejets"].append((numero, str(e)))
+            if filtrer_lot is not None:
+                valides = filtrer_lot(conn, valides, rapport["rejets"])
+            rapport["importes"] += _inserer(conn, sql, valides, rapport["rejets"])
+            conn.commit()
+    finally:
+        conn.close()
+    rapport["rejets"].sort()
+    rapport["duree"] = time.perf_counter() - t0
+    return rapport
+
+
+def _filtrer_codes_barres(conn, valides, rejets):
+    # unicité du code-barres : dans le lot et par rapport à la base (une requête par lot)
+    codes = [v[1] for _, v in valides]
+    existants = set()
+    for i in range(0, len(codes), 900):
+        part = codes[i:i + 900]
+        existants.update(r for (r,) in conn.execute(
+            f"SELECT code_barre FROM medicaments WHERE code_barre IN ({','.join('?' * len(part))})", part))
+    garde = []
+    vus = set()
+    for numero, v in valides:
+        if v[1] in existants or v[1] in vus:
+            rejets.append((numero, "Un médicament avec ce code-barres existe déjà."))
+        else:
+            vus.add(v[1])
+            garde.append((numero, v))
+    return garde
+
+
+def importer_medicaments(source, taille_lot=TAILLE_LOT):
+    # source : chemin de fichier ou itérable de dictionnaires
+    lignes = lire(source) if isinstance(source, str) else source
+    return _importer(lignes, COLONNES_MEDICAMENTS, crud.valider_medicament, """
+        INSERT INTO medicaments (nom, code_barre, description, quantite, prix, date_expiration)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, taille_lot, _filtrer_codes_barres)
+
+
+def importer_clients(source, taille_lot=TAILLE_LOT):
+    lignes = lire(source) if isinstance(source, str) else source
+    return _importer(lignes, COLONNES_CLIENTS, crud.valider_client, """
+        INSERT INTO clients (nom, prenom, naissance, phone, num_assurance)
+        VALUES (?, ?, ?, ?, ?)
+    """, taille_lot)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3 or sys.argv[1] not in ("medicaments", "clients"):
+        print("Usage : python import_donnees.py medicaments|clients fichier.csv|.json|.jsonl")
+        sys.exit(2)
+    fonction = importer_medicaments if sys.argv[1] == "medicaments" else importer_clients
+    r = fonction(sys.argv[2])
+    print(f"{r['importes']} lignes importées, {len(r['rejets'])} rejetées en {r['duree']:.1f} s")
+    for numero, motif in r["rejets"][:50]:
+        print(f"  ligne {numero} : {motif}")
+    if len(r["rejets"]) > 50:
+        print(f"  ... {len(r['rejets']) - 50} autres rejets")
@@ -0,0 +1,356 @@
+import cProfile
+import csv
+import functools
+import json
+import math
+import pstats
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+
+# Instrumentation des opérations (crud, statistiques, alertes, interface).
+#
+# @instrumente enveloppe une fonction. Tant que l'instrumentation est
+# désactivée (par défaut), l'enveloppe se contente de tester un booléen avant
+# d'appeler la fonction. Après activer(), chaque appel enregistre :
+#   - sa durée, dans un histogramme logarithmique (percentiles à ~4 % près)
+#   - le nombre d'instructions SQL et de COMMIT exécutés pendant l'appel, relevés
+#     par le trace callback des connexions suivies (suivre_connexion) ; chaque
+#     instruction compte, y compris celles des triggers (SQLite les signale
+#     avec le texte de la requête qui les déclenche)
+#   - le nombre de lignes renvoyées (listes, tableaux, pages (lignes, suivant))
+# Les appels imbriqués comptent pour chaque opération englobante (durées et
+# compteurs inclusifs).
+#
+# Options de activer() :
+#   trace_sql=True  compte aussi chaque requête, littéraux remplacés par ?
+#                   (requetes_frequentes())
+#   profil=True     cProfile autour des opérations de premier niveau, un
+#                   thread à la fois (un seul profileur actif par processus
+#                   depuis Python 3.12) ; arreter_profil(chemin) enregistre
+#
+#   instrumentation.activer()
+#   ...
+#   print(instrumentation.formater_rapport())
+#   instrumentation.exporter("perf.json")
+
+PAS = 16   # sous-divisions de l'histogramme par puissance de 2
+
+_actif = False
+_trace_sql = False
+_profil_actif = False
+_lock = threading.Lock()
+_local = threading.local()
+_operations = {}
+_requetes = Counter()
+_connexions = []
+_profil = None
+_profil_lock = threading.Lock()   # détenu par le thread en cours de profilage
+
+
+class Histogramme:
+    def __init__(self):
+        self.compteurs = {}   # indice de classe -> nombre d'appels
+        self.nombre = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def ajouter(self, secondes):
+        us = secondes * 1e6
+        i = int(math.log2(us) * PAS) if us > 1 else 0
+        self.compteurs[i] = self.compteurs.get(i, 0) + 1
+        self.nombre += 1
+        self.total += secondes
+        if secondes > self.max:
+            self.max = secondes
+
+    def percentile(self, p):
+        # en millisecondes (milieu de la classe, borné par le maximum observé)
+        if not self.nombre:
+            return 0.0
+        rang = p / 100 * self.nombre
+        cumul = 0
+        for i in sorted(self.compteurs):
+            cumul += self.compteurs[i]
+            if cumul >= rang:
+                return min(2 ** ((i + 0.5) / PAS) / 1000, self.max * 1000)
+        return self.max * 1000
+
+
+class _Operation:
+    __slots__ = ("histogramme", "sql", "commits", "lignes", "erreurs")
+
+    def __init__(self):
+        self.histogramme = Histogramme()
+        self.sql = 0
+        self.commits = 0
+        self.lignes = 0
+        self.erreurs = 0
+
+
+# --- enregistrement ---
+
+def instrumente(fn=None, *, nom=None):
+    # @instrumente ou @instrumente(nom="...") ; nom par défaut : module.fonction
+    if fn is None:
+        return lambda f: instrumente(f, nom=nom)
+    nom = nom or f"{fn.__module__}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def enveloppe(*args, **kwargs):
+        if not _actif:
+            return fn(*args, **kwargs)
+        return _appeler(nom, fn, args, kwargs)
+    return enveloppe
+
+
+def _pile():
+    pile = getattr(_local, "pile", None)
+    if pile is None:
+        pile = _local.pile = []
+    return pile
+
+
+def _appeler(nom, fn, args, kwargs):
+    pile = _pile()
+    compteurs = [0, 0]   # instructions SQL, COMMIT
+    profil = None
+    ok = False
+    t0 = time.perf_counter()
+    pile.append(compteurs)
+    try:
+        if _profil_actif and len(pile) == 1:
+            profil = _demarrer_profil()
+        res = fn(*args, **kwargs)
+        ok = True
+        return res
+    finally:
+        duree = time.perf_counter() - t0
+        if profil is not None:
+            _suspendre_profil(profil)
+        pile.pop()
+        _ajouter(nom, duree, compteurs[0], compteurs[1], _nb_lignes(res) if ok else 0, not ok)
+
+
+def _ajouter(nom, duree, sql, commits, lignes, erreur):
+    with _lock:
+        op = _operations.get(nom)
+        if op is None:
+            op = _operations[nom] = _Operation()
+        op.histogramme.ajouter(duree)
+        op.sql += sql
+        op.commits += commits
+        op.lignes += lignes
+        op.erreurs += erreur
+
+
+def enregistrer(nom, duree):
+    # durée mesurée ailleurs (file d'attente de l'exécuteur, callbacks Tk...)
+    if _actif:
+        _ajouter(nom, duree, 0, 0, 0, False)
+
+
+def actif():
+    return _actif
+
+
+def _nb_lignes(res):
+    if isinstance(res, tuple) and len(res) == 2 and isinstance(res[0], list):
+        res = res[0]   # page (lignes, suivant)
+    if res is None or isinstance(res, (str, bytes, dict)):
+        return 0
+    if isinstance(res, tuple):
+        return 1
+    try:
+        return len(res)
+    except TypeError:
+        return 0
+
+
+# --- SQL ---
+
+_LITTERAUX = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_LISTES = re.compile(r"\?(?:\s*,\s*\?)+")
+
+
+def _normaliser(sql):
+    # le trace callback reçoit la requête avec ses paramètres développés
+    sql = _LISTES.sub("?, ...", _LITTERAUX.sub("?", " ".join(sql.split())))
+    return sql[:300]
+
+
+def _tracer(sql):
+    pile = getattr(_local, "pile", None)
+    if pile:
+        commit = sql.startswith("COMMIT")
+        for c in pile:
+            c[0] += 1
+            if commit:
+                c[1] += 1
+    if _trace_sql:
+        sql = _normaliser(sql)
+        with _lock:
+            _requetes[sql] += 1
+
+
+def suivre_connexion(conn):
+    # à appeler pour chaque connexion sqlite3 dont on veut compter les requêtes.
+    # Suivie même désactivé : activer() doit atteindre les connexions du pool
+    # restées ouvertes. Les connexions déjà fermées sont oubliées ici, la liste
+    # ne garde donc que les connexions ouvertes.
+    with _lock:
+        _connexions[:] = [c for c in _connexions if _ouverte(c)]
+        _connexions.append(conn)
+    if _actif:
+        conn.set_trace_callback(_tracer)
+
+
+def _ouverte(conn):
+    try:
+        conn.total_changes
+        return True
+    except sqlite3.ProgrammingError:
+        return False
+
+
+def _poser_traces(callback):
+    with _lock:
+        vivantes = []
+        for conn in _connexions:
+            try:
+                conn.set_trace_callback(callback)
+            except sqlite3.ProgrammingError:
+                continue   # connexion fermée : on l'oublie
+            vivantes.append(conn)
+        _connexions[:] = vivantes
+
+
+# --- profilage ---
+
+def _demarrer_profil():
+    # un seul thread profilé à la fois : les opérations lancées pendant ce
+    # temps par d'autres threads ne sont pas profilées (mais restent mesurées)
+    global _profil
+    if not _profil_lock.acquire(blocking=False):
+        return None
+    try:
+        if _profil is None:
+            _profil = cProfile.Profile()
+        _profil.enable()
+    except ValueError:
+        # un autre profileur est déjà actif (cProfile lancé par l'utilisateur...)
+        _profil_lock.release()
+        return None
+    return _profil
+
+
+def _suspendre_profil(profil):
+    try:
+        profil.disable()
+    finally:
+        _profil_lock.release()
+
+
+def arreter_profil(chemin=None):
+    # renvoie un pstats.Stats (ou None si rien n'a été profilé)
+    global _profil_actif, _profil
+    _profil_actif = False
+    with _profil_lock:   # attend la fin de l'opération profilée en cours
+        profil, _profil = _profil, None
+    if profil is None:
+        return None
+    try:
+        stats = pstats.Stats(profil)
+    except TypeError:
+        return None   # profil vide
+    if chemin:
+        stats.dump_stats(chemin)
+    return stats
+
+
+# --- pilotage ---
+
+def activer(trace_sql=False, profil=False):
+    global _actif, _trace_sql, _profil_actif
+    _trace_sql = trace_sql
+    _profil_actif = profil
+    _actif = True
+    _poser_traces(_tracer)
+
+
+def desactiver():
+    global _actif, _trace_sql
+    _actif = False
+    _trace_sql = False
+    _poser_traces(None)
+    arreter_profil()
+
+
+def reinitialiser():
+    with _lock:
+        _operations.clear()
+        _requetes.clear()
+
+
+# --- rapport ---
+
+COLONNES_RAPPORT = ("operation", "appels", "p50_ms", "p95_ms", "p99_ms", "max_ms", "total_ms",
+                    "sql_par_appel", "commits", "lignes", "erreurs")
+
+
+def rapport():
+    # une ligne par opération, triée par temps total décroissant
+    with _lock:
+        ops = [(nom, op.histogramme, op.sql, op.commits, op.lignes, op.erreurs)
+               for nom, op in _operations.items()]
+    lignes = []
+    for nom, h, sql, commits, nb_lignes, erreurs in ops:
+        lignes.append({
+            "operation": nom,
+            "appels": h.nombre,
+            "p50_ms": h.percentile(50),
+            "p95_ms": h.percentile(95),
+            "p99_ms": h.percentile(99),
+            "max_ms": h.max * 1000,
+            "total_ms": h.total * 1000,
+            "sql_par_appel": sql / h.nombre if h.nombre else 0.0,
+            "commits": commits,
+            "lignes": nb_lignes,
+            "erreurs": erreurs,
+        })
+    lignes.sort(key=lambda l: l["total_ms"], reverse=True)
+    return lignes
+
+
+def requetes_frequentes(n=20):
+    with _lock:
+        return _requetes.most_common(n)
+
+
+def formater_rapport(lignes=None):
+    lignes = rapport() if lignes is None else lignes
+    texte = [f"{'opération':<45} {'appels':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9} "
+             f"{'total':>10} {'sql/app':>8} {'commits':>8} {'lignes':>9}"]
+    for l in lignes:
+        texte.append(f"{l['operation']:<45} {l['appels']:>8} {l['p50_ms']:>9.3f} {l['p95_ms']:>9.3f} "
+                     f"{l['p99_ms']:>9.3f} {l['max_ms']:>9.3f} {l['total_ms']:>10.1f} "
+                     f"{l['sql_par_appel']:>8.1f} {l['commits']:>8} {l['lignes']:>9}")
+    return "\n".join(texte)
+
+
+def exporter(chemin):
+    # .csv : tableau du rapport ; sinon JSON (rapport + requêtes fréquentes)
+    lignes = rapport()
+    if chemin.lower().endswith(".csv"):
+        with open(chemin, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=COLONNES_RAPPORT)
+            w.writeheader()
+            w.writerows(lignes)
+    else:
+        with open(chemin, "w", encoding="utf-8") as f:
+            json.dump({"operations": lignes, "requetes": requetes_frequentes(100)}, f,
+                      ensure_ascii=False, indent=2)
+    return len(lignes)
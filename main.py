@@ -1,50 +1,128 @@
+import time
+_DEBUT = time.perf_counter()
+
+import os
 import tkinter as tk
-from tkinter import ttk, messagebox
-from datetime import datetime
+from tkinter import ttk, messagebox, filedialog
+from datetime import datetime, timedelta
 import crud
+import statistiques
+import alertes
 import db_phamarcie
-
-# Initialisation de la BD
+import instrumentation
+from historique import Historique
+from db_worker import ExecuteurDB, SondeLatence
+from tableau_virtuel import TableauVirtuel
+from autocompletion import ChampAutocompletion
+
+# Initialisation de la BD : ne rejoue le DDL que si le schéma n'est pas à jour
+# (PRAGMA user_version, voir db_phamarcie.MIGRATIONS)
 db_phamarcie.create_table()
 
-# Historique
-historique_actions = []
+# Historique persistant (table historique, écritures groupées par historique.py)
+historique = Historique()
 
-def ajouter_historique(action):
-    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    historique_actions.append(f"[{now}] {action}")
-    refresh_historique()
+def ajouter_historique(action, entite=None, id_entite=None):
+    historique.ajouter(action, entite, id_entite)
+    if historique_visible():
+        refresh_historique()
 
 # Interface principale 
 root = tk.Tk()
 root.title("Gestion de Pharmacie")
 root.geometry("1200x650")
 
+# Les appels à la base passent par des threads de travail : la fenêtre reste
+# réactive pendant les requêtes longues ou les attentes de verrou.
+executeur = ExecuteurDB(root)
+
+def erreur_db(e):
+    messagebox.showerror("Erreur", str(e))
+
+# maintenance de démarrage en arrière-plan : la fenêtre n'attend pas les purges
+executeur.soumettre(crud.purger_journal, erreur=lambda e: None)
+executeur.soumettre(historique.appliquer_retention, erreur=lambda e: None)
+
+# PHARMACIE_SONDE=1 : mesure la réactivité de l'interface (affichée à la fermeture)
+sonde = None
+if os.environ.get("PHARMACIE_SONDE"):
+    sonde = SondeLatence(root)
+    sonde.demarrer()
+
+# PHARMACIE_PERF=1 : instrumentation active dès le démarrage (onglet Performance)
+if os.environ.get("PHARMACIE_PERF"):
+    instrumentation.activer()
+
 notebook = ttk.Notebook(root)
 notebook.pack(fill="both", expand=True)
 
 frame_meds = ttk.Frame(notebook)
 frame_clients = ttk.Frame(notebook)
 frame_ventes = ttk.Frame(notebook)
+frame_stats = ttk.Frame(notebook)
+frame_alertes = ttk.Frame(notebook)
 frame_histo = ttk.Frame(notebook)
+frame_perf = ttk.Frame(notebook)
 
 notebook.add(frame_meds, text="Médicaments")
 notebook.add(frame_clients, text="Clients")
 notebook.add(frame_ventes, text="Ventes")
+notebook.add(frame_stats, text="Statistiques")
+notebook.add(frame_alertes, text="Alertes")
 notebook.add(frame_histo, text="Historique")
+notebook.add(frame_perf, text="Performance")
+
+
+# Rafraîchissement incrémental : après une opération, seules les lignes
+# inscrites au journal des modifications sont rechargées dans les tableaux.
+# La position dans le journal est lue en arrière-plan ; tant qu'elle n'est
+# pas connue, un rafraîchissement recharge les tableaux en entier.
+dernier_seq = None
+
+def _position_journal(seq):
+    global dernier_seq
+    dernier_seq = seq if dernier_seq is None else max(dernier_seq, seq)
+
+executeur.soumettre(crud.dernier_changement, succes=_position_journal, erreur=erreur_db)
+
+def rafraichir_tableaux():
+    if dernier_seq is None:
+        afficher_medicaments()
+        afficher_clients()
+        afficher_ventes()
+        verifier_alertes()
+        return
+
+    def appliquer(res):
+        seq, changements = res
+        _position_journal(seq)
+        for table, tree in (("medicaments", meds_tree), ("clients", clients_tree), ("vente", ventes_tree)):
+            if table in changements:
+                if table == "medicaments" and recherche_meds:
+                    # résultats classés par pertinence : on relance la recherche
+                    afficher_medicaments()
+                else:
+                    tree.appliquer_changements(*changements[table])
+    executeur.soumettre(crud.fetch_changements, dernier_seq, succes=appliquer, cle="changements",
+                        erreur=lambda e: messagebox.showerror("Erreur", f"Erreur de rafraîchissement: {e}"))
+    verifier_alertes()
 
 
 
 # MÉDICAMENTS
 
+# recherche en cours dans l'onglet Médicaments ("" : tout le catalogue)
+recherche_meds = ""
+_apres_recherche = None
+DELAI_RECHERCHE_MS = 250
+
 def afficher_medicaments():
-    meds_tree.delete(*meds_tree.get_children())
-    try:
-        rows = crud.fetch_medicaments()
-        for row in rows:
-            meds_tree.insert("", "end", values=row)
-    except Exception as e:
-        messagebox.showerror("Erreur", f"Erreur lors du chargement des médicaments: {e}")
+    if recherche_meds:
+        executeur.soumettre(crud.rechercher_medicaments_ids, recherche_meds, succes=meds_tree.definir_ids,
+                            cle="ids_medicaments", erreur=erreur_db)
+        return
+    executeur.soumettre(meds_tree.charger_ids, succes=meds_tree.definir_ids, cle="ids_medicaments",
+                        erreur=lambda e: messagebox.showerror("Erreur", f"Erreur lors du chargement des médicaments: {e}"))
 
 def ajouter_medicament():
     try:
@@ -84,14 +162,16 @@ def ajouter_medicament():
                 messagebox.showerror("Erreur", "La date d'expiration doit être future.")
                 return
 
-        res = crud.ajouter_medicament(nom, code, desc, qte, prix, date_exp)
-        if res is True:
-            messagebox.showinfo("Succès", f"Médicament '{nom}' ajouté.")
-            ajouter_historique(f"Ajout médicament: {nom}")
-            afficher_medicaments()
-        else:
-            # si crud renvoie une string (erreur), afficher
-            messagebox.showerror("Erreur", str(res))
+        def termine(res):
+            if res is True:
+                messagebox.showinfo("Succès", f"Médicament '{nom}' ajouté.")
+                ajouter_historique(f"Ajout médicament: {nom}", "medicaments")
+                rafraichir_tableaux()
+            else:
+                # si crud renvoie une string (erreur), afficher
+                messagebox.showerror("Erreur", str(res))
+        executeur.soumettre(crud.ajouter_medicament, nom, code, desc, qte, prix, date_exp,
+                            succes=termine, erreur=erreur_db)
     except Exception as e:
         messagebox.showerror("Erreur", str(e))
 
@@ -102,9 +182,11 @@ def supprimer_medicament():
             messagebox.showwarning("Sélection requise", "Sélectionnez un médicament.")
             return
         id_med = meds_tree.item(selected)["values"][0]
-        crud.supprimer_medicament(id_med)
-        ajouter_historique(f"Suppression médicament ID {id_med}")
-        afficher_medicaments()
+
+        def termine(res):
+            ajouter_historique(f"Suppression médicament ID {id_med}", "medicaments", id_med)
+            rafraichir_tableaux()
+        executeur.soumettre(crud.supprimer_medicament, id_med, succes=termine, erreur=erreur_db)
     except Exception as e:
         messagebox.showerror("Erreur", str(e))
 
@@ -123,20 +205,18 @@ def remplir_champs_medicament(event):
     # fill code and desc mod fields too if exist
     entry_code_mod.delete(0, tk.END)
     entry_code_mod.insert(0, values[2] if len(values) > 2 else "")
-    # description not in fetch_medicaments row by default; we try to query it
-    try:
-        conn = crud.connect_db()
-        cur = conn.cursor()
-        cur.execute("SELECT description, date_expiration FROM medicaments WHERE id = ?", (values[0],))
-        r = cur.fetchone()
-        conn.close()
+    # description not in fetch_medicaments row by default; we query it in the background
+    # (une nouvelle sélection annule la lecture précédente)
+    def remplir_details(r):
         if r:
             entry_desc_mod.delete(0, tk.END)
             entry_desc_mod.insert(0, r[0] or "")
             entry_date_mod.delete(0, tk.END)
             entry_date_mod.insert(0, r[1] or "")
-    except:
-        pass
+            entry_seuil_mod.delete(0, tk.END)
+            entry_seuil_mod.insert(0, r[2] if r[2] is not None else "")
+    executeur.soumettre(crud.fetch_medicament_details, values[0], succes=remplir_details,
+                        erreur=lambda e: None, cle="details_medicament")
 
 def modifier_medicament():
     try:
@@ -151,6 +231,7 @@ def modifier_medicament():
         code = entry_code_mod.get().strip() or None
         desc = entry_desc_mod.get().strip() or None
         date_exp = entry_date_mod.get().strip() or None
+        seuil = entry_seuil_mod.get().strip() or None
 
         qte_val = None
         prix_val = None
@@ -184,13 +265,16 @@ def modifier_medicament():
                 return
 
         # Call crud.modifier_medicament with full set (it accepts None for fields to skip)
-        res = crud.modifier_medicament(id_med, nom=nom, quantite=qte_val, prix=prix_val, description=desc, code_barre=code, date_expiration=date_exp)
-        if res is True:
-            messagebox.showinfo("Succès", f"Médicament ID {id_med} modifié.")
-            ajouter_historique(f"Modification médicament ID {id_med}")
-            afficher_medicaments()
-        else:
-            messagebox.showerror("Erreur", str(res))
+        def termine(res):
+            if res is True:
+                messagebox.showinfo("Succès", f"Médicament ID {id_med} modifié.")
+                ajouter_historique(f"Modification médicament ID {id_med}", "medicaments", id_med)
+                rafraichir_tableaux()
+            else:
+                messagebox.showerror("Erreur", str(res))
+        executeur.soumettre(crud.modifier_medicament, id_med, nom=nom, quantite=qte_val, prix=prix_val,
+                            description=desc, code_barre=code, date_expiration=date_exp,
+                            seuil_alerte=seuil, succes=termine, erreur=erreur_db)
     except Exception as e:
         messagebox.showerror("Erreur", str(e))
 
@@ -224,13 +308,41 @@ tk.Button(frm_top, text="Ajouter", command=ajouter_medicament).grid(row=3, colum
 tk.Button(frm_top, text="Supprimer", command=supprimer_medicament).grid(row=3, column=1)
 tk.Button(frm_top, text="Actualiser", command=afficher_medicaments).grid(row=3, column=2)
 
+# Recherche à la frappe : la requête part DELAI_RECHERCHE_MS après la dernière
+# touche, et un résultat périmé est écarté (même clé d'exécuteur)
+def recherche_modifiee(event=None):
+    global _apres_recherche
+    if _apres_recherche is not None:
+        root.after_cancel(_apres_recherche)
+    _apres_recherche = root.after(DELAI_RECHERCHE_MS, lancer_recherche)
+
+def lancer_recherche():
+    global recherche_meds, _apres_recherche
+    _apres_recherche = None
+    texte = entry_recherche.get().strip()
+    if texte != recherche_meds:
+        recherche_meds = texte
+        afficher_medicaments()
+
+frm_recherche = ttk.Frame(frame_meds)
+frm_recherche.pack(fill="x", padx=10)
+tk.Label(frm_recherche, text="Rechercher (nom, description, code-barre):").pack(side="left")
+entry_recherche = tk.Entry(frm_recherche, width=40)
+entry_recherche.pack(side="left", padx=5)
+entry_recherche.bind("<KeyRelease>", recherche_modifiee)
+
 # Tableau des médicaments (garde mêmes colonnes)
 cols = ("ID", "Nom", "Code-barre", "Quantité", "Prix", "Expiration")
-meds_tree = ttk.Treeview(frame_meds, columns=cols, show="headings")
+frm_meds_tree = ttk.Frame(frame_meds)
+frm_meds_tree.pack(fill="both", expand=True, padx=10, pady=5)
+meds_scroll = ttk.Scrollbar(frm_meds_tree, orient="vertical")
+meds_tree = TableauVirtuel(frm_meds_tree, crud.fetch_medicaments_ids, crud.fetch_medicaments_par_ids,
+                           scrollbar=meds_scroll, executeur=executeur, cle="medicaments", columns=cols)
 for c in cols:
     meds_tree.heading(c, text=c)
     meds_tree.column(c, width=150)
-meds_tree.pack(fill="both", expand=True, padx=10, pady=5)
+meds_scroll.pack(side="right", fill="y")
+meds_tree.pack(side="left", fill="both", expand=True)
 meds_tree.bind("<<TreeviewSelect>>", remplir_champs_medicament)
 
 # zone de modification : j'ajoute 2 petits champs (Code & Description & Exp) en plus,
@@ -243,6 +355,7 @@ tk.Label(frm_mod, text="Prix :").grid(row=0, column=4)
 tk.Label(frm_mod, text="Code-barre:").grid(row=1, column=0)
 tk.Label(frm_mod, text="Description:").grid(row=1, column=2)
 tk.Label(frm_mod, text="Expiration:").grid(row=1, column=4)
+tk.Label(frm_mod, text="Seuil d'alerte:").grid(row=2, column=0)
 
 entry_nom_mod = tk.Entry(frm_mod)
 entry_qte_mod = tk.Entry(frm_mod)
@@ -257,6 +370,8 @@ entry_prix_mod.grid(row=0, column=5)
 entry_code_mod.grid(row=1, column=1)
 entry_desc_mod.grid(row=1, column=3)
 entry_date_mod.grid(row=1, column=5)
+entry_seuil_mod = tk.Entry(frm_mod)
+entry_seuil_mod.grid(row=2, column=1)
 
 tk.Button(frm_mod, text="Modifier", command=modifier_medicament).grid(row=0, column=6, rowspan=2, padx=5)
 
@@ -265,14 +380,9 @@ tk.Button(frm_mod, text="Modifier", command=modifier_medicament).grid(row=0, col
 # CLIENTS
 
 def afficher_clients():
-    clients_tree.delete(*clients_tree.get_children())
-    try:
-        rows = crud.fetch_clients()
-        for row in rows:
-            # row: id, nom, prenom, naissance, phone, num_assurance
-            clients_tree.insert("", "end", values=row)
-    except Exception as e:
-        messagebox.showerror("Erreur", f"Erreur chargement clients: {e}")
+    # row: id, nom, prenom, naissance, phone, num_assurance
+    executeur.soumettre(clients_tree.charger_ids, succes=clients_tree.definir_ids, cle="ids_clients",
+                        erreur=lambda e: messagebox.showerror("Erreur", f"Erreur chargement clients: {e}"))
 
 def ajouter_client():
     try:
@@ -294,13 +404,15 @@ def ajouter_client():
             messagebox.showerror("Erreur", "Format date naissance invalide (YYYY-MM-DD).")
             return
 
-        res = crud.ajouter_client(nom, prenom, naissance, phone, num_assu)
-        if res is True:
-            messagebox.showinfo("Succès", f"Client '{prenom} {nom}' ajouté.")
-            ajouter_historique(f"Ajout client: {prenom} {nom}")
-            afficher_clients()
-        else:
-            messagebox.showerror("Erreur", str(res))
+        def termine(res):
+            if res is True:
+                messagebox.showinfo("Succès", f"Client '{prenom} {nom}' ajouté.")
+                ajouter_historique(f"Ajout client: {prenom} {nom}", "clients")
+                rafraichir_tableaux()
+            else:
+                messagebox.showerror("Erreur", str(res))
+        executeur.soumettre(crud.ajouter_client, nom, prenom, naissance, phone, num_assu,
+                            succes=termine, erreur=erreur_db)
     except Exception as e:
         messagebox.showerror("Erreur", str(e))
 
@@ -311,9 +423,11 @@ def supprimer_client():
             messagebox.showwarning("Sélection requise", "Sélectionnez un client.")
             return
         id_cli = clients_tree.item(selected)["values"][0]
-        crud.supprimer_client(id_cli)
-        ajouter_historique(f"Suppression client ID {id_cli}")
-        afficher_clients()
+
+        def termine(res):
+            ajouter_historique(f"Suppression client ID {id_cli}", "clients", id_cli)
+            rafraichir_tableaux()
+        executeur.soumettre(crud.supprimer_client, id_cli, succes=termine, erreur=erreur_db)
     except Exception as e:
         messagebox.showerror("Erreur", str(e))
 
@@ -347,13 +461,15 @@ def modifier_client():
             messagebox.showerror("Erreur", "Prénom vide.")
             return
 
-        res = crud.modifier_client(id_cli, nom=nom, prenom=prenom, phone=phone)
-        if res is True:
-            messagebox.showinfo("Succès", f"Client ID {id_cli} modifié.")
-            ajouter_historique(f"Modification client ID {id_cli}")
-            afficher_clients()
-        else:
-            messagebox.showerror("Erreur", str(res))
+        def termine(res):
+            if res is True:
+                messagebox.showinfo("Succès", f"Client ID {id_cli} modifié.")
+                ajouter_historique(f"Modification client ID {id_cli}", "clients", id_cli)
+                rafraichir_tableaux()
+            else:
+                messagebox.showerror("Erreur", str(res))
+        executeur.soumettre(crud.modifier_client, id_cli, nom=nom, prenom=prenom, phone=phone,
+                            succes=termine, erreur=erreur_db)
     except Exception as e:
         messagebox.showerror("Erreur", str(e))
 
@@ -376,11 +492,16 @@ tk.Button(frm_c, text="Actualiser", command=afficher_clients).grid(row=3, column
 
 # Tableau client (ajout colonne naissance et assurance)
 cols_c = ("ID", "Nom", "Prénom", "Naissance", "Téléphone", "Assurance")
-clients_tree = ttk.Treeview(frame_clients, columns=cols_c, show="headings")
+frm_clients_tree = ttk.Frame(frame_clients)
+frm_clients_tree.pack(fill="both", expand=True, padx=10, pady=5)
+clients_scroll = ttk.Scrollbar(frm_clients_tree, orient="vertical")
+clients_tree = TableauVirtuel(frm_clients_tree, crud.fetch_clients_ids, crud.fetch_clients_par_ids,
+                              scrollbar=clients_scroll, executeur=executeur, cle="clients", columns=cols_c)
 for c in cols_c:
     clients_tree.heading(c, text=c)
     clients_tree.column(c, width=150)
-clients_tree.pack(fill="both", expand=True, padx=10, pady=5)
+clients_scroll.pack(side="right", fill="y")
+clients_tree.pack(side="left", fill="both", expand=True)
 clients_tree.bind("<<TreeviewSelect>>", remplir_champs_client)
 
 frm_mod_c = ttk.LabelFrame(frame_clients, text="Modifier le client sélectionné")
@@ -401,14 +522,8 @@ tk.Button(frm_mod_c, text="Modifier", command=modifier_client).grid(row=0, colum
 # VENTES
 
 def afficher_ventes():
-    for row in ventes_tree.get_children():
-        ventes_tree.delete(row)
-    try:
-        rows = crud.fetch_ventes()
-        for r in rows:
-            ventes_tree.insert("", "end", values=r)
-    except Exception as e:
-        messagebox.showerror("Erreur", f"Erreur chargement ventes: {e}")
+    executeur.soumettre(ventes_tree.charger_ids, succes=ventes_tree.definir_ids, cle="ids_ventes",
+                        erreur=lambda e: messagebox.showerror("Erreur", f"Erreur chargement ventes: {e}"))
 
 def enregistrer_vente():
     try:
@@ -431,14 +546,15 @@ def enregistrer_vente():
         id_cli = int(id_cli_s)
         qte = int(qte_s)
 
-        res = crud.enregistrer_vente(id_med, id_cli, qte, pharma)
-        if res is True:
-            messagebox.showinfo("Succès", "Vente enregistrée.")
-            ajouter_historique(f"Vente enregistrée (médicament {id_med}, client {id_cli}, qté {qte})")
-            afficher_ventes()
-            afficher_medicaments()
-        else:
-            messagebox.showerror("Erreur", str(res))
+        def termine(res):
+            if res is True:
+                messagebox.showinfo("Succès", "Vente enregistrée.")
+                ajouter_historique(f"Vente enregistrée (médicament {id_med}, client {id_cli}, qté {qte})", "medicaments", id_med)
+                rafraichir_tableaux()
+            else:
+                messagebox.showerror("Erreur", str(res))
+        executeur.soumettre(crud.enregistrer_vente, id_med, id_cli, qte, pharma,
+                            succes=termine, erreur=erreur_db)
     except Exception as e:
         messagebox.showerror("Erreur", str(e))
 
@@ -463,29 +579,350 @@ entry_v_pharma.grid(row=1, column=3)
 
 tk.Button(frm_v, text="Enregistrer vente", command=enregistrer_vente).grid(row=2, column=0, columnspan=4, pady=5)
 
+# Vente par scan : la douchette saisit le code puis <Entrée>. Pas de boîte de
+# dialogue (elle bloquerait les scans suivants) : le résultat s'affiche dans
+# une ligne d'état et le champ est vidé aussitôt. Client et pharmacien sont
+# ceux du formulaire ci-dessus.
+def scanner_vente(event=None):
+    code = entry_v_scan.get().strip()
+    entry_v_scan.delete(0, tk.END)
+    if not code:
+        return
+    id_cli_s = entry_v_cli.get().strip()
+    if not id_cli_s.isdigit():
+        lbl_v_scan.config(text="ID client invalide.", fg="red")
+        return
+    pharma = entry_v_pharma.get().strip() or "Inconnu"
+
+    def termine(id_med):
+        lbl_v_scan.config(text=f"Vendu : {code} (médicament {id_med})", fg="green")
+        ajouter_historique(f"Vente par scan (code {code}, client {id_cli_s})", "medicaments", id_med)
+        rafraichir_tableaux()
+
+    def echec(e):
+        lbl_v_scan.config(text=str(e), fg="red")
+        root.bell()
+    executeur.soumettre(crud.vendre_par_code, code, int(id_cli_s), 1, pharma,
+                        succes=termine, erreur=echec)
+
+tk.Label(frm_v, text="Scan code-barres:").grid(row=3, column=0)
+entry_v_scan = tk.Entry(frm_v)
+entry_v_scan.grid(row=3, column=1)
+entry_v_scan.bind("<Return>", scanner_vente)
+lbl_v_scan = tk.Label(frm_v, text="")
+lbl_v_scan.grid(row=3, column=2, columnspan=2, sticky="w")
+
+# recherche du client par nom, prénom, téléphone ou n° d'assurance : le choix
+# remplit le champ ID Client
+def choisir_client_vente(ligne):
+    entry_v_cli.delete(0, tk.END)
+    entry_v_cli.insert(0, str(ligne[0]))
+
+tk.Label(frm_v, text="Rechercher client:").grid(row=4, column=0)
+entry_v_client_recherche = ChampAutocompletion(
+    frm_v, executeur, crud.rechercher_clients,
+    lambda r: f"{r[1]} {r[2]} — né(e) {r[3]} — {r[4] or '-'} (ID {r[0]})",
+    choisir_client_vente, width=40)
+entry_v_client_recherche.grid(row=4, column=1, columnspan=3, sticky="w")
+
 # Tableau ventes
 cols_v = ("ID", "Médicament", "Nom Client", "Prénom", "Quantité", "Total", "Date")
-ventes_tree = ttk.Treeview(frame_ventes, columns=cols_v, show="headings")
+frm_ventes_tree = ttk.Frame(frame_ventes)
+frm_ventes_tree.pack(fill="both", expand=True, padx=10, pady=5)
+ventes_scroll = ttk.Scrollbar(frm_ventes_tree, orient="vertical")
+# ventes les plus récentes d'abord
+ventes_tree = TableauVirtuel(frm_ventes_tree, lambda: crud.fetch_ventes_ids(desc=True),
+                             crud.fetch_ventes_par_ids, scrollbar=ventes_scroll, decroissant=True,
+                             executeur=executeur, cle="ventes", columns=cols_v)
 for c in cols_v:
     ventes_tree.heading(c, text=c)
     ventes_tree.column(c, width=150)
-ventes_tree.pack(fill="both", expand=True, padx=10, pady=5)
+ventes_scroll.pack(side="right", fill="y")
+ventes_tree.pack(side="left", fill="both", expand=True)
 
 tk.Button(frame_ventes, text="Actualiser", command=afficher_ventes).pack(pady=5)
 
 
-# HISTORIQUE
-historique_listbox = tk.Listbox(frame_histo, font=("Consolas", 10))
-historique_listbox.pack(fill="both", expand=True, padx=10, pady=10)
+# STATISTIQUES (lues dans les cumuls journaliers, voir statistiques.py)
+
+COLONNES_STATS = {
+    "jour": ("Jour", "Ventes", "Quantité", "Montant"),
+    "medicament": ("ID", "Médicament", "Ventes", "Quantité", "Montant"),
+    "pharmacien": ("Pharmacien", "Ventes", "Quantité", "Montant"),
+}
+
+def afficher_statistiques():
+    regroupement = combo_stats.get()
+    debut = entry_stats_debut.get().strip() or None
+    fin = entry_stats_fin.get().strip() or None
+
+    def afficher(res):
+        lignes, (nb, qte, montant) = res
+        stats_tree.delete(*stats_tree.get_children())
+        stats_tree["columns"] = COLONNES_STATS[regroupement]
+        for c in COLONNES_STATS[regroupement]:
+            stats_tree.heading(c, text=c)
+            stats_tree.column(c, width=150)
+        for ligne in lignes:
+            stats_tree.insert("", "end", values=ligne)
+        lbl_stats_total.config(text=f"Total : {nb} ventes, {qte} unités, {montant:.2f}")
+    executeur.soumettre(lambda: (statistiques.rapport(regroupement, debut, fin), statistiques.totaux(debut, fin)),
+                        succes=afficher, cle="statistiques", erreur=erreur_db)
+
+frm_stats = ttk.LabelFrame(frame_stats, text="Période")
+frm_stats.pack(fill="x", padx=10, pady=5)
+tk.Label(frm_stats, text="Du (YYYY-MM-DD):").grid(row=0, column=0)
+tk.Label(frm_stats, text="Au (YYYY-MM-DD):").grid(row=0, column=2)
+tk.Label(frm_stats, text="Par:").grid(row=0, column=4)
+entry_stats_debut = tk.Entry(frm_stats)
+entry_stats_fin = tk.Entry(frm_stats)
+entry_stats_debut.grid(row=0, column=1)
+entry_stats_fin.grid(row=0, column=3)
+combo_stats = ttk.Combobox(frm_stats, values=statistiques.REGROUPEMENTS, state="readonly", width=12)
+combo_stats.set("jour")
+combo_stats.grid(row=0, column=5)
+combo_stats.bind("<<ComboboxSelected>>", lambda e: afficher_statistiques())
+tk.Button(frm_stats, text="Afficher", command=afficher_statistiques).grid(row=0, column=6, padx=5)
+# 30 derniers jours par défaut
+entry_stats_debut.insert(0, (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d"))
+entry_stats_fin.insert(0, datetime.now().strftime("%Y-%m-%d"))
+
+frm_stats_tree = ttk.Frame(frame_stats)
+frm_stats_tree.pack(fill="both", expand=True, padx=10, pady=5)
+stats_scroll = ttk.Scrollbar(frm_stats_tree, orient="vertical")
+stats_tree = ttk.Treeview(frm_stats_tree, show="headings", yscrollcommand=stats_scroll.set)
+stats_scroll.configure(command=stats_tree.yview)
+stats_scroll.pack(side="right", fill="y")
+stats_tree.pack(side="left", fill="both", expand=True)
+lbl_stats_total = tk.Label(frame_stats, text="")
+lbl_stats_total.pack(pady=5)
+
+
+# ALERTES (péremption et stock bas, voir alertes.py) : passage incrémental
+# après chaque opération et toutes les PERIODE_ALERTES_MS
+
+PERIODE_ALERTES_MS = 60_000
+scan_alertes = None   # ouvert par un thread de travail (première lecture de la base)
+
+def _scan_ouvert(scan):
+    global scan_alertes
+    scan_alertes = scan
+    verifier_alertes()
+
+executeur.soumettre(alertes.ScanAlertes, crud.DB, succes=_scan_ouvert, erreur=lambda e: None)
+
+def _scanner_alertes(scan):
+    # thread de travail : liste() attend la fin d'un passage en cours
+    nouvelles, resolues = scan.scanner()
+    return nouvelles, resolues, scan.liste()
+
+def verifier_alertes():
+    if scan_alertes is None:
+        return
+    def afficher(res):
+        nouvelles, resolues, liste = res
+        if not nouvelles and not resolues and alertes_tree.get_children():
+            return
+        alertes_tree.delete(*alertes_tree.get_children())
+        for a in liste:
+            alertes_tree.insert("", "end", values=a, tags=(a[2],))
+        n = len(alertes_tree.get_children())
+        notebook.tab(frame_alertes, text=f"Alertes ({n})" if n else "Alertes")
+    executeur.soumettre(_scanner_alertes, scan_alertes, succes=afficher, cle="alertes", erreur=lambda e: None)
+
+def verifier_alertes_periodique():
+    verifier_alertes()
+    root.after(PERIODE_ALERTES_MS, verifier_alertes_periodique)
+
+cols_a = ("ID", "Médicament", "Alerte", "Détail")
+frm_alertes_tree = ttk.Frame(frame_alertes)
+frm_alertes_tree.pack(fill="both", expand=True, padx=10, pady=5)
+alertes_scroll = ttk.Scrollbar(frm_alertes_tree, orient="vertical")
+alertes_tree = ttk.Treeview(frm_alertes_tree, columns=cols_a, show="headings", yscrollcommand=alertes_scroll.set)
+alertes_scroll.configure(command=alertes_tree.yview)
+for c in cols_a:
+    alertes_tree.heading(c, text=c)
+    alertes_tree.column(c, width=200)
+alertes_tree.tag_configure(alertes.EXPIREE, foreground="red")
+alertes_tree.tag_configure(alertes.EXPIRATION, foreground="darkorange")
+alertes_tree.tag_configure(alertes.STOCK_BAS, foreground="blue")
+alertes_scroll.pack(side="right", fill="y")
+alertes_tree.pack(side="left", fill="both", expand=True)
+tk.Label(frame_alertes, text=f"Péremption à moins de {alertes.JOURS_EXPIRATION} jours ; "
+                             "stock bas : quantité <= seuil d'alerte du médicament.").pack(pady=5)
+
+
+# HISTORIQUE : chargé à l'ouverture de l'onglet, par pages (plus récent d'abord)
+pages_historique = [None]   # `avant` de chaque page déjà vue ; la dernière est affichée
+page_historique_suivante = None
+
+def historique_visible():
+    return notebook.select() == str(frame_histo)
 
 def refresh_historique():
-    historique_listbox.delete(0, tk.END)
-    for item in historique_actions:
-        historique_listbox.insert(tk.END, item)
+    charger_page_historique(pages_historique[-1])
+
+def charger_page_historique(avant):
+    def afficher(res):
+        global page_historique_suivante
+        lignes, page_historique_suivante = res
+        historique_tree.delete(*historique_tree.get_children())
+        for id_, horodatage, action, entite, id_entite in lignes:
+            historique_tree.insert("", "end", values=(horodatage, action, entite or "", id_entite or ""))
+        btn_histo_anciens.config(state="normal" if page_historique_suivante else "disabled")
+        btn_histo_recents.config(state="normal" if len(pages_historique) > 1 else "disabled")
+        lbl_histo_page.config(text=f"Page {len(pages_historique)}")
+    executeur.soumettre(historique.fetch_page, avant, succes=afficher, cle="historique", erreur=erreur_db)
+
+def historique_plus_anciens():
+    if page_historique_suivante is not None:
+        pages_historique.append(page_historique_suivante)
+        refresh_historique()
+
+def historique_plus_recents():
+    if len(pages_historique) > 1:
+        pages_historique.pop()
+        refresh_historique()
+
+cols_h = ("Date", "Action", "Entité", "ID")
+frm_histo_tree = ttk.Frame(frame_histo)
+frm_histo_tree.pack(fill="both", expand=True, padx=10, pady=10)
+histo_scroll = ttk.Scrollbar(frm_histo_tree, orient="vertical")
+historique_tree = ttk.Treeview(frm_histo_tree, columns=cols_h, show="headings", yscrollcommand=histo_scroll.set)
+histo_scroll.configure(command=historique_tree.yview)
+for c, largeur in zip(cols_h, (150, 600, 120, 80)):
+    historique_tree.heading(c, text=c)
+    historique_tree.column(c, width=largeur)
+histo_scroll.pack(side="right", fill="y")
+historique_tree.pack(side="left", fill="both", expand=True)
+
+frm_histo_nav = ttk.Frame(frame_histo)
+frm_histo_nav.pack(pady=5)
+btn_histo_recents = tk.Button(frm_histo_nav, text="◀ Plus récents", command=historique_plus_recents, state="disabled")
+btn_histo_recents.pack(side="left", padx=5)
+lbl_histo_page = tk.Label(frm_histo_nav, text="Page 1")
+lbl_histo_page.pack(side="left", padx=5)
+btn_histo_anciens = tk.Button(frm_histo_nav, text="Plus anciens ▶", command=historique_plus_anciens, state="disabled")
+btn_histo_anciens.pack(side="left", padx=5)
+
+notebook.bind("<<NotebookTabChanged>>", lambda e: refresh_historique() if historique_visible() else None, add="+")
+
+
+# PERFORMANCE : latences par opération (voir instrumentation.py), relues à
+# l'ouverture de l'onglet et toutes les PERIODE_PERF_MS tant qu'il est affiché
+
+PERIODE_PERF_MS = 2000
+
+def perf_visible():
+    return notebook.select() == str(frame_perf)
+
+def afficher_performance():
+    perf_tree.delete(*perf_tree.get_children())
+    for l in instrumentation.rapport():
+        perf_tree.insert("", "end", values=(
+            l["operation"], l["appels"], f"{l['p50_ms']:.3f}", f"{l['p95_ms']:.3f}", f"{l['p99_ms']:.3f}",
+            f"{l['max_ms']:.3f}", f"{l['total_ms']:.1f}", f"{l['sql_par_appel']:.1f}", l["commits"],
+            l["lignes"], l["erreurs"]))
+    btn_perf_activer.config(text="Désactiver" if instrumentation.actif() else "Activer")
+
+def afficher_performance_periodique():
+    if perf_visible():
+        afficher_performance()
+    root.after(PERIODE_PERF_MS, afficher_performance_periodique)
+
+def basculer_performance():
+    if instrumentation.actif():
+        instrumentation.desactiver()
+    else:
+        instrumentation.activer(trace_sql=var_perf_sql.get(), profil=var_perf_profil.get())
+    afficher_performance()
+
+def reinitialiser_performance():
+    instrumentation.reinitialiser()
+    afficher_performance()
+
+def exporter_performance():
+    chemin = filedialog.asksaveasfilename(defaultextension=".json",
+                                          filetypes=[("JSON", "*.json"), ("CSV", "*.csv")])
+    if not chemin:
+        return
+    try:
+        n = instrumentation.exporter(chemin)
+        if var_perf_profil.get():
+            instrumentation.arreter_profil(os.path.splitext(chemin)[0] + ".prof")
+            if instrumentation.actif():
+                instrumentation.activer(trace_sql=var_perf_sql.get(), profil=True)
+    except OSError as e:
+        messagebox.showerror("Erreur", str(e))
+        return
+    messagebox.showinfo("Performance", f"{n} opérations exportées dans {chemin}")
+
+frm_perf = ttk.Frame(frame_perf)
+frm_perf.pack(fill="x", padx=10, pady=5)
+var_perf_sql = tk.BooleanVar(value=False)
+var_perf_profil = tk.BooleanVar(value=False)
+btn_perf_activer = tk.Button(frm_perf, text="Activer", command=basculer_performance)
+btn_perf_activer.pack(side="left", padx=5)
+ttk.Checkbutton(frm_perf, text="Requêtes SQL", variable=var_perf_sql).pack(side="left", padx=5)
+ttk.Checkbutton(frm_perf, text="cProfile", variable=var_perf_profil).pack(side="left", padx=5)
+tk.Button(frm_perf, text="Actualiser", command=afficher_performance).pack(side="left", padx=5)
+tk.Button(frm_perf, text="Réinitialiser", command=reinitialiser_performance).pack(side="left", padx=5)
+tk.Button(frm_perf, text="Exporter...", command=exporter_performance).pack(side="left", padx=5)
+
+cols_p = ("Opération", "Appels", "p50 ms", "p95 ms", "p99 ms", "max ms", "total ms", "SQL/appel",
+          "Commits", "Lignes", "Erreurs")
+frm_perf_tree = ttk.Frame(frame_perf)
+frm_perf_tree.pack(fill="both", expand=True, padx=10, pady=5)
+perf_scroll = ttk.Scrollbar(frm_perf_tree, orient="vertical")
+perf_tree = ttk.Treeview(frm_perf_tree, columns=cols_p, show="headings", yscrollcommand=perf_scroll.set)
+perf_scroll.configure(command=perf_tree.yview)
+for c in cols_p:
+    perf_tree.heading(c, text=c)
+    perf_tree.column(c, width=320 if c == "Opération" else 75, anchor="w" if c == "Opération" else "e")
+perf_scroll.pack(side="right", fill="y")
+perf_tree.pack(side="left", fill="both", expand=True)
+
+notebook.bind("<<NotebookTabChanged>>", lambda e: afficher_performance() if perf_visible() else None, add="+")
+
+# Chargement initial : la fenêtre s'affiche vide, les tableaux se remplissent
+# dès que les threads de travail rendent leurs résultats
+def chargement_initial():
+    afficher_medicaments()
+    afficher_clients()
+    afficher_ventes()
+    afficher_statistiques()
+    verifier_alertes_periodique()
+    afficher_performance_periodique()
+
+root.after_idle(chargement_initial)
+
+# PHARMACIE_MESURE_DEMARRAGE=1 : affiche le temps jusqu'au premier affichage
+# de la fenêtre puis jusqu'au remplissage des tableaux, et quitte
+# (utilisé par benchmarks/bench_demarrage.py)
+if os.environ.get("PHARMACIE_MESURE_DEMARRAGE"):
+    def premier_affichage(event):
+        if event.widget is not root:
+            return
+        root.unbind("<Map>")
+        print(f"premier_affichage_ms {(time.perf_counter() - _DEBUT) * 1000:.1f}", flush=True)
+        root.after(1, attendre_tableaux)
+
+    def attendre_tableaux():
+        if executeur.en_attente():
+            root.after(1, attendre_tableaux)
+            return
+        print(f"tableaux_remplis_ms {(time.perf_counter() - _DEBUT) * 1000:.1f}", flush=True)
+        root.destroy()
 
-# Chargement initial
-afficher_medicaments()
-afficher_clients()
-afficher_ventes()
+    root.bind("<Map>", premier_affichage)
 
 root.mainloop()
+executeur.arreter()
+if scan_alertes is not None:
+    scan_alertes.fermer()
+historique.fermer()
+if sonde is not None:
+    print("Réactivité de l'interface :", sonde.rapport())
+if os.environ.get("PHARMACIE_PERF"):
+    print(instrumentation.formater_rapport())
+crud.close_db()
@@ -0,0 +1,155 @@
+import sqlite3
+import threading
+import queue
+
+
+# Pool de connexions SQLite persistantes.
+# crud.connect_db() emprunte une connexion ici ; conn.close() la rend au pool
+# au lieu de la fermer, ce qui évite de rouvrir le fichier et de relancer
+# les PRAGMA à chaque opération.
+#
+# `size` borne les connexions inactives gardées ouvertes, pas les emprunts :
+# acquire() ne bloque jamais et ouvre une connexion de plus si aucune n'est
+# libre (les emprunts imbriqués d'un même thread ne peuvent donc pas se
+# bloquer). Les connexions rendues au-delà de `size` sont fermées.
+# POOL_SIZE est lu à chaque appel : le modifier s'applique aux pools existants.
+
+# 5 : les 4 lecteurs + le rédacteur de service.py restent ouverts entre deux
+# rafales (ServicePharmacie l'augmente si on lui donne plus de lecteurs)
+POOL_SIZE = 5
+
+
+# Connexion empruntée au pool ; close() la restitue.
+class PooledConnection:
+    def __init__(self, pool, raw):
+        self._pool = pool
+        self._raw = raw
+
+    def close(self):
+        # idempotent : crud.py appelle parfois close() plusieurs fois
+        raw, self._raw = self._raw, None
+        if raw is not None:
+            self._pool._release(raw)
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self._raw.__enter__()
+
+    def __exit__(self, *exc):
+        return self._raw.__exit__(*exc)
+
+    def __del__(self):
+        # filet de sécurité si un appelant oublie close()
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class ConnectionPool:
+    def __init__(self, path, size=None, init=None):
+        self.path = path
+        self.size = POOL_SIZE if size is None else size
+        self._init = init
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.opened = 0
+
+    def _open(self):
+        # check_same_thread=False : une connexion n'est utilisée que par un
+        # seul emprunteur à la fois, mais peut changer de thread entre deux emprunts
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA foreign_keys = ON;")
+        if self._init is not None:
+            self._init(conn)
+        with self._lock:
+            self.opened += 1
+        return conn
+
+    @staticmethod
+    def _healthy(conn):
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self):
+        if self._closed:
+            raise RuntimeError("Pool de connexions fermé.")
+        while True:
+            try:
+                raw = self._idle.get_nowait()
+            except queue.Empty:
+                raw = self._open()
+                break
+            if self._healthy(raw):
+                break
+            try:
+                raw.close()
+            except sqlite3.Error:
+                pass
+        return PooledConnection(self, raw)
+
+    def _release(self, raw):
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+        except sqlite3.Error:
+            self._discard(raw)
+            return
+        if self._closed:
+            self._discard(raw)
+            return
+        with self._lock:
+            garder = self._idle.qsize() < self.size
+            if garder:
+                self._idle.put_nowait(raw)
+        if not garder:
+            # au-delà de la taille du pool, la connexion est simplement fermée
+            self._discard(raw)
+
+    @staticmethod
+    def _discard(raw):
+        try:
+            raw.close()
+        except sqlite3.Error:
+            pass
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                raw = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(raw)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path, size=None, init=None):
+    size = POOL_SIZE if size is None else size
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None or pool._closed:
+            pool = ConnectionPool(path, size, init)
+            _pools[path] = pool
+        else:
+            pool.size = size
+        return pool
+
+
+def close_all():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,173 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import crud
+import pool
+
+
+# Service asyncio au-dessus de crud, pour servir plusieurs caisses (ou un
+# frontal web) depuis un seul processus.
+#
+#   - lectures : pool borné de threads SQLite ; deux lectures identiques
+#     simultanées ne font qu'une requête, et les lectures unitaires par id
+#     (get_medicament, get_client) arrivant ensemble sont regroupées en un
+#     seul SELECT ... WHERE id IN (...)
+#   - écritures : une seule tâche rédactrice les exécute dans l'ordre
+#     d'arrivée, ce qui évite les attentes de verrou entre rédacteurs SQLite
+#
+#   service = ServicePharmacie()
+#   await service.demarrer()
+#   await service.enregistrer_vente(1, 1, 2, "caisse 3")
+#   await service.arreter()
+
+LECTEURS = 4
+FENETRE_LOT = 0.002  # secondes d'attente pour regrouper les lectures par id
+
+
+class ServicePharmacie:
+    def __init__(self, lecteurs=LECTEURS, fenetre_lot=FENETRE_LOT):
+        self.lecteurs = lecteurs
+        self.fenetre_lot = fenetre_lot
+        self._pool_lecture = None
+        self._pool_ecriture = None
+        self._file_ecriture = None
+        self._redacteur = None
+        self._en_cours = {}
+        self._lots = {}
+
+    async def demarrer(self):
+        # une connexion par thread (lecteurs + rédacteur) reste ouverte dans le pool
+        pool.POOL_SIZE = max(pool.POOL_SIZE, self.lecteurs + 1)
+        self._pool_lecture = ThreadPoolExecutor(self.lecteurs, thread_name_prefix="lecture")
+        self._pool_ecriture = ThreadPoolExecutor(1, thread_name_prefix="ecriture")
+        self._file_ecriture = asyncio.Queue()
+        self._redacteur = asyncio.create_task(self._ecrire())
+
+    async def arreter(self):
+        if self._redacteur is not None:
+            await self._file_ecriture.put(None)
+            await self._redacteur
+            self._redacteur = None
+        for threads in (self._pool_lecture, self._pool_ecriture):
+            if threads is not None:
+                threads.shutdown(wait=True)
+
+    async def __aenter__(self):
+        await self.demarrer()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.arreter()
+
+    # --- mécanique ---
+
+    async def _lire(self, fn, *args, **kwargs):
+        # une seule exécution pour des lectures identiques en cours
+        cle = (fn, args, tuple(sorted(kwargs.items())))
+        futur = self._en_cours.get(cle)
+        if futur is None:
+            loop = asyncio.get_running_loop()
+            futur = loop.run_in_executor(self._pool_lecture, lambda: fn(*args, **kwargs))
+            self._en_cours[cle] = futur
+            futur.add_done_callback(lambda _: self._en_cours.pop(cle, None))
+        return await asyncio.shield(futur)
+
+    async def _lire_par_id(self, fn_par_ids, id_):
+        # regroupe les demandes unitaires arrivées pendant la fenêtre
+        id_ = int(id_)
+        loop = asyncio.get_running_loop()
+        lot = self._lots.get(fn_par_ids)
+        if lot is None:
+            lot = self._lots[fn_par_ids] = {}
+            loop.call_later(self.fenetre_lot, self._vider_lot, fn_par_ids)
+        futur = lot.get(id_)
+        if futur is None:
+            futur = lot[id_] = loop.create_future()
+        return await asyncio.shield(futur)
+
+    def _vider_lot(self, fn_par_ids):
+        lot = self._lots.pop(fn_par_ids, {})
+        if not lot:
+            return
+        loop = asyncio.get_running_loop()
+        tache = loop.run_in_executor(self._pool_lecture, fn_par_ids, list(lot))
+
+        def distribuer(t):
+            if t.exception() is not None:
+                for f in lot.values():
+                    if not f.done():
+                        f.set_exception(t.exception())
+                return
+            lignes = {r[0]: r for r in t.result()}
+            for id_, f in lot.items():
+                if not f.done():
+                    f.set_result(lignes.get(id_))
+        tache.add_done_callback(distribuer)
+
+    async def _ecrire(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            travail = await self._file_ecriture.get()
+            if travail is None:
+                return
+            fn, args, kwargs, futur = travail
+            try:
+                res = await loop.run_in_executor(self._pool_ecriture, lambda: fn(*args, **kwargs))
+            except Exception as e:
+                if not futur.done():
+                    futur.set_exception(e)
+            else:
+                if not futur.done():
+                    futur.set_result(res)
+
+    async def _soumettre_ecriture(self, fn, *args, **kwargs):
+        if self._redacteur is None:
+            raise RuntimeError("Service non démarré (await service.demarrer()).")
+        futur = asyncio.get_running_loop().create_future()
+        await self._file_ecriture.put((fn, args, kwargs, futur))
+        return await futur
+
+    # --- médicaments ---
+
+    async def get_medicament(self, id_med):
+        return await self._lire_par_id(crud.fetch_medicaments_par_ids, id_med)
+
+    async def fetch_medicaments_page(self, **kwargs):
+        return await self._lire(crud.fetch_medicaments_page, **kwargs)
+
+    async def ajouter_medicament(self, *args, **kwargs):
+        return await self._soumettre_ecriture(crud.ajouter_medicament, *args, **kwargs)
+
+    async def modifier_medicament(self, *args, **kwargs):
+        return await self._soumettre_ecriture(crud.modifier_medicament, *args, **kwargs)
+
+    async def supprimer_medicament(self, id_med):
+        return await self._soumettre_ecriture(crud.supprimer_medicament, id_med)
+
+    # --- clients ---
+
+    async def get_client(self, id_cli):
+        return await self._lire_par_id(crud.fetch_clients_par_ids, id_cli)
+
+    async def fetch_clients_page(self, **kwargs):
+        return await self._lire(crud.fetch_clients_page, **kwargs)
+
+    async def ajouter_client(self, *args, **kwargs):
+        return await self._soumettre_ecriture(crud.ajouter_client, *args, **kwargs)
+
+    async def modifier_client(self, *args, **kwargs):
+        return await self._soumettre_ecriture(crud.modifier_client, *args, **kwargs)
+
+    async def supprimer_client(self, id_cli):
+        return await self._soumettre_ecriture(crud.supprimer_client, id_cli)
+
+    # --- ventes ---
+
+    async def fetch_ventes_page(self, **kwargs):
+        return await self._lire(crud.fetch_ventes_page, **kwargs)
+
+    async def enregistrer_vente(self, *args, **kwargs):
+        return await self._soumettre_ecriture(crud.enregistrer_vente, *args, **kwargs)
+
+    async def enregistrer_panier(self, *args, **kwargs):
+        return await self._soumettre_ecriture(crud.enregistrer_panier, *args, **kwargs)
@@ -0,0 +1,98 @@
+import crud
+import db_phamarcie
+from instrumentation import instrumente
+
+
+# Rapports de ventes lus dans les cumuls journaliers (table ventes_jour, tenue
+# à jour par triggers à chaque vente) : le coût dépend du nombre de jours x
+# médicaments x pharmaciens de la période, pas du nombre de ventes.
+#
+# Dates au format AAAA-MM-JJ, bornes incluses ; None = sans limite.
+
+REGROUPEMENTS = ("jour", "medicament", "pharmacien")
+
+
+def _periode(date_debut, date_fin):
+    where, params = [], []
+    for valeur, op in ((date_debut, ">="), (date_fin, "<=")):
+        if valeur:
+            if not crud._is_valid_date(valeur):
+                raise ValueError("Format de date invalide (YYYY-MM-DD).")
+            where.append(f"jour {op} ?")
+            params.append(valeur)
+    return (" WHERE " + " AND ".join(where) if where else ""), params
+
+
+def _lire(sql, params):
+    conn = crud.connect_db()
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+@instrumente
+def ventes_par_jour(date_debut=None, date_fin=None):
+    # [(jour, nb_ventes, quantite, montant)] par date croissante
+    where, params = _periode(date_debut, date_fin)
+    return _lire(f"""
+        SELECT jour, SUM(nb_ventes), SUM(quantite), ROUND(SUM(montant), 2)
+        FROM ventes_jour{where} GROUP BY jour ORDER BY jour
+    """, params)
+
+
+@instrumente
+def ventes_par_medicament(date_debut=None, date_fin=None, limite=None):
+    # [(id_medicament, nom, nb_ventes, quantite, montant)] par montant décroissant
+    where, params = _periode(date_debut, date_fin)
+    if limite is not None:
+        params.append(int(limite))
+    return _lire(f"""
+        SELECT t.id_medicament, m.nom, t.nb, t.qte, ROUND(t.montant, 2)
+        FROM (SELECT id_medicament, SUM(nb_ventes) AS nb, SUM(quantite) AS qte, SUM(montant) AS montant
+              FROM ventes_jour{where} GROUP BY id_medicament) t
+        LEFT JOIN medicaments m ON m.id = t.id_medicament
+        ORDER BY t.montant DESC{" LIMIT ?" if limite is not None else ""}
+    """, params)
+
+
+@instrumente
+def ventes_par_pharmacien(date_debut=None, date_fin=None):
+    # [(pharmacien, nb_ventes, quantite, montant)] par montant décroissant
+    where, params = _periode(date_debut, date_fin)
+    return _lire(f"""
+        SELECT pharmacien, SUM(nb_ventes), SUM(quantite), ROUND(SUM(montant), 2)
+        FROM ventes_jour{where} GROUP BY pharmacien ORDER BY SUM(montant) DESC
+    """, params)
+
+
+@instrumente
+def totaux(date_debut=None, date_fin=None):
+    # (nb_ventes, quantite, montant) sur la période
+    where, params = _periode(date_debut, date_fin)
+    nb, qte, montant = _lire(f"""
+        SELECT IFNULL(SUM(nb_ventes), 0), IFNULL(SUM(quantite), 0), ROUND(IFNULL(SUM(montant), 0), 2)
+        FROM ventes_jour{where}
+    """, params)[0]
+    return nb, qte, montant
+
+
+def rapport(regroupement, date_debut=None, date_fin=None):
+    if regroupement == "jour":
+        return ventes_par_jour(date_debut, date_fin)
+    if regroupement == "medicament":
+        return ventes_par_medicament(date_debut, date_fin)
+    if regroupement == "pharmacien":
+        return ventes_par_pharmacien(date_debut, date_fin)
+    raise ValueError(f"Regroupement inconnu : {regroupement}. Choix : {', '.join(REGROUPEMENTS)}.")
+
+
+@instrumente
+def reconstruire():
+    # tâche de rattrapage : recalcule tous les cumuls depuis la table vente
+    conn = crud.connect_db()
+    try:
+        db_phamarcie.reconstruire_cumuls(conn.cursor())
+        conn.commit()
+    finally:
+        conn.close()
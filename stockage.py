@@ -0,0 +1,71 @@
+import sqlite3
+
+
+# Profils de stockage SQLite.
+# journal_mode est persistant (écrit dans le fichier) ; les autres PRAGMA
+# sont propres à chaque connexion et sont réappliqués à l'ouverture par le pool.
+
+PROFILS = {
+    # comportement historique : journal rollback, lecteurs et rédacteur se bloquent
+    "defaut": {
+        "journal_mode": "DELETE",
+        "synchronous": "FULL",
+        "cache_size": -2000,
+        "mmap_size": 0,
+        "temp_store": "DEFAULT",
+        "busy_timeout": 5000,
+    },
+    # caisse : WAL (lectures concurrentes aux écritures), aucune vente perdue
+    "comptoir": {
+        "journal_mode": "WAL",
+        "synchronous": "FULL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # WAL + synchronous NORMAL : la dernière transaction peut être perdue en cas
+    # de coupure de courant, mais la base reste cohérente
+    "equilibre": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,
+        "mmap_size": 64 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,
+    },
+    # import en masse : pas de fsync, gros cache ; à n'utiliser que le temps de l'import
+    "import": {
+        "journal_mode": "WAL",
+        "synchronous": "OFF",
+        "cache_size": -262144,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+    },
+}
+
+PROFIL_DEFAUT = "comptoir"
+
+
+def get_profil(nom):
+    try:
+        return PROFILS[nom]
+    except KeyError:
+        raise ValueError(f"Profil de stockage inconnu : {nom}. Choix : {', '.join(PROFILS)}.")
+
+
+def appliquer_profil(conn: sqlite3.Connection, nom=PROFIL_DEFAUT, journal=True):
+    # journal=False : PRAGMA de la connexion seulement, sans toucher au
+    # journal_mode du fichier (partagé avec les autres connexions)
+    p = get_profil(nom)
+    if journal:
+        mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        if mode.upper() != p["journal_mode"]:
+            conn.execute(f"PRAGMA journal_mode = {p['journal_mode']}")
+    conn.execute(f"PRAGMA synchronous = {p['synchronous']}")
+    conn.execute(f"PRAGMA cache_size = {int(p['cache_size'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(p['mmap_size'])}")
+    conn.execute(f"PRAGMA temp_store = {p['temp_store']}")
+    conn.execute(f"PRAGMA busy_timeout = {int(p['busy_timeout'])}")
+    return conn
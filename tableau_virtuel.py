@@ -0,0 +1,324 @@
+from bisect import bisect_left
+from tkinter import ttk
+
+from instrumentation import instrumente
+
+
+# Treeview virtualisé : seules les lignes visibles (plus une marge) existent
+# dans le widget. La liste complète n'est qu'un tableau d'identifiants
+# (crud.fetch_*_ids) ; les lignes sont lues à la demande (crud.fetch_*_par_ids).
+#
+# Compatible avec l'usage de main.py : focus(), item(iid)["values"] et
+# bind("<<TreeviewSelect>>", ...) fonctionnent même si la ligne sélectionnée
+# est sortie de l'écran.
+#
+# appliquer_changements() met à jour la liste en place à partir du journal des
+# modifications (crud.fetch_changements) ; il suppose que charger_ids renvoie
+# les id triés par id (croissant, ou décroissant si decroissant=True).
+#
+# Avec un executeur (db_worker.ExecuteurDB), charger_lignes est appelé par les
+# threads de travail : les lignes pas encore lues s'affichent comme des lignes
+# d'attente, remplacées dès que les données arrivent. Chaque tableau a sa clé
+# d'annulation : un défilement rapide n'applique que la dernière fenêtre.
+# Sans executeur, charger_lignes est appelé directement (benchmarks).
+
+MARGE = 50
+ATTENTE = "…"
+_ABSENTE = object()   # ligne demandée mais disparue de la base
+
+
+class TableauVirtuel(ttk.Treeview):
+    def __init__(self, parent, charger_ids, charger_lignes, scrollbar=None, marge=MARGE,
+                 decroissant=False, executeur=None, cle=None, **kw):
+        kw.setdefault("show", "headings")
+        kw.setdefault("selectmode", "browse")
+        super().__init__(parent, **kw)
+        self.charger_ids = charger_ids
+        self.charger_lignes = charger_lignes
+        self.marge = marge
+        self.decroissant = decroissant
+        self.executeur = executeur
+        self.cle = cle or f"tableau-{id(self)}"
+        self.ids = []
+        self.haut = 0
+        self._cache = {}
+        self._a_relire = set()          # ids en cache, modifiés depuis leur lecture
+        self._en_cours = None           # ids de la lecture soumise à l'executeur
+        self._selection = None          # (id, valeurs) de la ligne sélectionnée ; valeurs None :
+                                        # ligne d'attente, annoncée à l'arrivée des données
+        self._evenement_selection = None
+        self._selection_rendue = ()     # sélection posée par _rendre()
+        self._callbacks = []
+        self.scrollbar = None
+        if scrollbar is not None:
+            self.attacher_scrollbar(scrollbar)
+
+        super().tag_configure("attente", foreground="gray")
+        super().bind("<<TreeviewSelect>>", self._on_select, add="+")
+        super().bind("<Configure>", lambda e: self._rendre(), add="+")
+        super().bind("<MouseWheel>", self._on_molette)
+        super().bind("<Button-4>", lambda e: self.defiler(-3) or "break")
+        super().bind("<Button-5>", lambda e: self.defiler(3) or "break")
+        super().bind("<Prior>", lambda e: self.defiler(-self._nb_visibles()) or "break")
+        super().bind("<Next>", lambda e: self.defiler(self._nb_visibles()) or "break")
+        super().bind("<Up>", lambda e: self._deplacer_selection(-1))
+        super().bind("<Down>", lambda e: self._deplacer_selection(1))
+
+    def attacher_scrollbar(self, scrollbar):
+        self.scrollbar = scrollbar
+        scrollbar.configure(command=self._on_scrollbar)
+
+    # --- données ---
+
+    def actualiser(self):
+        self.definir_ids(self.charger_ids())
+
+    @instrumente
+    def definir_ids(self, ids):
+        # deuxième moitié d'actualiser() : charger_ids peut être appelé hors du
+        # thread Tk, definir_ids doit l'être depuis le thread Tk
+        self.ids = ids
+        # tout est relu ; les valeurs connues restent affichées en attendant
+        self._a_relire = set(self._cache)
+        self._en_cours = None
+        if self._selection is not None:
+            self._selection = self._recharger_selection(self._selection[0])
+        self.haut = min(self.haut, max(0, len(self.ids) - self._nb_visibles()))
+        self._rendre()
+
+    def _cle(self, id_):
+        return -id_ if self.decroissant else id_
+
+    def _position(self, id_):
+        # (position, présent) de id_ dans self.ids, par dichotomie
+        pos = bisect_left(self.ids, self._cle(id_), key=self._cle)
+        return pos, pos < len(self.ids) and self.ids[pos] == id_
+
+    @instrumente
+    def appliquer_changements(self, maj, suppr):
+        # coût proportionnel au nombre de changements, pas à la taille de la table
+        if not maj and not suppr:
+            return
+        for id_ in suppr:
+            pos, present = self._position(id_)
+            if present:
+                del self.ids[pos]
+                if pos < self.haut:
+                    self.haut -= 1
+            self._cache.pop(id_, None)
+            self._a_relire.discard(id_)
+            if self._selection is not None and self._selection[0] == id_:
+                self._selection = None
+        for id_ in maj:
+            pos, present = self._position(id_)
+            if not present:
+                self.ids.insert(pos, id_)
+                if pos < self.haut:
+                    self.haut += 1
+            # l'ancienne valeur reste affichée jusqu'à la relecture
+            if id_ in self._cache:
+                self._a_relire.add(id_)
+            if self._selection is not None and self._selection[0] == id_:
+                self._selection = self._recharger_selection(id_)
+        self._rendre()
+
+    def _recharger_selection(self, id_):
+        if self.executeur is None:
+            rows = self.charger_lignes([id_])
+            return (id_, rows[0]) if rows else None
+        # la sélection garde ses valeurs jusqu'à la réponse
+        self.executeur.soumettre(self.charger_lignes, [id_], cle=f"{self.cle}.selection",
+                                 succes=lambda rows: self._selection_rechargee(id_, rows),
+                                 erreur=lambda e: None)
+        return self._selection
+
+    def _selection_rechargee(self, id_, rows):
+        if self._selection is not None and self._selection[0] == id_:
+            en_attente = self._selection[1] is None
+            self._selection = (id_, rows[0]) if rows else None
+            self._rendre()
+            if en_attente:
+                self._annoncer_selection()
+
+    def _a_lire(self, i):
+        return i not in self._cache or i in self._a_relire
+
+    def _assurer_cache(self, debut, fin):
+        if not any(self._a_lire(i) for i in self.ids[debut:fin]):
+            return
+        # on recharge toute la fenêtre + marge, et on oublie le reste (mémoire bornée)
+        d = max(0, debut - self.marge)
+        f = min(len(self.ids), fin + self.marge)
+        fenetre = self.ids[d:f]
+        a_lire = [i for i in fenetre if self._a_lire(i)]
+        if self.executeur is None:
+            self._recevoir(a_lire, self.charger_lignes(a_lire), fenetre)
+            return
+        if self._en_cours == a_lire:
+            return
+        self._en_cours = a_lire
+        self.executeur.soumettre(self.charger_lignes, a_lire, cle=f"{self.cle}.lignes",
+                                 succes=lambda rows: self._lignes_recues(a_lire, rows),
+                                 erreur=lambda e: self._lecture_echouee(a_lire))
+
+    def _recevoir(self, a_lire, rows, fenetre):
+        cache = {i: self._cache[i] for i in fenetre if i in self._cache}
+        for i in a_lire:
+            cache[i] = _ABSENTE
+        for row in rows:
+            cache[row[0]] = row
+        self._cache = cache
+        self._a_relire.intersection_update(cache)
+        self._a_relire.difference_update(a_lire)
+        # sélection faite sur une ligne d'attente
+        if self._selection is not None and self._selection[1] is None:
+            valeurs = cache.get(self._selection[0])
+            if valeurs is _ABSENTE:
+                self._selection = None
+            elif valeurs is not None:
+                self._selection = (self._selection[0], valeurs)
+
+    def _lignes_recues(self, a_lire, rows):
+        # thread Tk ; la fenêtre gardée est celle affichée maintenant
+        self._en_cours = None
+        en_attente = self._selection is not None and self._selection[1] is None
+        n = len(self.ids)
+        d = max(0, self.haut - self.marge)
+        f = min(n, self.haut + self._nb_visibles() + self.marge)
+        self._recevoir(a_lire, rows, self.ids[d:f])
+        self._rendre()
+        if en_attente:
+            self._annoncer_selection()
+
+    def _lecture_echouee(self, a_lire):
+        # pas de nouvel essai immédiat : les lignes restent en attente
+        # jusqu'au prochain défilement ou rafraîchissement
+        if self._en_cours == a_lire:
+            self._en_cours = None
+
+    # --- rendu ---
+
+    def _nb_visibles(self):
+        hauteur = self.winfo_height()
+        if hauteur <= 1:
+            return int(self.cget("height") or 10)
+        ligne = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        return max(1, (hauteur - 25) // ligne)
+
+    @instrumente
+    def _rendre(self):
+        n = len(self.ids)
+        visibles = self._nb_visibles()
+        self.haut = max(0, min(self.haut, n - visibles))
+        fin = min(n, self.haut + visibles)
+        self._assurer_cache(self.haut, fin)
+
+        super().delete(*super().get_children())
+        for i in self.ids[self.haut:fin]:
+            valeurs = self._cache.get(i)
+            if valeurs is None:
+                super().insert("", "end", iid=str(i), values=(i, ATTENTE), tags=("attente",))
+            elif valeurs is not _ABSENTE:
+                super().insert("", "end", iid=str(i), values=valeurs)
+
+        if self._selection is not None and super().exists(str(self._selection[0])):
+            iid = str(self._selection[0])
+            super().selection_set(iid)
+            super().focus(iid)
+        self._selection_rendue = super().selection()
+
+        if self.scrollbar is not None:
+            if n:
+                self.scrollbar.set(self.haut / n, fin / n)
+            else:
+                self.scrollbar.set(0, 1)
+
+    def defiler(self, nb_lignes):
+        self.haut += int(nb_lignes)
+        self._rendre()
+
+    def _on_molette(self, event):
+        self.defiler(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _on_scrollbar(self, action, valeur, unite=None):
+        if action == "moveto":
+            self.haut = int(float(valeur) * len(self.ids))
+        elif unite == "pages":
+            self.haut += int(valeur) * self._nb_visibles()
+        else:
+            self.haut += int(valeur)
+        self._rendre()
+
+    def _deplacer_selection(self, sens):
+        if self._selection is None or not self.ids:
+            return None
+        pos, present = self._position(self._selection[0])
+        if not present:
+            return None
+        pos = max(0, min(len(self.ids) - 1, pos + sens))
+        visibles = self._nb_visibles()
+        if pos < self.haut:
+            self.haut = pos
+        elif pos >= self.haut + visibles:
+            self.haut = pos - visibles + 1
+        self._rendre()
+        iid = str(self.ids[pos])
+        if super().exists(iid):
+            super().selection_set(iid)
+            super().focus(iid)
+        return "break"
+
+    # --- sélection ---
+
+    def _on_select(self, event):
+        sel = super().selection()
+        if sel == self._selection_rendue:
+            # changement provoqué par le rendu (ligne sortie/revenue à l'écran)
+            return
+        self._selection_rendue = sel
+        if not sel:
+            return
+        id_ = int(sel[0])
+        valeurs = self._cache.get(id_)
+        if valeurs is _ABSENTE:
+            valeurs = None
+        # ligne d'attente : ses valeurs affichées ne sont pas les données, la
+        # sélection n'est annoncée (et focus() ne la renvoie) qu'à leur arrivée
+        self._selection = (id_, valeurs)
+        self._evenement_selection = event
+        if valeurs is not None:
+            self._annoncer_selection()
+
+    def _annoncer_selection(self):
+        if self._selection is None or self._selection[1] is None:
+            return
+        event, self._evenement_selection = self._evenement_selection, None
+        for cb in self._callbacks:
+            cb(event)
+
+    def bind(self, sequence=None, func=None, add=None):
+        if sequence == "<<TreeviewSelect>>" and func is not None:
+            if not add:
+                self._callbacks.clear()
+            self._callbacks.append(func)
+            return None
+        return super().bind(sequence, func, add)
+
+    def focus(self, item=None):
+        if item is None:
+            if self._selection is None or self._selection[1] is None:
+                return ""
+            return str(self._selection[0])
+        return super().focus(item)
+
+    def item(self, item, option=None, **kw):
+        if (option is None and not kw and self._selection is not None and self._selection[1] is not None
+                and str(item) == str(self._selection[0]) and not super().exists(str(item))):
+            return {"text": "", "image": "", "values": list(self._selection[1]),
+                    "open": 0, "tags": ""}
+        return super().item(item, option, **kw)
+
+    def effacer_selection(self):
+        self._selection = None
+        super().selection_set(())
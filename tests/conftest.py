@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import crud
+import db_phamarcie
+
+
+@pytest.fixture
+def base(tmp_path):
+    # base vide dans un dossier temporaire ; crud.DB la désigne pendant le test
+    path = str(tmp_path / "pharmacie.db")
+    db_phamarcie.create_table(path)
+    ancien = crud.DB
+    crud.close_db()
+    crud.DB = path
+    yield path
+    crud.close_db()
+    crud.DB = ancien
@@ -0,0 +1,42 @@
+import threading
+
+import pytest
+
+import commit_groupe
+import crud
+
+
+@pytest.fixture
+def groupe(base):
+    crud.ajouter_medicament("Doliprane", "3400000000012", "", 10, 2.5, None)
+    crud.ajouter_client("Martin", "Marie", "1980-01-01")
+    g = commit_groupe.activer()
+    yield g
+    commit_groupe.desactiver()
+
+
+def test_ventes_concurrentes_regroupees(groupe):
+    erreurs = []
+
+    def caisse():
+        try:
+            crud.enregistrer_vente(1, 1, 1)
+        except ValueError as e:
+            erreurs.append(e)
+
+    threads = [threading.Thread(target=caisse) for _ in range(12)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # le stock insuffisant n'annule que les ventes concernées
+    assert len(erreurs) == 2
+    assert all("Stock insuffisant" in str(e) for e in erreurs)
+    assert groupe.ventes == 12
+    assert groupe.commits == groupe.lots <= 12
+    conn = crud.connect_db()
+    try:
+        assert conn.execute("SELECT quantite FROM medicaments WHERE id = 1").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM vente").fetchone()[0] == 10
+    finally:
+        conn.close()
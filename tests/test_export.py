@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+import crud
+import export_ventes
+
+
+def test_export_interrompu_ne_laisse_pas_de_fichier(base, tmp_path, monkeypatch):
+    crud.ajouter_medicament("Doliprane", "3400000000012", "", 10, 2.5, None)
+    crud.ajouter_client("Martin", "Marie", "1980-01-01")
+    crud.enregistrer_vente(1, 1, 1)
+
+    iter_lignes = export_ventes.iter_lignes
+
+    def lignes_puis_erreur(*args):
+        yield from iter_lignes(*args)
+        raise KeyboardInterrupt
+    monkeypatch.setattr(export_ventes, "iter_lignes", lignes_puis_erreur)
+    chemin = str(tmp_path / "ventes.csv")
+    with pytest.raises(KeyboardInterrupt):
+        export_ventes.exporter_ventes(chemin)
+    assert not [f for f in os.listdir(tmp_path) if f.startswith("ventes")]
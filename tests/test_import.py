@@ -0,0 +1,19 @@
+import crud
+import import_donnees
+
+
+def test_import_ne_touche_pas_au_profil_partage(base):
+    conn = crud.connect_db()
+    synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+    profil = crud.PROFIL
+    try:
+        r = import_donnees.importer_clients([
+            {"nom": "Martin", "prenom": "Marie", "naissance": "1980-01-01"},
+            {"nom": "", "prenom": "Jean", "naissance": "1980-01-01"},
+        ])
+        assert r["importes"] == 1 and len(r["rejets"]) == 1
+        # la connexion empruntée pendant l'import est toujours ouverte et inchangée
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == synchronous
+        assert crud.PROFIL == profil
+    finally:
+        conn.close()
@@ -0,0 +1,51 @@
+import crud
+import instrumentation
+import pool
+
+
+def test_chaque_requete_compte(base):
+    # boucle N+1 : dix requêtes identiques consécutives comptent pour dix
+    @instrumentation.instrumente(nom="test.boucle")
+    def boucle():
+        conn = crud.connect_db()
+        try:
+            for _ in range(10):
+                conn.execute("SELECT 1").fetchone()
+        finally:
+            conn.close()
+
+    crud.close_db()   # nouvelles connexions, suivies par le trace callback
+    instrumentation.reinitialiser()
+    instrumentation.activer()
+    try:
+        boucle()
+    finally:
+        instrumentation.desactiver()
+    ligne = next(l for l in instrumentation.rapport() if l["operation"] == "test.boucle")
+    assert ligne["sql_par_appel"] == 10
+
+
+def test_pile_intacte_si_le_profileur_echoue(monkeypatch):
+    def refuser():
+        raise ValueError("autre profileur actif")
+    monkeypatch.setattr(instrumentation, "_demarrer_profil", refuser)
+    f = instrumentation.instrumente(lambda: None, nom="test.profil")
+    instrumentation.activer(profil=True)
+    try:
+        try:
+            f()
+        except ValueError:
+            pass
+        assert instrumentation._pile() == []
+    finally:
+        instrumentation.desactiver()
+
+
+def test_connexions_fermees_oubliees(base):
+    # emprunts simultanés au-delà de la taille du pool : les connexions en trop
+    # sont fermées au retour et ne doivent pas s'accumuler dans le suivi
+    for _ in range(50):
+        conns = [crud.connect_db() for _ in range(pool.POOL_SIZE + 4)]
+        for conn in conns:
+            conn.close()
+    assert len(instrumentation._connexions) <= 2 * pool.POOL_SIZE + 4
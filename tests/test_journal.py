@@ -0,0 +1,29 @@
+import crud
+
+
+def _journal(depuis):
+    conn = crud.connect_db()
+    try:
+        return conn.execute("SELECT table_nom, id_ligne, operation FROM journal_modifications WHERE seq > ? "
+                            "ORDER BY seq", (depuis,)).fetchall()
+    finally:
+        conn.close()
+
+
+def test_une_ligne_de_journal_par_changement_de_stock(base):
+    crud.ajouter_medicament("Doliprane", "3400000000012", "", 10, 2.5, None)
+    crud.ajouter_client("Martin", "Marie", "1980-01-01")
+    seq = crud.dernier_changement()
+    crud.enregistrer_vente(1, 1, 2)
+    assert _journal(seq) == [("medicaments", 1, "U"), ("vente", 1, "I")]
+
+
+def test_modifications_successives_journalisees_une_fois_chacune(base):
+    crud.ajouter_medicament("Doliprane", "3400000000012", "", 10, 2.5, None)
+    crud.ajouter_client("Martin", "Marie", "1980-01-01")
+    seq = crud.dernier_changement()
+    # même seconde : mise_a_jour ne change pas entre les deux
+    crud.modifier_medicament(1, prix=3.0)
+    crud.modifier_medicament(1, quantite=8)
+    crud.modifier_client(1, phone="0612345678")
+    assert _journal(seq) == [("medicaments", 1, "U"), ("medicaments", 1, "U"), ("clients", 1, "U")]
@@ -0,0 +1,83 @@
+import pytest
+
+import alertes
+import crud
+from benchmarks.generateur import generer
+
+
+# Les requêtes de crud passent par les index secondaires (db_phamarcie.INDEX) :
+# chaque fonction est exécutée, ses requêtes sont relevées par le trace
+# callback puis passées à EXPLAIN QUERY PLAN. Petite base réaliste
+# (benchmarks/generateur.py, qui termine par ANALYZE) : le planificateur a
+# des statistiques de la même forme qu'en production.
+
+@pytest.fixture
+def base_analysee(base):
+    generer(base, 500, seed=1, n_meds=300, n_clients=300)
+    return base
+
+
+def _expliquer(requetes):
+    conn = crud.connect_db()
+    try:
+        return [(sql, " | ".join(r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql)))
+                for sql in requetes if sql.lstrip().upper().startswith("SELECT")]
+    finally:
+        conn.close()
+
+
+def _plans(fn, *args, **kwargs):
+    # [(requête, détails du plan)] pour les SELECT exécutés par fn
+    requetes = []
+    conn = crud.connect_db()
+    conn.set_trace_callback(requetes.append)
+    conn.close()   # rendue au pool : fn l'emprunte (un seul thread, pile LIFO)
+    try:
+        fn(*args, **kwargs)
+    finally:
+        conn = crud.connect_db()
+        conn.set_trace_callback(None)
+        conn.close()
+    return _expliquer(requetes)
+
+
+def _utilise(plans, index):
+    return any(f"USING INDEX {index}" in p or f"USING COVERING INDEX {index}" in p for _, p in plans)
+
+
+@pytest.mark.parametrize("nom, appel, index", [
+    ("ventes par date", lambda: crud.fetch_ventes_page(date_debut="2022-03-01", date_fin="2022-03-08",
+                                                       tri="date_vente"), "idx_vente_date"),
+    ("ventes par client", lambda: crud.fetch_ventes_page(id_client=42), "idx_vente_client"),
+    ("ventes par médicament", lambda: crud.fetch_ventes_page(id_medicament=42), "idx_vente_medicament"),
+    ("stock expirant", lambda: crud.fetch_medicaments_page(expire_avant="2023-01-31", tri="date_expiration"),
+     "idx_medicaments_expiration"),
+    ("ids des ventes par client", lambda: crud.fetch_ventes_ids(id_client=42), "idx_vente_client"),
+])
+def test_index_utilise(base_analysee, nom, appel, index):
+    plans = _plans(appel)
+    assert plans, nom
+    assert _utilise(plans, index), plans
+
+
+def test_scan_des_alertes(base_analysee):
+    # premier passage : recherches par intervalle sur la péremption et la marge de stock
+    scan = alertes.ScanAlertes(base_analysee)
+    requetes = []
+    scan._conn.set_trace_callback(requetes.append)
+    try:
+        scan.scanner()
+    finally:
+        scan.fermer()
+    plans = _expliquer(r for r in requetes if "FROM medicaments" in r)
+    assert _utilise(plans, "idx_medicaments_expiration"), plans
+    assert _utilise(plans, "idx_medicaments_marge"), plans
+
+
+def test_jointure_fetch_ventes_par_cle_primaire(base_analysee):
+    # medicaments et clients sont lus par leur rowid, pas par un parcours complet
+    plans = _plans(crud.fetch_ventes_par_ids, list(range(1, 101)))
+    details = " | ".join(p for _, p in plans)
+    assert "SEARCH m USING INTEGER PRIMARY KEY" in details, details
+    assert "SEARCH c USING INTEGER PRIMARY KEY" in details, details
+    assert "SCAN m" not in details and "SCAN c" not in details, details
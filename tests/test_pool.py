@@ -0,0 +1,30 @@
+import asyncio
+
+import crud
+import pool
+import service
+
+
+def _emprunter(n):
+    conns = [crud.connect_db() for _ in range(n)]
+    bruts = {id(c._raw) for c in conns}
+    for c in conns:
+        c.close()
+    return bruts
+
+
+def test_connexions_du_service_gardees_ouvertes(base):
+    # les lecteurs + le rédacteur du service ne rouvrent pas de connexion à chaque rafale
+    n = service.LECTEURS + 1
+    premieres = _emprunter(n)
+    assert _emprunter(n) == premieres
+
+
+def test_service_agrandit_le_pool(base, monkeypatch):
+    monkeypatch.setattr(pool, "POOL_SIZE", pool.POOL_SIZE)
+
+    async def demarrer_arreter():
+        async with service.ServicePharmacie(lecteurs=8):
+            pass
+    asyncio.run(demarrer_arreter())
+    assert pool.POOL_SIZE >= 9
@@ -0,0 +1,34 @@
+import pytest
+
+import crud
+
+
+def _prix_vendus():
+    conn = crud.connect_db()
+    try:
+        return conn.execute("SELECT id_medicament, prix_unitaire, prix_total FROM vente ORDER BY id").fetchall()
+    finally:
+        conn.close()
+
+
+def test_vente_sans_lecture_du_cache(base):
+    crud.ajouter_medicament("Doliprane", "3400000000012", "", 10, 2.5, None)
+    crud.ajouter_client("Martin", "Marie", "1980-01-01")
+    crud.fetch_medicament_details(1)   # met la ligne en cache
+    avant = crud.stats_cache()
+    crud.enregistrer_vente(1, 1, 2)
+    crud.modifier_medicament(1, prix=3.0)
+    crud.enregistrer_vente(1, 1, 1)
+    apres = crud.stats_cache()
+    assert apres["succes"] + apres["echecs"] == avant["succes"] + avant["echecs"]
+    assert _prix_vendus() == [(1, 2.5, 5.0), (1, 3.0, 3.0)]
+
+
+def test_panier_au_prix_courant(base):
+    crud.ajouter_medicament("Doliprane", "3400000000012", "", 10, 2.5, None)
+    crud.ajouter_medicament("Smecta", "3400000000029", "", 1, 4.0, None)
+    crud.ajouter_client("Martin", "Marie", "1980-01-01")
+    crud.enregistrer_panier([(1, 2), (2, 1), (1, 1)], 1)
+    assert _prix_vendus() == [(1, 2.5, 5.0), (2, 4.0, 4.0), (1, 2.5, 2.5)]
+    with pytest.raises(ValueError, match="Stock insuffisant"):
+        crud.enregistrer_panier([(2, 1)], 1)